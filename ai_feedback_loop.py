@@ -1,82 +1,521 @@
 from crewai.flow import Flow, router, start, listen, and_, or_
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
+import asyncio
+import difflib
+import os
+import time
 import nest_asyncio
 nest_asyncio.apply()
 
+from new_rmjt import EnhancedGenerator, DEFAULT_INPUTS, DEFAULT_PROJECT_ROOT, DEFAULT_SOURCE_PATH
+from incremental import regenerate_incremental, set_task_output
+from segment_feedback import failing_segments, regenerate_segments, scope_for
+from segments import extract_code
+from js_checks import check_test_file, format_feedback
+from coverage_estimator import CoverageReport, estimate_coverage
+from context_pruning import ContextReport
+from streaming import StreamEvent, stream_generation
+from tracing import Tracer, traced
+from tracing import span as trace_span
+from cascade import CascadeDecision, CascadePolicy, complexity
+from checkpoint import CheckpointStore, checkpointed
+from result_repair import Result, SegmentVerdict, result_of
+from patching import apply_feedback
+from mock_library import fixture_library
+from dedup import shared_artifacts
+
+checkpoints = CheckpointStore()
+
 class State(BaseModel):
+  source_path:str=DEFAULT_SOURCE_PATH
+  project_root:str=DEFAULT_PROJECT_ROOT
+  output_dir:str="rmjt_tests"
+  incremental:bool=False
+  segment_workers:int=1
+  stream:bool=False
+  trace:bool=True
   test_code:str=""
   expected_coverage:int=0
   feedback:str=""
   pass_fail:str=""
-  task_id_3:str=""
-  task_id_4:str=""
+  task_ids:Dict[str, str]={}
+  task_outputs:Dict[str, str]={}
+  segment_verdicts:Dict[str, SegmentVerdict]={}
+  rerun_segments:List[str]=[]
+  failed_segments:Dict[str, str]={}
+  coverage_report:Optional[CoverageReport]=None
+  context_report:Optional[ContextReport]=None
+  stream_events:List[StreamEvent]=[]
+  # feedback loop budgets and convergence; the loop stops at whichever is hit first
+  max_iterations:int=5
+  max_seconds:float=1800
+  max_tokens:int=200000
+  plateau_iterations:int=2
+  min_coverage_gain:int=1
+  max_feedback_similarity:float=0.9
+  iteration:int=0
+  started_at:float=0.0
+  coverage_history:List[int]=[]
+  feedback_history:List[str]=[]
+  best_test_code:str=""
+  best_coverage:int=-1
+  best_pass_fail:str=""
+  stop_reason:str=""
+  # static analysis runs on the cheap model first and escalates to the reasoning model per cascade_policy
+  cascade:bool=True
+  cascade_policy:CascadePolicy=CascadePolicy()
+  cascade_log:List[CascadeDecision]=[]
+  # state, task outputs and output files are checkpointed after every step; resume_run names the run to continue
+  checkpoint:bool=True
+  resume_run:str=""
+  prior_tokens:int=0
 
 class RMJT(Flow[State]):
-    en_gen = EnhancedGenerator()
     """Reasoning Model Jest Tester"""
 
+    @property
+    def run_id(self):
+        """Checkpoint and trace id; a resumed flow keeps the id of the run it continues"""
+        return self.state.resume_run or getattr(self.state, "id", None) or os.path.basename(self.state.output_dir)
+
+    def _trace_dir(self):
+        return os.path.join(self.state.output_dir, "trace") if self.state.trace else None
+
+    def _get_tracer(self):
+        """Spans for this run, exported to <output_dir>/trace after every step when trace is on.
+
+        A method, not a property: Flow.__init__ reads every public attribute, which would build
+        the tracer from the default state before the kickoff inputs are applied.
+        """
+        if getattr(self, "_tracer", None) is None:
+            # always kept: the token budget is read from it
+            self._tracer = Tracer(self.run_id, self._trace_dir())
+        return self._tracer
+
+    def checkpoint(self, step):
+        """Save the state, every task's raw output and the output files once `step` has completed"""
+        # a resumed code_gen only reloads the checkpoint, which must keep pointing at the step it recorded
+        if not self.state.checkpoint or (step == "code_gen" and self.state.resume_run):
+            return
+        if getattr(self, "en_gen", None) is not None:
+            self.capture_tasks()
+        # tokens spent before a resume still count towards the token budget
+        state = self.state.model_copy(update={"prior_tokens": self.state.prior_tokens + self._get_tracer().tokens()})
+        checkpoints.save(self.run_id, step, state, self.state.output_dir)
+
+    def restore(self):
+        """Load the checkpoint of state.resume_run: state, output files and the crew's task outputs"""
+        checkpoint = checkpoints.load(self.state.resume_run)
+        if checkpoint is None:
+            raise ValueError(f"No checkpoint for run {self.state.resume_run}")
+        saved = State.model_validate(checkpoint["state"])
+        for name in State.model_fields:
+            if name != "resume_run":
+                setattr(self.state, name, getattr(saved, name))
+        # the wall-clock budget only counts time the run was actually running
+        self.state.started_at = time.time() - max(checkpoint["saved_at"] - saved.started_at, 0.0)
+        self._resume_step = checkpoint["step"]
+        # the step's span is already open on a tracer made before the saved output_dir was known
+        self._get_tracer().output_dir = self._trace_dir()
+        checkpoints.restore_files(checkpoint)
+        self.en_gen = EnhancedGenerator(self.state.source_path, self.state.output_dir, self.state.project_root)
+        for task in self.en_gen.shared_crew().tasks:
+            if task.name in self.state.task_outputs:
+                set_task_output(task, self.state.task_outputs[task.name])
+        return checkpoint["step"]
+
+    def record_attempt(self):
+        """Remember this iteration's coverage and feedback, and the test file if it scores best so far"""
+        self.state.coverage_history.append(self.state.expected_coverage)
+        # compared without the coverage summary, which repeats between iterations whatever the model says
+        self.state.feedback_history.append(model_feedback(self.state.feedback, self.state.coverage_report))
+        score = (self.state.pass_fail.upper() == "PASS", self.state.expected_coverage)
+        if score[0]:
+            # mocks of a passing file become ready-made fixtures for later files with the same dependencies
+            test_code = extract_code(_read(os.path.join(self.state.output_dir, "code.test.js")))
+            fixture_library.record(test_code, self.state.source_path, self.state.output_dir, self.state.project_root)
+            # segment artifacts are only shared once verified, with any fixes made since generation
+            shared_artifacts.publish(self.state.output_dir, test_code)
+        if score > (self.state.best_pass_fail.upper() == "PASS", self.state.best_coverage):
+            self.state.best_test_code = _read(os.path.join(self.state.output_dir, "code.test.js"))
+            self.state.best_coverage = self.state.expected_coverage
+            self.state.best_pass_fail = self.state.pass_fail
+
+    def stop_reason(self):
+        """Why the feedback loop should not run another iteration, or "" to continue"""
+        state = self.state
+        if state.iteration >= state.max_iterations:
+            return f"iteration budget of {state.max_iterations} reached"
+        elapsed = time.time() - state.started_at
+        if elapsed >= state.max_seconds:
+            return f"wall-clock budget of {state.max_seconds:.0f}s reached ({elapsed:.0f}s)"
+        tokens = state.prior_tokens + self._get_tracer().tokens()
+        if tokens >= state.max_tokens:
+            return f"token budget of {state.max_tokens} reached (~{tokens})"
+        if plateaued(state.coverage_history, state.plateau_iterations, state.min_coverage_gain):
+            return f"coverage plateaued at {max(state.coverage_history)}% over {state.plateau_iterations} iterations"
+        if len(state.feedback_history) >= 2:
+            similarity = feedback_similarity(state.feedback_history[-2], state.feedback_history[-1])
+            if similarity >= state.max_feedback_similarity:
+                return f"feedback unchanged between iterations (similarity {similarity:.2f})"
+        return ""
+
+    def capture_tasks(self):
+        """Record task IDs and raw outputs by task name, straight from the in-memory crew"""
+        for task in self.en_gen.shared_crew().tasks:
+            self.state.task_ids[task.name] = str(task.id)
+            if task.output is not None:
+                self.state.task_outputs[task.name] = task.output.raw
+
+    def apply_result(self, result, scoped=False):
+        """Update state from an analyzer Result; a scoped result only replaces the verdicts it covers"""
+        if not scoped:
+            self.state.segment_verdicts = {}
+        for verdict in result.segments:
+            self.state.segment_verdicts[verdict.segment_id] = verdict
+        self.state.feedback = result.feedback
+        self.state.expected_coverage = result.expected_coverage
+        if scoped and self.state.segment_verdicts:
+            failed = any(v.pass_fail.upper() == "FAIL" for v in self.state.segment_verdicts.values())
+            self.state.pass_fail = "FAIL" if failed else "PASS"
+        else:
+            self.state.pass_fail = result.pass_fail
+
+    def analyze(self, inputs=None):
+        """Local mechanical checks first; the reasoning model only sees files that pass them.
+
+        expected_coverage always comes from the static estimator when it can measure the source,
+        so the routers branch on a reproducible number. Returns the Result and whether it came
+        from the local checks.
+        """
+        test_code = extract_code(_read(os.path.join(self.state.output_dir, "code.test.js")))
+        segmented = extract_code(_read(os.path.join(self.state.output_dir, "code.js")))
+        self.state.coverage_report = estimate_coverage(segmented or _read(self.state.source_path), test_code)
+        report = self.state.coverage_report
+        coverage = report.percent if report else self.state.expected_coverage
+
+        issues = check_test_file(test_code, _read(self.state.source_path))
+        if issues:
+            print(f"Pre-analysis found {len(issues)} issue(s); skipping the static analyzer")
+            feedback = format_feedback(issues)
+            return Result(expected_coverage=coverage, feedback=feedback, pass_fail="FAIL"), True
+        result = self.static_analysis(inputs)
+        if report:
+            result.expected_coverage = report.percent
+            if report.uncovered() and result.pass_fail.upper() == "FAIL":
+                result.feedback = f"{result.feedback}\n\n{report.summary()}"
+        return result, False
+
+    def static_analysis(self, inputs=None):
+        """Run the analyzer through the model cascade, logging every escalation decision"""
+        cheap, reasoning = self.en_gen.cascade_models
+        if not self.state.cascade:
+            return self.run_analysis(inputs)
+        if getattr(cheap, "model", None) == getattr(reasoning, "model", None):
+            # with both tiers on one model there is nothing to escalate to
+            if not getattr(self, "_cascade_disabled", False):
+                self._cascade_disabled = True
+                print(f"Cascade disabled: both tiers use {getattr(cheap, 'model', cheap)}; "
+                      "set RMJT_REASONING_MODEL to a stronger model to enable it")
+            return self.run_analysis(inputs)
+        policy = self.state.cascade_policy
+        scope = self.state.rerun_segments if inputs else None
+        score = complexity(self.state.coverage_report, scope)
+        stalled = plateaued(self.state.coverage_history, policy.stall_iterations, self.state.min_coverage_gain)
+
+        decision = self.log_decision(policy.before(score, stalled))
+        if decision.escalate:
+            return self.run_analysis(inputs, reasoning)
+        result = self.run_analysis(inputs, cheap)
+        decision = self.log_decision(policy.after(result, score))
+        if decision.escalate:
+            result = self.run_analysis(inputs, reasoning)
+        return result
+
+    def run_analysis(self, inputs=None, llm=None):
+        """One static analysis task run, as a validated Result even when crewai could not convert the answer"""
+        return result_of(self.en_gen.run_task("static_logic_analysis_task", inputs=inputs, llm=llm), Result)
+
+    def save_test_code(self, test_code):
+        """Write a locally edited test file and make it the test task's output"""
+        with open(os.path.join(self.state.output_dir, "code.test.js"), "w") as f:
+            f.write(test_code)
+        set_task_output(self.en_gen.test_case_generator_task(), test_code)
+        self.state.test_code = test_code
+
+    def log_decision(self, decision):
+        self.state.cascade_log.append(decision)
+        model = "reasoning" if decision.escalate else "cheap"
+        why = "; ".join(decision.reasons) or "no escalation trigger"
+        print(f"Cascade ({decision.stage}): {model} model, {why}")
+        with trace_span(f"cascade_{decision.stage}", "cascade", escalate=decision.escalate, reasons=decision.reasons,
+                        complexity=decision.complexity):
+            pass
+        return decision
+
+    def on_stream_event(self, event):
+        """Print progress as blocks finish and run the local checks on the partial test file"""
+        if event.kind == "done":
+            print(f"{os.path.basename(event.path)}: complete after {event.elapsed}s")
+            return
+        print(f"{os.path.basename(event.path)}: {event.kind} {event.index + 1} '{event.title}' at {event.elapsed}s")
+        if event.kind == "describe":
+            issues = check_test_file(_read(event.path), _read(self.state.source_path))
+            if issues:
+                print(f"  {len(issues)} early issue(s) so far")
+
     @start()
-    def code_gen(self):
-        response = self.en_gen.crew().kickoff({"feedback": " "})
-        self.state.test_code = self.en_gen.test_case_generator_task().output.raw
-        self.state.feedback = response['feedback']
-        self.state.pass_fail = response['pass_fail']
-        self.state.expected_coverage = response['expected_coverage']
+    @checkpointed
+    @traced
+    async def code_gen(self):
+        if self.state.resume_run:
+            step = await asyncio.to_thread(self.restore)
+            # the routers pick up from the restored state; code_gen_m2 skips itself if it was the last step
+            print(f"Resuming run {self.state.resume_run} after {step}")
+            return
+        self.state.started_at = time.time()
+        self.en_gen = EnhancedGenerator(self.state.source_path, self.state.output_dir, self.state.project_root)
+        if self.state.incremental or self.state.segment_workers > 1:
+            # one short call per segment, segment_workers at a time, merged back into code.test.js
+            self.state.test_code, regenerated, self.state.failed_segments = await asyncio.to_thread(
+                regenerate_incremental, self.en_gen, max_workers=self.state.segment_workers,
+                reuse=self.state.incremental)
+            print(f"Regenerated segments: {regenerated}")
+            if self.state.failed_segments:
+                print(f"Failed segments: {list(self.state.failed_segments)}")
+        elif self.state.stream:
+            self.state.stream_events = await asyncio.to_thread(stream_generation, self.en_gen, self.on_stream_event)
+            self.state.test_code = self.en_gen.test_case_generator_task().output.raw
+        else:
+            await self.en_gen.shared_crew("generation_crew").kickoff_async(self.en_gen.kickoff_inputs())
+            self.state.test_code = self.en_gen.test_case_generator_task().output.raw
+        result, _ = await asyncio.to_thread(self.analyze)
+        self.apply_result(result)
+        self.record_attempt()
+        self.capture_tasks()
 
     @router(code_gen)
+    @traced
     def router_1(self):
         if self.state.expected_coverage < 90 and self.state.pass_fail == "FAIL":
-            return "activate feedback mechanism"
+            self.state.stop_reason = self.stop_reason()
+            return "Budget Exhausted" if self.state.stop_reason else "activate feedback mechanism"
         else:
             return "Passed"
 
     @listen("activate feedback mechanism")
+    @checkpointed
+    @traced
     def task_ids(self):
-        import subprocess
-        x = subprocess.run(['crewai', 'log-tasks-outputs'],
-                          capture_output=True, text=True, check=True).stdout.splitlines()
-        for i in x:
-            if 'Task 3:' in i:
-                parts = i.split('Task 3:')
-                if len(parts) > 1:
-                    self.state.task_id_3 = parts[1].strip()
-                    print(f"Found task 3 ID: {self.state.task_id_3}")
-
-            if 'Task 4:' in i:
-                parts = i.split('Task 4:')
-                if len(parts) > 1:
-                    self.state.task_id_4 = parts[1].strip()
-                    print(f"Found task 4 ID: {self.state.task_id_4}")
-        # Print both IDs for verification
-        print(f"Task 3 ID: {self.state.task_id_3}")
-        print(f"Task 4 ID: {self.state.task_id_4}")
+        for name, task_id in self.state.task_ids.items():
+            print(f"{name} ID: {task_id}")
 
     @listen(or_(task_ids,'re-run'))
-    def code_gen_m2(self):
-        task_id = self.state.task_id_3
-        feedback = {"feedback": self.state.feedback}
-        response = self.en_gen.crew().replay(task_id=task_id, inputs=feedback)
+    @checkpointed
+    @traced
+    async def code_gen_m2(self):
+        if getattr(self, "_resume_step", "") == "code_gen_m2":
+            self._resume_step = ""
+            return
+        self.state.iteration += 1
+        # re-run in process from the crew's in-memory outputs; crewai's replay storage
+        # only holds the latest kickoff, which concurrent flows overwrite
+        test_code = extract_code(self.state.test_code)
+        failing = failing_segments(self.state.segment_verdicts, test_code)
+        if failing:
+            # the analyzer's before/after pairs are applied locally; only what they can't fix is regenerated
+            patched = []
+            for segment_id in failing:
+                test_code, applied, remaining = apply_feedback(test_code, self.state.segment_verdicts[segment_id].issues)
+                if applied and not remaining:
+                    patched.append(segment_id)
+                elif applied:
+                    self.state.segment_verdicts[segment_id].issues = remaining
+            if patched:
+                print(f"Patched failing segments locally: {patched}")
+                self.save_test_code(test_code)
+            regenerate = [segment_id for segment_id in failing if segment_id not in patched]
+            spliced = []
+            if regenerate:
+                print(f"Regenerating failing segments: {regenerate}")
+                self.state.test_code, spliced = await asyncio.to_thread(
+                    regenerate_segments, self.en_gen, test_code, self.state.segment_verdicts, regenerate)
+            self.state.rerun_segments = patched + spliced
+            for segment_id in failing:
+                del self.state.segment_verdicts[segment_id]
+            return
+        self.state.rerun_segments = []
+        # the coverage summary analyze() appends is not part of any issue; patching can't address
+        # it, so it stays in the feedback even when every suggested fix applies
+        feedback = model_feedback(self.state.feedback, self.state.coverage_report)
+        summary = self.state.coverage_report.summary() if feedback != self.state.feedback else ""
+        test_code, applied, remaining = apply_feedback(test_code, feedback)
+        remaining = "\n\n".join(part for part in (remaining, summary) if part)
+        if applied:
+            print(f"Applied {len(applied)} suggested fix(es) locally")
+            self.save_test_code(test_code)
+            if not remaining:
+                return
+        feedback = remaining if applied else self.state.feedback
+        if applied:
+            feedback += ("\n\nThe other suggested fixes are already applied to the current test file below; "
+                         f"keep the rest of it unchanged:\n```javascript\n{test_code}\n```")
+        response = await asyncio.to_thread(self.en_gen.run_task, "test_case_generator_task", inputs={"feedback": feedback})
+        self.state.test_code = response.raw
         print(response.raw)
 
     @listen(code_gen_m2)
-    def static_testing_m2(self):
-        task_id = self.state.task_id_4
-        response = self.en_gen.crew().replay(task_id=task_id)
-        self.state.feedback = response['feedback']
-        self.state.pass_fail = response['pass_fail']
-        self.state.expected_coverage = response['expected_coverage']
+    @checkpointed
+    @traced
+    async def static_testing_m2(self):
+        scoped = bool(self.state.rerun_segments)
+        inputs = {"scope": scope_for(self.state.rerun_segments)} if scoped else None
+        result, local = await asyncio.to_thread(self.analyze, inputs)
+        # local findings carry no per-segment verdicts, so they always reset to a whole-file pass
+        self.apply_result(result, scoped=scoped and not local)
+        self.record_attempt()
+        self.capture_tasks()
 
 
     @router(static_testing_m2)
+    @traced
     def router_2(self):
       if self.state.expected_coverage < 90 and self.state.pass_fail == "FAIL":
-            return "re-run"
+            self.state.stop_reason = self.stop_reason()
+            return "Budget Exhausted" if self.state.stop_reason else "re-run"
       else:
             return "Test Cases Passed"
 
 
+    @listen("Budget Exhausted")
+    @checkpointed
+    @traced
+    def keep_best(self):
+      """Leave the best-scoring test file of the run in place rather than the last one"""
+      print(f"Stopping the feedback loop: {self.state.stop_reason}")
+      shared_artifacts.discard(self.state.output_dir)
+      if self.state.best_test_code:
+          with open(os.path.join(self.state.output_dir, "code.test.js"), "w") as f:
+              f.write(self.state.best_test_code)
+          self.state.test_code = self.state.best_test_code
+          self.state.expected_coverage = self.state.best_coverage
+          self.state.pass_fail = self.state.best_pass_fail
+      print(f"Kept the best test file: {self.state.expected_coverage}% {self.state.pass_fail}")
+
+
     @listen("Test Cases Passed")
+    @checkpointed
+    @traced
     def show(self):
       print(self.state.expected_coverage)
       print(self.state.pass_fail)
+      self.state.context_report = self.en_gen.context_assembler.report()
+      print(f"Context pruning saved {self.state.context_report.saved_tokens} tokens")
+      if self._get_tracer().output_dir:
+          print(f"Trace and latency summary in {self._get_tracer().output_dir}")
+
+
+def plateaued(history, k, min_gain):
+    """True when none of the last k coverages beat the best before them by min_gain"""
+    if k <= 0 or len(history) <= k:
+        return False
+    return max(history[-k:]) < max(history[:-k]) + min_gain
+
+
+def feedback_similarity(a, b):
+    """0..1 similarity of two feedback texts, compared word by word"""
+    return difflib.SequenceMatcher(None, a.split(), b.split(), autojunk=False).ratio()
+
+
+def model_feedback(feedback, report):
+    """The analyzer's own feedback, without the coverage summary analyze() appends to it"""
+    if report and report.uncovered() and feedback.endswith(report.summary()):
+        return feedback[:-len(report.summary())].rstrip()
+    return feedback
+
+
+def _read(path):
+    if not os.path.exists(path):
+        return ""
+    with open(path) as f:
+        return f.read()
+
+
+def _output_dirs(paths, output_root):
+    """One output directory per source file, named after its path so same-named files don't collide."""
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths]) if paths else ""
+    dirs = {}
+    for path in paths:
+        rel = os.path.splitext(os.path.relpath(os.path.abspath(path), root))[0]
+        dirs[path] = os.path.join(output_root, rel.replace(os.sep, "__"))
+    return dirs
+
+
+def warm_start(project_roots=(DEFAULT_PROJECT_ROOT,), connect_graph=True):
+    """Pay the one-time setup of a long-running worker before its first flow.
+
+    Connects the Neo4j QA chain and builds the dependency index and project map of each
+    project root, so later flows in this process reuse them.
+    """
+    import new_rmjt
+    from dependency_index import index_for
+    from project_map import project_map
+
+    if connect_graph:
+        new_rmjt.get_chain()
+    for root in project_roots:
+        if os.path.isdir(root):
+            index_for(root, refresh=True)
+            project_map(root)
+
+
+def resume(run_id):
+    """Continue a checkpointed run from its last completed step and return the final State.
+
+    A run that had already finished is not re-run; its saved State is returned as is.
+    """
+    checkpoint = checkpoints.load(run_id)
+    if checkpoint is None:
+        raise ValueError(f"No checkpoint for run {run_id}")
+    if checkpoint["completed"]:
+        return State.model_validate(checkpoint["state"])
+    flow = RMJT()
+    flow.kickoff(inputs={"resume_run": run_id, "output_dir": checkpoint["output_dir"]})
+    return flow.state
+
+
+async def generate_many(paths, max_concurrency=4, output_root="rmjt_tests", incremental=False,
+                        project_root=DEFAULT_PROJECT_ROOT, segment_workers=1, stream=False, resume=False):
+    """Run one RMJT flow per source file on a single event loop, at most max_concurrency at a time.
+
+    With segment_workers > 1 each flow also fans its segments out, so up to
+    max_concurrency * segment_workers LLM calls can be in flight. With resume, a file whose
+    output directory has a checkpoint continues from it, and finished files are not re-run.
+
+    Returns a dict of path -> final State, or the exception that flow raised.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    output_dirs = _output_dirs(paths, output_root)
+
+    async def run_one(path):
+        async with semaphore:
+            checkpoint = checkpoints.latest_for(output_dirs[path]) if resume else None
+            if checkpoint is not None and checkpoint["completed"]:
+                return State.model_validate(checkpoint["state"])
+            flow = RMJT()
+            if checkpoint is not None:
+                await flow.kickoff_async(inputs={"resume_run": checkpoint["run_id"], "output_dir": output_dirs[path]})
+                return flow.state
+            await flow.kickoff_async(inputs={
+                "source_path": path,
+                "output_dir": output_dirs[path],
+                "incremental": incremental,
+                "project_root": project_root,
+                "segment_workers": segment_workers,
+                "stream": stream,
+            })
+            return flow.state
+
+    results = await asyncio.gather(*(run_one(path) for path in paths), return_exceptions=True)
+    return dict(zip(paths, results))
@@ -0,0 +1,26 @@
+const jwt = require('jsonwebtoken');
+const User = require('../models/User');
+
+const login = async (req, res) => {
+  const { email, password } = req.body;
+  if (!email || !password) {
+    return res.status(400).json({ message: 'Email and password are required' });
+  }
+  try {
+    const user = await User.findOne({ email });
+    if (!user || !(await user.comparePassword(password))) {
+      return res.status(401).json({ message: 'Invalid credentials' });
+    }
+    const token = jwt.sign({ id: user.id }, process.env.JWT_SECRET, { expiresIn: '1h' });
+    return res.status(200).json({ token });
+  } catch (err) {
+    return res.status(500).json({ message: 'Server error' });
+  }
+};
+
+const logout = (req, res) => {
+  res.clearCookie('token');
+  return res.status(200).json({ message: 'Logged out' });
+};
+
+module.exports = { login, logout };
@@ -0,0 +1,175 @@
+"""Offline benchmark of the generators and the RMJT flow against replayed LLM responses.
+
+    python benchmarks/run.py                      # run every scenario, compare with baseline.json
+    python benchmarks/run.py --update-baseline    # store this run as the new baseline
+    python benchmarks/run.py --scenarios flow_single --latency 0.2
+
+Scenarios use canned answers from benchmarks/fakes.py unless --cassette points to a file of
+recorded responses (add --record to fill it from the real model). Neo4j is replaced by an
+in-process graph. Reported per scenario: wall time, model time (union of fake call intervals),
+orchestration overhead (wall minus model time), LLM calls, prompt bytes and graph queries.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fakes  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# call counts and prompt bytes are deterministic; times get a relative and an absolute allowance
+EXACT_METRICS = ("llm_calls", "prompt_bytes", "graph_queries")
+TIMED_METRICS = ("wall_s", "overhead_s")
+
+
+def _source_copies(workdir, count):
+    """`count` copies of the fixture controller, in their own directories so outputs don't collide"""
+    paths = []
+    for i in range(count):
+        directory = os.path.join(workdir, "src", f"controller_{i:02d}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "auth.js")
+        shutil.copy(os.path.join(FIXTURES, "auth.js"), path)
+        paths.append(path)
+    return paths
+
+
+def generator_single(module, workdir):
+    source = _source_copies(workdir, 1)[0]
+    generator = module.EnhancedGenerator(source, os.path.join(workdir, "out"), project_root=FIXTURES)
+    generator.shared_crew("generation_crew").kickoff(inputs=generator.kickoff_inputs())
+    generator.run_task("static_logic_analysis_task")
+
+
+def flow_run(workdir, files, concurrency=8):
+    from ai_feedback_loop import generate_many
+
+    paths = _source_copies(workdir, files)
+    results = asyncio.run(generate_many(paths, max_concurrency=concurrency,
+                                        output_root=os.path.join(workdir, "out"), project_root=FIXTURES))
+    errors = {path: state for path, state in results.items() if isinstance(state, Exception)}
+    if errors:
+        raise RuntimeError(f"{len(errors)} flow(s) failed, first: {next(iter(errors.values()))!r}")
+
+
+def scenarios():
+    """name -> (run(workdir), static analyses that FAIL before one PASSes)"""
+    import new_rmjt
+    import rmjt
+
+    return {
+        "rmjt_single": (lambda workdir: generator_single(rmjt, workdir), 0),
+        "new_rmjt_single": (lambda workdir: generator_single(new_rmjt, workdir), 0),
+        "flow_single": (lambda workdir: flow_run(workdir, 1), 0),
+        "flow_50_files": (lambda workdir: flow_run(workdir, 50), 0),
+        "flow_feedback_3_iterations": (lambda workdir: flow_run(workdir, 1), 2),
+    }
+
+
+def run_scenario(run, static_failures, args):
+    llm = fakes.CassetteLLM(cassette_path=args.cassette, latency=args.latency, static_failures=static_failures,
+                            fallback=_real_llm() if args.record else None)
+    import new_rmjt
+    import rmjt
+
+    fakes.use_llm(rmjt, llm)
+    fakes.use_llm(new_rmjt, llm)
+    fakes.stats.reset()
+    workdir = tempfile.mkdtemp(prefix="rmjt_bench_")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # keeps .rmjt_cache and trace output out of the repository
+    fakes.reset()  # after the chdir, so the libraries reload from the empty .rmjt_cache
+    try:
+        start = time.time()
+        run(workdir)
+        wall = time.time() - start
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    model = fakes.busy_seconds(fakes.stats.intervals)
+    return {
+        "wall_s": round(wall, 3),
+        "model_s": round(model, 3),
+        "overhead_s": round(max(wall - model, 0.0), 3),
+        "llm_calls": fakes.stats.llm_calls,
+        "prompt_bytes": fakes.stats.prompt_bytes,
+        "graph_queries": fakes.stats.graph_queries,
+    }
+
+
+def _real_llm():
+    from crewai import LLM
+
+    return LLM(model="gpt-4o-mini", temperature=0)
+
+
+def compare(report, baseline, tolerance, slack):
+    """Lines describing every metric that got worse than the baseline allows"""
+    regressions = []
+    for name, metrics in report.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in EXACT_METRICS:
+            if metrics[metric] > base.get(metric, metrics[metric]):
+                regressions.append(f"{name}: {metric} {base[metric]} -> {metrics[metric]}")
+        for metric in TIMED_METRICS:
+            limit = base.get(metric, metrics[metric]) * (1 + tolerance) + slack
+            if metrics[metric] > limit:
+                regressions.append(f"{name}: {metric} {base[metric]}s -> {metrics[metric]}s (limit {limit:.3f}s)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="*", help="subset of scenarios to run")
+    parser.add_argument("--latency", type=float, default=0.05, help="synthetic seconds per LLM call")
+    parser.add_argument("--graph-latency", type=float, default=0.02, help="synthetic seconds per graph query")
+    parser.add_argument("--cassette", help="JSON file of recorded responses keyed by prompt hash")
+    parser.add_argument("--record", action="store_true", help="fill the cassette from the real model")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    parser.add_argument("--slack", type=float, default=0.05, help="allowed absolute slowdown in seconds")
+    args = parser.parse_args(argv)
+
+    fakes.install(llm_latency=args.latency, graph_latency=args.graph_latency)
+    available = scenarios()
+    names = args.scenarios or list(available)
+    report = {}
+    for name in names:
+        run, static_failures = available[name]
+        report[name] = run_scenario(run, static_failures, args)
+        print(f"{name}: " + ", ".join(f"{k}={v}" for k, v in report[name].items()))
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(report)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline stored; run with --update-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(report, json.load(f), args.tolerance, args.slack)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+from collections import Counter
+from typing import List
+
+from pydantic import BaseModel
+
+# decision points counted towards a function's cyclomatic complexity
+DECISION_KINDS = {"branch", "early-return", "case", "catch"}
+
+
+class CascadeDecision(BaseModel):
+    stage: str  # before (pick the first model) or after (re-check a cheap verdict)
+    escalate: bool
+    reasons: List[str] = []
+    complexity: int = 0
+    confidence: float = 1.0
+    pass_fail: str = ""
+
+
+class CascadePolicy(BaseModel):
+    """When static analysis should use the reasoning model instead of, or after, the cheap one"""
+    min_confidence: float = 0.7
+    complexity_threshold: int = 12
+    stall_iterations: int = 2
+
+    def before(self, complexity, stalled):
+        """Go straight to the reasoning model for complex code or a stalled loop"""
+        reasons = []
+        if complexity >= self.complexity_threshold:
+            reasons.append(f"complexity {complexity} >= {self.complexity_threshold}")
+        if stalled:
+            reasons.append(f"coverage stalled over {self.stall_iterations} iterations")
+        return CascadeDecision(stage="before", escalate=bool(reasons), reasons=reasons, complexity=complexity)
+
+    def after(self, result, complexity):
+        """Re-run on the reasoning model when the cheap model fails the file without being sure"""
+        reasons = []
+        if result.pass_fail.upper() == "FAIL" and result.confidence < self.min_confidence:
+            reasons.append(f"FAIL with confidence {result.confidence:.2f} < {self.min_confidence}")
+        return CascadeDecision(stage="after", escalate=bool(reasons), reasons=reasons, complexity=complexity,
+                               confidence=result.confidence, pass_fail=result.pass_fail)
+
+
+def complexity(report, segment_ids=None):
+    """Highest cyclomatic estimate (decision points + 1) among the functions in scope.
+
+    Functions are matched to segment ids by name; with no match, or no scope, every function counts.
+    """
+    if report is None:
+        return 0
+    counts = Counter(item.function for item in report.items if item.kind in DECISION_KINDS)
+    functions = {item.function for item in report.items if item.kind == "function"}
+    if segment_ids:
+        wanted = {s.lower() for s in segment_ids}
+        scoped = {f for f in functions if any(f.lower() in s or s in f.lower() for s in wanted)}
+        functions = scoped or functions
+    return max((counts[f] + 1 for f in functions), default=0)
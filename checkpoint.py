@@ -0,0 +1,94 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import time
+
+# steps after which a run is finished; resuming such a run just returns its state
+FINAL_STEPS = {"show", "keep_best"}
+# output files restored on resume, so the analyzer and splicing see what the run had produced
+OUTPUT_FILES = ("code.js", "code.test.js")
+
+
+class CheckpointStore:
+    """One JSON file per run holding the flow state, output files and last completed step"""
+
+    def __init__(self, root=".rmjt_cache/checkpoints"):
+        self.root = root
+
+    def path(self, run_id):
+        return os.path.join(self.root, f"{run_id}.json")
+
+    def _latest_path(self, output_dir):
+        """Pointer file naming the last run that checkpointed into output_dir"""
+        key = hashlib.sha1(os.path.abspath(output_dir).encode("utf-8")).hexdigest()
+        return os.path.join(self.root, "latest", key)
+
+    def save(self, run_id, step, state, output_dir):
+        files = {}
+        for name in OUTPUT_FILES:
+            path = os.path.join(output_dir, name)
+            if os.path.exists(path):
+                with open(path) as f:
+                    files[name] = f.read()
+        checkpoint = {
+            "run_id": run_id,
+            "step": step,
+            "completed": step in FINAL_STEPS,
+            "saved_at": time.time(),
+            "output_dir": output_dir,
+            "state": state.model_dump(mode="json"),
+            "files": files,
+        }
+        os.makedirs(os.path.join(self.root, "latest"), exist_ok=True)
+        self._write(self.path(run_id), json.dumps(checkpoint))
+        self._write(self._latest_path(output_dir), run_id)
+        return checkpoint
+
+    @staticmethod
+    def _write(path, text):
+        """Write through a temporary file, so a crash mid-write leaves the previous checkpoint intact"""
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def load(self, run_id):
+        if not os.path.exists(self.path(run_id)):
+            return None
+        with open(self.path(run_id)) as f:
+            return json.load(f)
+
+    def latest_for(self, output_dir):
+        """Most recent checkpoint written for an output directory, or None"""
+        pointer = self._latest_path(output_dir)
+        if not os.path.exists(pointer):
+            return None
+        with open(pointer) as f:
+            return self.load(f.read().strip())
+
+    @staticmethod
+    def restore_files(checkpoint):
+        os.makedirs(checkpoint["output_dir"], exist_ok=True)
+        for name, content in checkpoint["files"].items():
+            with open(os.path.join(checkpoint["output_dir"], name), "w") as f:
+                f.write(content)
+
+
+def checkpointed(method):
+    """Save a checkpoint through self.checkpoint(step) once a flow step (sync or async) completes"""
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_step(self, *args, **kwargs):
+            result = await method(self, *args, **kwargs)
+            self.checkpoint(method.__name__)
+            return result
+        return async_step
+
+    @functools.wraps(method)
+    def step(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self.checkpoint(method.__name__)
+        return result
+    return step
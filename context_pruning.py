@@ -0,0 +1,138 @@
+import re
+import threading
+
+from pydantic import BaseModel
+
+from js_checks import TokenizeError, imported_modules, tokenize
+
+HEADING = re.compile(r"^(?=#{1,6} )", re.MULTILINE)
+WORD = re.compile(r"[A-Za-z_$][\w$]{2,}")
+COMMON = {
+    "const", "let", "var", "function", "async", "await", "return", "require", "import", "from", "export", "exports",
+    "module", "this", "new", "true", "false", "null", "undefined", "req", "res", "next", "err", "error", "status",
+    "json", "send", "body", "the", "and", "for", "with", "jest", "mock", "expect", "test", "describe", "segment",
+}
+
+
+class ContextReport(BaseModel):
+    original_tokens: int = 0
+    sent_tokens: int = 0
+    saved_tokens: int = 0
+    saved_ratio: float = 0.0
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for code and English)"""
+    return (len(text) + 3) // 4
+
+
+def _chunks(text):
+    """Markdown sections split further at blank lines, never inside a fenced code block"""
+    chunks = []
+    for section in HEADING.split(text):
+        current, in_fence = [], False
+        for line in section.splitlines(keepends=True):
+            if line.lstrip().startswith("```"):
+                in_fence = not in_fence
+            current.append(line)
+            if not in_fence and not line.strip() and len("".join(current)) > 400:
+                chunks.append("".join(current))
+                current = []
+        if "".join(current).strip():
+            chunks.append("".join(current))
+    return chunks
+
+
+def segment_keywords(segment):
+    """Identifiers and module names a segment's mocks and dependency entries would mention"""
+    keywords = {segment.name}
+    try:
+        tokens = tokenize(segment.code)
+    except TokenizeError:
+        tokens = []
+    for spec in imported_modules(tokens):
+        keywords.add(spec)
+        keywords.add(spec.rstrip("/").split("/")[-1].split(".")[0])
+    keywords.update(t.value for t in tokens if t.kind == "ident" and len(t.value) > 2)
+    deps = re.search(r"Dependencies for Mocking\s*\n(.*?)(?:\n#|\Z)", segment.text, re.DOTALL)
+    if deps:
+        keywords.update(WORD.findall(deps.group(1)))
+    return {k for k in keywords if k and k.lower() not in COMMON}
+
+
+def segment_modules(segment, source_code=""):
+    """Specifiers the segment imports itself, plus the source file's imports it refers to"""
+    keywords = {k.lower() for k in segment_keywords(segment)}
+    try:
+        tokens = tokenize(segment.code)
+    except TokenizeError:
+        tokens = []
+    specs = list(imported_modules(tokens))
+    try:
+        source_specs = imported_modules(tokenize(source_code)) if source_code else []
+    except TokenizeError:
+        source_specs = []
+    for spec in source_specs:
+        stem = spec.rstrip("/").split("/")[-1].split(".")[0].lower()
+        if spec.lower() in keywords or stem in keywords:
+            specs.append(spec)
+    return list(dict.fromkeys(specs))
+
+
+def prune(text, keywords, budget):
+    """The chunks of `text` that mention `keywords`, most relevant first, kept in original order within budget"""
+    chunks = _chunks(text)
+    scored = []
+    for i, chunk in enumerate(chunks):
+        words = set(WORD.findall(chunk))
+        score = len(words & keywords) + sum(k in chunk for k in keywords if not WORD.fullmatch(k))
+        if score:
+            scored.append((score, i, chunk))
+    kept, used = [], 0
+    for score, i, chunk in sorted(scored, key=lambda s: (-s[0], s[1])):
+        cost = estimate_tokens(chunk)
+        if used + cost <= budget:
+            kept.append((i, chunk))
+            used += cost
+    return "".join(chunk for _, chunk in sorted(kept)).strip()
+
+
+class ContextAssembler:
+    """Builds per-segment task context within a token budget and tallies the tokens it saved"""
+
+    def __init__(self, budget_tokens=6000):
+        self.budget_tokens = budget_tokens
+        self.original_tokens = 0
+        self.sent_tokens = 0
+        self._lock = threading.Lock()
+
+    def for_segment(self, segment, mocks="", dependencies="", extra=""):
+        """The segment's own block in full, plus the slices of the mock and dependency outputs it references"""
+        keywords = segment_keywords(segment)
+        remaining = max(self.budget_tokens - estimate_tokens(segment.text) - estimate_tokens(extra), 0)
+        dep_budget = remaining * 2 // 5 if mocks else remaining
+        relevant_deps = prune(dependencies, keywords, dep_budget) if dependencies else ""
+        relevant_mocks = prune(mocks, keywords, remaining - estimate_tokens(relevant_deps)) if mocks else ""
+
+        parts = [segment.text]
+        if relevant_deps:
+            parts.append(f"Relevant project dependencies:\n{relevant_deps}")
+        if relevant_mocks:
+            parts.append(f"Relevant mocks:\n{relevant_mocks}")
+        if extra:
+            parts.append(extra)
+        context = "\n\n".join(parts)
+        with self._lock:
+            self.original_tokens += estimate_tokens(segment.text) + estimate_tokens(mocks) \
+                + estimate_tokens(dependencies) + estimate_tokens(extra)
+            self.sent_tokens += estimate_tokens(context)
+        return context
+
+    def report(self):
+        saved = max(self.original_tokens - self.sent_tokens, 0)
+        return ContextReport(
+            original_tokens=self.original_tokens,
+            sent_tokens=self.sent_tokens,
+            saved_tokens=saved,
+            saved_ratio=saved / self.original_tokens if self.original_tokens else 0.0,
+        )
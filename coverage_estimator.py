@@ -0,0 +1,241 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from js_checks import TEST_CALLS, TokenizeError, tokenize
+
+KEYWORDS = {
+    "if", "else", "return", "const", "let", "var", "function", "async", "await", "new", "this", "true", "false",
+    "null", "undefined", "typeof", "instanceof", "try", "catch", "finally", "throw", "switch", "case", "default",
+    "break", "continue", "for", "while", "do", "in", "of", "class", "extends", "super", "req", "res", "next",
+    "err", "error", "json", "status", "send", "body", "params", "query", "message", "length",
+}
+
+
+class CoverageItem(BaseModel):
+    kind: str  # function, branch, early-return, else, case, catch
+    function: str
+    line: int
+    label: str
+    covered: bool
+    evidence: str = ""
+
+
+class CoverageReport(BaseModel):
+    percent: int
+    items: List[CoverageItem]
+
+    def uncovered(self):
+        return [item for item in self.items if not item.covered]
+
+    def summary(self):
+        lines = [f"Estimated coverage: {self.percent}% ({len(self.items) - len(self.uncovered())}/{len(self.items)} units)"]
+        for item in self.uncovered():
+            lines.append(f"- uncovered {item.kind} in {item.function} (line {item.line}): {item.label}")
+        return "\n".join(lines)
+
+
+def _match(tokens, i):
+    """Index of the bracket closing the one at tokens[i]"""
+    depth = 0
+    for j in range(i, len(tokens)):
+        if tokens[j].kind != "punct":
+            continue
+        if tokens[j].value in "([{":
+            depth += 1
+        elif tokens[j].value in ")]}":
+            depth -= 1
+            if depth == 0:
+                return j
+    return len(tokens) - 1
+
+
+def _statement_end(tokens, i):
+    """End of a brace-less if/else body starting at tokens[i]"""
+    j = i
+    while j < len(tokens):
+        if tokens[j].kind == "punct" and tokens[j].value in "([{":
+            j = _match(tokens, j)
+        elif tokens[j].value in (";", "}"):
+            return j
+        j += 1
+    return len(tokens) - 1
+
+
+def _body(tokens, i):
+    """(start, end) token range of the statement or block starting at tokens[i]"""
+    if i < len(tokens) and tokens[i].value == "{":
+        return i, _match(tokens, i)
+    return i, _statement_end(tokens, i)
+
+
+def _functions(tokens):
+    """(name, body_start, body_end) for each named function in the source"""
+    found = []
+    for i, token in enumerate(tokens):
+        if token.kind != "ident" or token.value in KEYWORDS:
+            continue
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+        prev = tokens[i - 1] if i else None
+        if nxt is None:
+            continue
+        start = None
+        if prev is not None and prev.value == "function" and nxt.value == "(":
+            start = _match(tokens, i + 1) + 1
+        elif nxt.value in ("=", ":"):
+            j = i + 2
+            if j < len(tokens) and tokens[j].value == "async":
+                j += 1
+            if j < len(tokens) and tokens[j].value == "function":
+                j += 1 + (tokens[j + 1].kind == "ident")
+                start = _match(tokens, j) + 1 if j < len(tokens) else None
+            elif j < len(tokens) and tokens[j].value == "(":
+                close = _match(tokens, j)
+                if close + 1 < len(tokens) and tokens[close + 1].value == "=>":
+                    start = close + 2
+            elif j + 1 < len(tokens) and tokens[j].kind == "ident" and tokens[j + 1].value == "=>":
+                start = j + 2
+        elif nxt.value == "(" and (prev is None or prev.value in ("{", "}", ";", ",", "async", "static")):
+            close = _match(tokens, i + 1)
+            if close + 1 < len(tokens) and tokens[close + 1].value == "{":
+                start = close + 1
+        if start is not None and start < len(tokens):
+            body_start, body_end = _body(tokens, start)
+            found.append((token.value, body_start, body_end))
+    return found
+
+
+def _evidence(tokens):
+    """Distinctive literals and called members in an arm's body that a test taking it would likely mention"""
+    keys = set()
+    for i, token in enumerate(tokens):
+        if token.kind == "string" and len(token.value) > 3:
+            keys.add(token.value[1:-1])
+        elif token.kind == "number" and token.value not in ("0", "1"):
+            keys.add(token.value)
+        elif token.kind == "ident" and token.value not in KEYWORDS and len(token.value) > 2 and i \
+                and tokens[i - 1].value in (".", "?.") and i + 1 < len(tokens) and tokens[i + 1].value == "(":
+            keys.add(token.value)
+    return keys
+
+
+def _block_end(tokens, i, end):
+    """Index of the '}' closing the block that holds tokens[i], or `end`"""
+    j = i
+    while j < end:
+        if tokens[j].kind == "punct" and tokens[j].value in "([{":
+            j = _match(tokens, j)
+        elif tokens[j].value == "}":
+            return j
+        j += 1
+    return end
+
+
+def _test_cases(test_tokens):
+    """Token-value sets of each it()/test() block, or of the whole file if it has none"""
+    cases = []
+    for i, token in enumerate(test_tokens):
+        if token.kind == "ident" and token.value in TEST_CALLS and i + 1 < len(test_tokens):
+            j = i + 1
+            while j + 1 < len(test_tokens) and test_tokens[j].value == "." and test_tokens[j + 1].kind == "ident":
+                j += 2
+            if test_tokens[j].value == "(":
+                cases.append(_values(test_tokens[j:_match(test_tokens, j) + 1]))
+    return cases or [_values(test_tokens)]
+
+
+def _values(tokens):
+    return {t.value[1:-1] if t.kind == "string" else t.value for t in tokens}
+
+
+def _label(tokens):
+    return " ".join(t.value for t in tokens)[:80]
+
+
+def estimate_coverage(source_code, test_code) -> Optional[CoverageReport]:
+    """Reproducible coverage estimate from static matching of source units against test cases.
+
+    A function counts as covered when some test case references it by name; a branch when a
+    test case that references its function also mentions what the branch's body returns or
+    calls (literals, status codes, called members). The condition is not evidence: a test
+    names the same variables whichever way the condition goes. An implicit else counts as
+    covered when such a test case mentions what runs after the if without mentioning the arm.
+    Returns None if the source has no functions to measure.
+    """
+    try:
+        tokens = tokenize(source_code)
+        test_tokens = tokenize(test_code)
+    except TokenizeError:
+        return None
+    functions = _functions(tokens)
+    if not functions:
+        return None
+    cases = _test_cases(test_tokens)
+    items = []
+    seen = set()
+    # innermost functions first, so a nested function's branches are attributed to it
+    for name, start, end in sorted(functions, key=lambda f: f[2] - f[1]):
+        calling = [case for case in cases if name in case]
+        items.append(CoverageItem(kind="function", function=name, line=tokens[start].line, label=name,
+                                  covered=bool(calling), evidence=name if calling else ""))
+
+        def arm(kind, line, label, body_tokens):
+            keys = _evidence(body_tokens)
+            hits = sorted(keys & set().union(*calling)) if calling and keys else []
+            items.append(CoverageItem(kind=kind, function=name, line=line, label=label,
+                                      covered=bool(hits), evidence=", ".join(hits[:5])))
+            return keys
+
+        i = start + 1
+        while i < end:
+            token = tokens[i]
+            if i in seen:
+                i += 1
+                continue
+            seen.add(i)
+            if token.value == "if" and i + 1 < end and tokens[i + 1].value == "(":
+                cond_end = _match(tokens, i + 1)
+                arm_start, arm_end = _body(tokens, cond_end + 1)
+                arm_tokens = tokens[arm_start:arm_end + 1]
+                early = any(t.value in ("return", "throw") for t in tokens[arm_start:arm_end + 1])
+                keys = arm("early-return" if early else "branch", token.line,
+                           f"if {_label(tokens[i + 1:cond_end + 1])}", arm_tokens)
+                nxt = arm_end + 1
+                if nxt < end and tokens[nxt].value == "else":
+                    if nxt + 1 < end and tokens[nxt + 1].value == "if":
+                        i = nxt + 1
+                        continue
+                    else_start, else_end = _body(tokens, nxt + 1)
+                    arm("else", tokens[nxt].line, f"else of if {_label(tokens[i + 1:cond_end + 1])}",
+                        tokens[else_start:else_end + 1])
+                else:
+                    after = _evidence(tokens[nxt:_block_end(tokens, nxt, end)])
+                    skipped = [case for case in calling if not (keys & case)]
+                    hits = sorted(after & set().union(*skipped)) if skipped and after else []
+                    items.append(CoverageItem(kind="else", function=name, line=token.line,
+                                              label=f"if {_label(tokens[i + 1:cond_end + 1])} not taken",
+                                              covered=bool(hits) if after else bool(skipped),
+                                              evidence=", ".join(hits[:5])))
+            elif token.value in ("case", "default") and token.kind == "ident":
+                j = i + 1
+                while j < end and tokens[j].value != ":":
+                    j += 1
+                k = j + 1
+                while k < end and tokens[k].value not in ("case", "default", "}"):
+                    k = _match(tokens, k) + 1 if tokens[k].value in ("(", "[", "{") else k + 1
+                arm("case", token.line, _label(tokens[i:j]), tokens[j + 1:k])
+            elif token.value == "catch" and token.kind == "ident":
+                j = i + 1
+                if j < end and tokens[j].value == "(":
+                    j = _match(tokens, j) + 1
+                body_start, body_end = _body(tokens, j)
+                arm("catch", token.line, "catch", tokens[body_start:body_end + 1])
+            elif token.value == "?" and token.kind == "punct":
+                items.append(CoverageItem(kind="branch", function=name, line=token.line,
+                                          label=f"ternary {_label(tokens[max(start, i - 4):i + 1])}",
+                                          covered=bool(calling) and len(calling) > 1))
+            i += 1
+
+    items.sort(key=lambda item: (item.line, item.kind != "function"))
+    covered = sum(item.covered for item in items)
+    return CoverageReport(percent=round(100 * covered / len(items)), items=items)
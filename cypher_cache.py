@@ -0,0 +1,133 @@
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# cheap stamp that changes when the code graph is re-imported or nodes/relationships are added or
+# removed; edits that keep both counts don't change it, which is what CypherCache's max_age is for
+VERSION_QUERY = "MATCH (n) WITH count(n) AS nodes MATCH ()-[r]->() RETURN nodes, count(r) AS relationships"
+
+
+def normalize_question(question):
+    """Collapse case, punctuation and filler so near-identical questions share a cache entry"""
+    text = re.sub(r"[^\w\s./-]", " ", question.lower())
+    text = re.sub(r"\s+", " ", text).strip(" .")
+    return re.sub(r"^(?:please |can you |could you |tell me )+", "", text)
+
+
+class _LRU:
+    def __init__(self, max_entries, max_age):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.entries = OrderedDict()  # key -> (value, stored at)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key in self.entries:
+            value, stored_at = self.entries[key]
+            if time.time() - stored_at <= self.max_age:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self.entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        self.entries[key] = (value, time.time())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self.entries)}
+
+
+class CypherCache:
+    """Memoizes a GraphCypherQAChain's NL->Cypher generation and its graph queries.
+
+    Both caches are keyed on a graph version stamp, so re-importing the code graph invalidates
+    them. The stamp comes from version_fn (default: node/relationship counts) and is re-read at
+    most every version_ttl seconds. The default stamp misses edits that keep both counts, so
+    every entry also expires max_age seconds after it was stored.
+    """
+
+    def __init__(self, chain, version_fn=None, version_ttl=60, max_age=600, max_entries=1024):
+        if not max_age or max_age <= 0:
+            raise ValueError("max_age must be a positive number of seconds")
+        self.graph = chain.graph
+        self.version_fn = version_fn or (lambda: json.dumps(self.graph.query(VERSION_QUERY), default=str))
+        self.version_ttl = version_ttl
+        self.cypher = _LRU(max_entries, max_age)
+        self.results = _LRU(max_entries, max_age)
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        chain.graph = _CachedGraph(self)
+        chain.cypher_generation_chain = _CachedCypherGeneration(self, chain.cypher_generation_chain)
+
+    def version(self):
+        now = time.time()
+        if self._version is None or now - self._checked_at > self.version_ttl:
+            self._version = self.version_fn()
+            self._checked_at = now
+        return self._version
+
+    def invalidate(self):
+        """Force a version re-check on the next lookup, e.g. right after re-importing the graph"""
+        self._version = None
+
+    def stats(self):
+        return {"cypher": self.cypher.stats(), "results": self.results.stats()}
+
+
+class _CachedGraph:
+    def __init__(self, cache):
+        self._cache = cache
+
+    def query(self, query, params=None):
+        cache = self._cache
+        key = (cache.version(), query, json.dumps(params or {}, sort_keys=True, default=str))
+        with cache._lock:
+            result = cache.results.get(key)
+        if result is None:
+            result = cache.graph.query(query, params or {})
+            with cache._lock:
+                cache.results.set(key, result)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._cache.graph, name)
+
+
+class _CachedCypherGeneration:
+    """Stands in for the chain's cypher_generation_chain, which is called with invoke() or run()"""
+
+    def __init__(self, cache, generation):
+        self._cache = cache
+        self._generation = generation
+
+    def _cached(self, method, inputs, *args, **kwargs):
+        cache = self._cache
+        question = inputs.get("question", "") if isinstance(inputs, dict) else str(inputs)
+        key = (cache.version(), normalize_question(question))
+        with cache._lock:
+            cypher = cache.cypher.get(key)
+        if cypher is None:
+            cypher = getattr(self._generation, method)(inputs, *args, **kwargs)
+            with cache._lock:
+                cache.cypher.set(key, cypher)
+        return cypher
+
+    def invoke(self, inputs, *args, **kwargs):
+        return self._cached("invoke", inputs, *args, **kwargs)
+
+    def run(self, inputs, *args, **kwargs):
+        return self._cached("run", inputs, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._generation, name)
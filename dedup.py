@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import posixpath
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import List
+
+from pydantic import BaseModel
+
+from context_pruning import segment_modules
+from js_checks import TokenizeError, declared_names, imported_modules, mocked_modules, tokenize
+from segments import describe_blocks, extract_code, splice_block
+
+PROPERTY_ACCESS = {".", "?."}
+
+
+class SharedArtifact(BaseModel):
+    """Mocks and tests generated for one segment, reusable by structurally equivalent segments"""
+    source_path: str
+    name: str
+    bindings: List[str] = []  # the segment's own declared names, in order of first appearance
+    mocks: str = ""
+    tests: str = ""
+
+
+def _resolved_modules(segment, source_path):
+    """The segment's dependencies as project paths (relative specifiers) or package names"""
+    source = ""
+    if source_path and os.path.exists(source_path):
+        with open(source_path, errors="replace") as f:
+            source = f.read()
+    modules = []
+    for spec in segment_modules(segment, source):
+        if spec.startswith("."):
+            spec = os.path.splitext(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(source_path)), spec)))[0]
+        modules.append(spec)
+    return sorted(set(modules))
+
+
+def fingerprint(segment, source_path=""):
+    """(hash, bindings) of a segment's structure.
+
+    Whitespace and comments are ignored and the names the segment declares itself (function
+    name, parameters, locals) are replaced by their order of appearance. Free names, property
+    names, literals and the modules the segment depends on stay part of the hash, so two
+    segments only match if the same tests hold for both once the function is renamed.
+    """
+    try:
+        tokens = tokenize(segment.code)
+    except TokenizeError:
+        return None, []
+    declared = declared_names(tokens)
+    bindings = []
+    parts = []
+    for i, token in enumerate(tokens):
+        after_dot = i and tokens[i - 1].kind == "punct" and tokens[i - 1].value in PROPERTY_ACCESS
+        if token.kind == "ident" and token.value in declared and not after_dot:
+            if token.value not in bindings:
+                bindings.append(token.value)
+            parts.append(f"${bindings.index(token.value)}")
+        else:
+            parts.append(token.value)
+    parts.append("|" + "|".join(_resolved_modules(segment, source_path)))
+    return hashlib.sha256(" ".join(parts).encode("utf-8")).hexdigest(), bindings
+
+
+def _rename(code, old, new):
+    """code with the identifier `old` renamed to `new`.
+
+    Strings, property accesses (res.login) and object keys ({ login: ... }) keep the old name,
+    except keys of a destructuring pattern, which name the module's export.
+    """
+    if not old or old == new:
+        return code
+    try:
+        tokens = tokenize(code)
+    except TokenizeError:
+        return code
+    enclosing, closes, stack = [], {}, []  # innermost open bracket of each token; bracket pairs
+    for i, token in enumerate(tokens):
+        if token.kind == "punct" and token.value in ")]}" and stack:
+            closes[stack.pop()] = i
+        enclosing.append(stack[-1] if stack else None)
+        if token.kind == "punct" and token.value in "([{":
+            stack.append(i)
+    spans = []
+    for i, token in enumerate(tokens):
+        if token.kind != "ident" or token.value != old:
+            continue
+        prev = tokens[i - 1] if i else None
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+        if prev is not None and prev.value in PROPERTY_ACCESS:
+            continue
+        if nxt is not None and nxt.value == ":" and prev is not None and prev.value in ("{", ","):
+            opener = enclosing[i]
+            close = closes.get(opener) if opener is not None else None
+            if tokens[opener].value != "{" or close is None or close + 1 >= len(tokens) or tokens[close + 1].value != "=":
+                continue
+        spans.append(token.pos)
+    for pos in reversed(spans):
+        code = code[:pos] + new + code[pos + len(old):]
+    return code
+
+
+def test_directory(specs, source_path, default=None):
+    """Absolute posix directory a test's relative specifiers resolve from.
+
+    Found from the specifier that names source_path itself; `default`, or the source's own
+    directory, when none does. A directory only reached by ../ may be a "_" placeholder.
+    """
+    stem = os.path.splitext(os.path.abspath(source_path))[0].replace(os.sep, "/")
+    for spec in specs:
+        rest = posixpath.normpath(spec).lstrip("./")
+        ups = posixpath.normpath(spec).split("/").count("..")
+        if rest and stem.endswith("/" + posixpath.splitext(rest)[0]):
+            base = stem[:-len(posixpath.splitext(rest)[0]) - 1]
+            return posixpath.join(base, *(["_"] * ups))
+    return default.replace(os.sep, "/") if default else posixpath.dirname(stem)
+
+
+def _relative_specs(code):
+    try:
+        tokens = tokenize(code)
+    except TokenizeError:
+        return None
+    return [spec for spec in dict.fromkeys(imported_modules(tokens) + mocked_modules(tokens)) if spec.startswith(".")]
+
+
+def _retarget(code, origin, target, context=""):
+    """Rewrite relative module specifiers written for a test of `origin` to work for a test of `target`.
+
+    The test is assumed to sit in the same place relative to either source file; the rest of
+    the test file (`context`) helps find where when code itself never names the origin. The
+    specifier that names the origin source itself is pointed at the target source.
+    """
+    specs = _relative_specs(code)
+    if specs is None:
+        return code
+    origin_stem = os.path.splitext(os.path.abspath(origin))[0].replace(os.sep, "/")
+    target_stem = os.path.splitext(os.path.abspath(target))[0].replace(os.sep, "/")
+    test_dir = test_directory(specs + (_relative_specs(context) or []), origin)
+    offset = posixpath.relpath(test_dir, posixpath.dirname(origin_stem))
+    target_dir = posixpath.normpath(posixpath.join(posixpath.dirname(target_stem), offset))
+    for spec in specs:
+        path = posixpath.splitext(posixpath.normpath(posixpath.join(test_dir, spec)))[0]
+        if path == origin_stem:
+            path = target_stem
+        new = posixpath.relpath(path, target_dir)
+        new = new if new.startswith(".") else "./" + new
+        if new != posixpath.splitext(spec)[0]:
+            code = re.sub(rf"""(['"]){re.escape(spec)}\1""", lambda m: f"{m.group(1)}{new}{m.group(1)}", code)
+    return code
+
+
+def adapt(artifact, source_path, name, bindings):
+    """The artifact's (mocks, tests) code rewritten for an equivalent segment in source_path"""
+    # the model's prose and code fences would read as template literals to the tokenizer
+    mocks, tests = extract_code(artifact.mocks), extract_code(artifact.tests)
+    if artifact.bindings and bindings:
+        # tests only reach the segment through its top-level name
+        mocks, tests = (_rename(text, artifact.bindings[0], bindings[0]) for text in (mocks, tests))
+    if artifact.name != name:
+        for quote in "'\"`":
+            old, new = f"{quote}{artifact.name}{quote}", f"{quote}{name}{quote}"
+            mocks, tests = mocks.replace(old, new), tests.replace(old, new)
+    if os.path.abspath(artifact.source_path) != os.path.abspath(source_path):
+        mocks, tests = (_retarget(mocks, artifact.source_path, source_path, tests),
+                        _retarget(tests, artifact.source_path, source_path, mocks))
+    return mocks, tests
+
+
+class ArtifactLibrary:
+    """Persistent fingerprint -> SharedArtifact store shared by every file and run in this process.
+
+    A generated artifact is only staged for the run (owner) that produced it; it is stored,
+    and served to other files, once that run's test file passes.
+    """
+
+    def __init__(self, path=".rmjt_cache/segment_artifacts.json"):
+        self.path = path
+        self.stats = Counter()
+        self._artifacts = None
+        self._lock = threading.Lock()
+        self._claims = {}
+        self._pending = {}  # owner -> {segment name: (fingerprint, SharedArtifact)}
+
+    def _load(self):
+        if self._artifacts is None:
+            self._artifacts = {}
+            if os.path.exists(self.path):
+                with open(self.path) as f:
+                    self._artifacts = {k: SharedArtifact.model_validate(v) for k, v in json.load(f).items()}
+        return self._artifacts
+
+    def reset(self):
+        """Forget loaded, staged and claimed artifacts and the stats; the next use reads `path` again"""
+        with self._lock:
+            self._artifacts = None
+            self._pending.clear()
+            self._claims.clear()
+        self.stats.clear()
+
+    def get(self, key, owner=None):
+        """The stored artifact, else one `owner` staged itself this run"""
+        with self._lock:
+            artifact = self._load().get(key)
+            if artifact is None and owner is not None:
+                artifact = next((a for k, a in self._pending.get(owner, {}).values() if k == key), None)
+        self.stats["hits" if artifact is not None else "misses"] += 1
+        return artifact
+
+    def put(self, key, artifact):
+        with self._lock:
+            artifacts = self._load()
+            artifacts[key] = artifact
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({k: v.model_dump() for k, v in artifacts.items()}, f)
+            os.replace(tmp, self.path)
+
+    def stage(self, owner, key, artifact):
+        """Hold a freshly generated artifact until owner's test file passes"""
+        with self._lock:
+            self._pending.setdefault(owner, {})[artifact.name] = (key, artifact)
+
+    def publish(self, owner, test_code):
+        """Store owner's staged artifacts with their describe block as it stands in the passing test_code.
+
+        Blocks fixed after generation replace the generated ones; an artifact whose block is not
+        in the file was not verified and is dropped. Returns the number stored.
+        """
+        with self._lock:
+            staged = self._pending.pop(owner, {})
+        blocks = describe_blocks(test_code)
+        published = 0
+        for key, artifact in staged.values():
+            name = artifact.name.lower()
+            title = next((t for t in blocks if name in t.lower() or t.lower() in name), None)
+            tests = extract_code(artifact.tests)
+            own = describe_blocks(tests)
+            if title is None or len(own) != 1:
+                continue
+            start, end = blocks[title]
+            tests = splice_block(tests, next(iter(own)), test_code[start:end])
+            self.put(key, artifact.model_copy(update={"tests": tests}))
+            published += 1
+        return published
+
+    def discard(self, owner):
+        """Drop owner's staged artifacts; its run ended without a passing test file"""
+        with self._lock:
+            self._pending.pop(owner, None)
+
+    @contextmanager
+    def claim(self, key):
+        """Hold the fingerprint while its artifact is generated, so an equivalent segment waits and reuses it"""
+        with self._lock:
+            lock = self._claims.setdefault(key, threading.Lock())
+        with lock:
+            yield
+
+
+shared_artifacts = ArtifactLibrary()
@@ -0,0 +1,232 @@
+import os
+import re
+import threading
+from collections import defaultdict
+
+from segments import JS_COMMENT
+
+JS_EXTENSIONS = (".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs")
+SKIP_DIRS = {"node_modules", ".git", "build", "dist", "coverage", ".next", "out", "vendor"}
+
+REQUIRE = re.compile(r"""\brequire\s*\(\s*['"]([^'"]+)['"]\s*\)""")
+IMPORT_FROM = re.compile(r"""\bimport\s+(?:[\w$*{}\s,]+?\s+from\s+)?['"]([^'"]+)['"]""")
+DYNAMIC_IMPORT = re.compile(r"""\bimport\s*\(\s*['"]([^'"]+)['"]\s*\)""")
+EXPORT_ASSIGN = re.compile(r"\b(?:module\.)?exports\.([A-Za-z_$][\w$]*)\s*=")
+EXPORT_OBJECT = re.compile(r"\bmodule\.exports\s*=\s*\{([^}]*)\}")
+EXPORT_VALUE = re.compile(r"\bmodule\.exports\s*=\s*(?!\{)\S")
+# only a bare name re-exports a binding; `module.exports = mongoose.model(...)` is a default export
+EXPORT_SINGLE = re.compile(r"\bmodule\.exports\s*=\s*([A-Za-z_$][\w$]*)\s*(?:;|$)", re.MULTILINE)
+EXPORT_DECL = re.compile(r"\bexport\s+(?:default\s+)?(?:async\s+)?(?:function\*?|class|const|let|var)\s+([A-Za-z_$][\w$]*)")
+EXPORT_LIST = re.compile(r"\bexport\s*\{([^}]*)\}")
+EXPORT_DEFAULT = re.compile(r"\bexport\s+default\b")
+CALL = re.compile(r"(?<![\w$])([A-Za-z_$][\w$]*)\s*\(")
+NOT_CALLS = {"if", "for", "while", "switch", "catch", "function", "return", "require", "import", "typeof", "new", "super"}
+
+
+def _strip_comments(code):
+    return JS_COMMENT.sub(lambda m: m.group(1) or " ", code)
+
+
+def _names(listing):
+    """Exported names from the inside of an `{ a, b: c, d as e }` listing"""
+    names = []
+    for part in listing.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        part = re.split(r"\s+as\s+", part)[-1]
+        names.append(part.split(":")[0].strip())
+    return names
+
+
+def _source_files(root):
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+        for filename in filenames:
+            if filename.endswith(JS_EXTENSIONS):
+                files.append(os.path.relpath(os.path.join(dirpath, filename), root))
+    return sorted(files)
+
+
+def _stamp(root, files):
+    stamp = {}
+    for path in files:
+        try:
+            stamp[path] = os.stat(os.path.join(root, path)).st_mtime_ns
+        except OSError:
+            pass
+    return stamp
+
+
+class DependencyIndex:
+    """In-memory import/export/call index of a JS project, built from its require/import statements"""
+
+    QUESTIONS = [
+        (r"^where is (.+?) (?:called|used|invoked)$", "callers_of"),
+        (r"^(?:who|what|which (?:files?|modules?|functions?)) (?:calls?|invokes?) (.+)$", "callers_of"),
+        (r"^(?:list |show |get )?(?:the |all )?callers (?:of|for) (.+)$", "callers_of"),
+        (r"^(?:what|which)(?: modules| files| dependencies)? (?:does|do) (.+?) (?:import|require|depend on)$", "imports_of"),
+        (r"^(?:list |show |get )?(?:the |all )?(?:imports|dependencies|requires) (?:of|for|in) (.+)$", "imports_of"),
+        (r"^(?:who|what|which (?:files?|modules?)) (?:imports?|requires?|depends on) (.+)$", "importers_of"),
+        (r"^(?:list |show |get )?(?:the |all )?(?:importers|dependents) (?:of|for) (.+)$", "importers_of"),
+        (r"^(?:what|which)(?: functions| symbols)? (?:does|do) (.+?) export$", "exports_of"),
+        (r"^(?:list |show |get )?(?:the |all )?exports (?:of|from|for|in) (.+)$", "exports_of"),
+        (r"^(?:what is |get |show )?(?:the )?(?:file )?path (?:of|for|to) (.+)$", "path_of"),
+        (r"^where is (.+?)(?: defined| located)?$", "path_of"),
+    ]
+
+    def __init__(self, root):
+        self.root = root
+        self.files = []
+        self.imports = {}  # path -> [(specifier, resolved path or None)]
+        self.exports = {}  # path -> [names]
+        self.calls = defaultdict(list)  # callee name -> [(path, line)]
+        self.importers = defaultdict(set)  # path -> paths importing it
+        self.package_importers = defaultdict(set)  # package -> paths importing it
+        self.known = set()
+        self.modules = {}  # path -> lowercased module name without extension or /index
+        self.stamp = {}  # path -> mtime when the index was built
+
+    @classmethod
+    def build(cls, root):
+        index = cls(root)
+        index.files = _source_files(root)
+        index.stamp = _stamp(root, index.files)
+        index.known = set(index.files)
+        index.modules = {p: re.sub(r"(/index)?\.\w+$", "", p).lower() for p in index.files}
+        for path in index.files:
+            index.add_file(path)
+        return index
+
+    def stale(self):
+        """Whether a source file was added, removed or modified since the index was built"""
+        return _stamp(self.root, _source_files(self.root)) != self.stamp
+
+    def add_file(self, path):
+        with open(os.path.join(self.root, path), errors="replace") as f:
+            code = _strip_comments(f.read())
+        specs = REQUIRE.findall(code) + IMPORT_FROM.findall(code) + DYNAMIC_IMPORT.findall(code)
+        self.imports[path] = []
+        for spec in dict.fromkeys(specs):
+            resolved = self.resolve_specifier(path, spec)
+            self.imports[path].append((spec, resolved))
+            if resolved:
+                self.importers[resolved].add(path)
+            elif not spec.startswith("."):
+                self.package_importers[spec].add(path)
+
+        exports = EXPORT_ASSIGN.findall(code) + EXPORT_DECL.findall(code)
+        for listing in EXPORT_OBJECT.findall(code) + EXPORT_LIST.findall(code):
+            exports += _names(listing)
+        for match in EXPORT_VALUE.finditer(code):
+            single = EXPORT_SINGLE.match(code, match.start())
+            exports.append(single.group(1) if single else "default")
+        if EXPORT_DEFAULT.search(code) and not exports:
+            exports.append("default")
+        self.exports[path] = list(dict.fromkeys(exports))
+
+        for match in CALL.finditer(code):
+            name = match.group(1)
+            if name in NOT_CALLS or code[max(0, match.start() - 16):match.start()].rstrip().endswith("function"):
+                continue
+            site = (path, code.count("\n", 0, match.start()) + 1)
+            if site not in self.calls[name]:
+                self.calls[name].append(site)
+
+    def resolve_specifier(self, importer, spec):
+        """Project file a relative specifier points to, or None for packages and unknown files"""
+        if not spec.startswith("."):
+            return None
+        base = os.path.normpath(os.path.join(os.path.dirname(importer), spec))
+        candidates = [base] + [base + ext for ext in JS_EXTENSIONS] + [os.path.join(base, "index" + ext) for ext in JS_EXTENSIONS]
+        return next((c for c in candidates if c in self.known), None)
+
+    def find(self, module):
+        """Project files matching a module name, relative path or path suffix"""
+        module = module.strip().strip("'\"`").replace("\\", "/")
+        if module in self.imports:
+            return [module]
+        stem = re.sub(r"\.(js|jsx|ts|tsx|mjs|cjs)$", "", module).lstrip("./").lower()
+        suffix = [p for p, name in self.modules.items() if name == stem or name.endswith("/" + stem)]
+        if suffix:
+            return suffix
+        return [p for p in self.files if os.path.splitext(os.path.basename(p))[0].lower() == os.path.basename(stem)]
+
+    def imports_of(self, module):
+        return {path: self.imports[path] for path in self.find(module)}
+
+    def exports_of(self, module):
+        return {path: self.exports[path] for path in self.find(module)}
+
+    def importers_of(self, module):
+        paths = self.find(module)
+        if not paths and module in self.package_importers:
+            return {module: sorted(self.package_importers[module])}
+        return {path: sorted(self.importers[path]) for path in paths}
+
+    def callers_of(self, name):
+        name = name.strip().strip("'\"`()")
+        name = name.split(".")[-1]
+        return {name: self.calls[name]} if name in self.calls else {}
+
+    def path_of(self, module):
+        paths = self.find(module)
+        return {module: [os.path.join(self.root, p) for p in paths]} if paths else {}
+
+    def answer(self, question):
+        """Answer a common structured question locally, or None if it needs the graph chain"""
+        text = question.strip().rstrip("?.! ").strip()
+        for pattern, method in self.QUESTIONS:
+            match = re.match(pattern, text, re.IGNORECASE)
+            if not match:
+                continue
+            subject = match.group(1).strip().strip("'\"`")
+            subject = re.sub(r"^(?:the )?(?:file|module|function) ", "", subject, flags=re.IGNORECASE)
+            result = getattr(self, method)(subject)
+            if not result:
+                return None
+            return self._format(method, result)
+        return None
+
+    def _format(self, method, result):
+        lines = []
+        for key, values in result.items():
+            lines.append(f"{method.replace('_', ' ')} {key}:")
+            if not values:
+                lines.append("- (none)")
+            for value in values:
+                if method == "imports_of":
+                    spec, resolved = value
+                    lines.append(f"- {spec} -> {os.path.join(self.root, resolved) if resolved else 'package'}")
+                elif method == "callers_of":
+                    path, line = value
+                    lines.append(f"- {os.path.join(self.root, path)}:{line}")
+                elif method == "importers_of":
+                    lines.append(f"- {os.path.join(self.root, value)}")
+                else:
+                    lines.append(f"- {value}")
+        return "\n".join(lines)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def index_for(root, refresh=False):
+    """Build the index for a project once per process; fan-out workers may ask for it concurrently.
+
+    With refresh, an index whose source files changed on disk since it was built is rebuilt;
+    callers that start new work on a project pass it, lookups within one run reuse the index.
+    """
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None or (refresh and index.stale()):
+            index = _indexes[root] = DependencyIndex.build(root)
+        return index
+
+
+def clear_indexes():
+    """Drop every built index, so the next index_for call rebuilds from disk"""
+    with _indexes_lock:
+        _indexes.clear()
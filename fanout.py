@@ -0,0 +1,87 @@
+import contextvars
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from dedup import SharedArtifact, adapt, fingerprint, shared_artifacts
+from segments import SegmentEntry
+
+
+def generate_segment(en_gen, segment, dependencies="", feedback=" ", reuse=True):
+    """Mocks and tests for one segment, shared with structurally equivalent segments of any file.
+
+    The first segment with a given fingerprint is generated (mocks, then tests, each call
+    seeing only that segment's context) and staged; once this file's tests pass, equivalent
+    segments in other files and later runs reuse it adapted to their own names and import
+    paths. Feedback always regenerates, and reuse=False never serves a shared artifact.
+    """
+    key, bindings = fingerprint(segment, en_gen.source_path)
+    if key is None or feedback.strip():
+        return _generate_segment(en_gen, segment, dependencies, feedback)
+    owner = en_gen.output_dir
+    with shared_artifacts.claim(key):
+        shared = shared_artifacts.get(key, owner) if reuse else None
+        if shared is not None:
+            mocks, tests = adapt(shared, en_gen.source_path, segment.name, bindings)
+            return SegmentEntry(hash=segment.hash, mocks=mocks, tests=tests)
+        entry = _generate_segment(en_gen, segment, dependencies, feedback)
+        shared_artifacts.stage(owner, key, SharedArtifact(source_path=en_gen.source_path, name=segment.name,
+                                                          bindings=bindings, mocks=entry.mocks, tests=entry.tests))
+        return entry
+
+
+def _generate_segment(en_gen, segment, dependencies, feedback):
+    assembler = en_gen.context_assembler
+    # the new_rmjt crew looks every dependency of the segment up in one batched graph query
+    lookup = getattr(en_gen, "segment_dependencies", None)
+    if lookup is not None:
+        dependencies = "\n\n".join(part for part in (dependencies, lookup(segment)) if part)
+    mocks = en_gen.run_task(
+        "mock_generator_task",
+        context=assembler.for_segment(segment, dependencies=dependencies),
+    ).raw
+    tests = en_gen.run_task(
+        "test_case_generator_task",
+        context=assembler.for_segment(segment, mocks=mocks),
+        inputs={"feedback": feedback},
+    ).raw
+    return SegmentEntry(hash=segment.hash, mocks=mocks, tests=tests)
+
+
+def generate_segments(en_gen, segments, dependencies="", feedback=" ", max_workers=4, reuse=True):
+    """Generate every segment, at most max_workers at a time.
+
+    crewai agents and tasks hold per-call state, so each worker borrows its own clone of
+    en_gen from a pool rather than sharing the memoized tasks. A failing segment does not
+    stop the others. Returns {segment name: SegmentEntry or the exception it raised}, in
+    segment order. reuse=False bypasses the shared artifact library.
+    """
+    results = {}
+    if max_workers <= 1 or len(segments) <= 1:
+        for segment in segments:
+            try:
+                results[segment.name] = generate_segment(en_gen, segment, dependencies, feedback, reuse)
+            except Exception as e:
+                results[segment.name] = e
+        return results
+
+    workers = min(max_workers, len(segments))
+    pool = queue.Queue()
+    for _ in range(workers):
+        pool.put(en_gen.clone())
+
+    def work(segment):
+        generator = pool.get()
+        try:
+            return generate_segment(generator, segment, dependencies, feedback, reuse)
+        finally:
+            pool.put(generator)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # each worker runs in a copy of the caller's context, so tracing and streaming state carry over
+        futures = [(segment, executor.submit(contextvars.copy_context().run, work, segment)) for segment in segments]
+    for segment, future in futures:
+        try:
+            results[segment.name] = future.result()
+        except Exception as e:
+            results[segment.name] = e
+    return results
@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+MODULE_SUFFIXES = ["", ".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs", "/index.js", "/index.ts"]
+# one round trip for every module a segment depends on; rows come back in $modules order
+DEPENDENCY_QUERY = """
+UNWIND range(0, size($modules) - 1) AS i
+WITH i, $modules[i] AS module
+OPTIONAL MATCH (f:File)
+  WHERE f.name = module OR any(suffix IN $suffixes WHERE f.path = module + suffix OR f.path ENDS WITH ('/' + module + suffix))
+OPTIONAL MATCH (f)-[:EXPORTS|DEFINES|CONTAINS]->(symbol)
+OPTIONAL MATCH (f)-[:IMPORTS]->(dependency:File)
+OPTIONAL MATCH (importer:File)-[:IMPORTS]->(f)
+RETURN i, module, f.path AS path,
+       collect(DISTINCT symbol.name) AS exports,
+       collect(DISTINCT dependency.path) AS imports,
+       collect(DISTINCT importer.path) AS importers
+ORDER BY i
+"""
+
+
+class ModuleInfo(BaseModel):
+    module: str
+    path: str = ""
+    exports: List[str] = []
+    imports: List[str] = []
+    importers: List[str] = []
+    source: str = ""  # graph, index or "" when neither knows the module
+
+
+class DependencyBundle(BaseModel):
+    modules: Dict[str, ModuleInfo] = {}
+    graph_queries: int = 0
+
+    def text(self):
+        """One short section per module, headed so context pruning can keep the relevant ones"""
+        sections = []
+        for info in self.modules.values():
+            if not info.source:
+                sections.append(f"### {info.module}\nNot found in the project; mock it as an external package.")
+                continue
+            lines = [f"### {info.module}", f"Path: {info.path}"]
+            if info.exports:
+                lines.append("Exports: " + ", ".join(info.exports))
+            if info.imports:
+                lines.append("Imports: " + ", ".join(info.imports))
+            if info.importers:
+                lines.append("Imported by: " + ", ".join(info.importers[:10]))
+            sections.append("\n".join(lines))
+        return "\n\n".join(sections)
+
+
+def _module_name(spec):
+    """Module key for a require/import specifier: './models/User.js' -> 'models/User'"""
+    spec = spec.strip().strip("'\"`")
+    while spec.startswith(("./", "../")):
+        spec = spec.split("/", 1)[1]
+    return os.path.splitext(spec)[0] if spec.endswith((".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs")) else spec
+
+
+def dependency_bundle(specs, graph=None, index=None):
+    """Dependency details for every specifier in one batched graph query.
+
+    Modules the graph does not know (or every module, without a graph) are filled from the
+    local DependencyIndex when one is given. A failing graph is treated as an empty one.
+    """
+    modules = list(dict.fromkeys(_module_name(spec) for spec in specs if spec.strip()))
+    bundle = DependencyBundle(modules={m: ModuleInfo(module=m) for m in modules})
+    if graph is not None and modules:
+        try:
+            rows = graph.query(DEPENDENCY_QUERY, {"modules": modules, "suffixes": MODULE_SUFFIXES})
+            bundle.graph_queries += 1
+        except Exception:
+            rows = []
+        for row in rows:
+            info = bundle.modules.get(row.get("module"))
+            if info is not None and row.get("path"):
+                info.path = row["path"]
+                info.exports = [e for e in row.get("exports") or [] if e]
+                info.imports = [i for i in row.get("imports") or [] if i]
+                info.importers = [i for i in row.get("importers") or [] if i]
+                info.source = "graph"
+    if index is not None:
+        for info in bundle.modules.values():
+            if info.source:
+                continue
+            paths = index.find(info.module)
+            if paths:
+                path = paths[0]
+                info.path = path
+                info.exports = index.exports.get(path, [])
+                info.imports = [resolved or spec for spec, resolved in index.imports.get(path, [])]
+                info.importers = sorted(index.importers.get(path, []))
+                info.source = "index"
+    return bundle
+
+
+class Neo4jPool:
+    """Process-wide Neo4j driver; each query borrows a pooled session.
+
+    Configured from the NEO4J_URI / NEO4J_USERNAME / NEO4J_PASSWORD / NEO4J_DATABASE variables that
+    langchain's Neo4jGraph reads. query() matches Neo4jGraph.query, so either can back the lookups.
+    """
+
+    def __init__(self, uri=None, username=None, password=None, database=None, max_pool_size=20, retry_after=60):
+        self.uri = uri or os.environ.get("NEO4J_URI", "bolt://localhost:7687")
+        self.auth = (username or os.environ.get("NEO4J_USERNAME", "neo4j"), password or os.environ.get("NEO4J_PASSWORD", ""))
+        self.database = database or os.environ.get("NEO4J_DATABASE", "neo4j")
+        self.max_pool_size = max_pool_size
+        # after a connection failure, fail fast for retry_after seconds instead of waiting out timeouts
+        self.retry_after = retry_after
+        self._down_until = 0.0
+        self._driver = None
+        self._lock = threading.Lock()
+
+    @property
+    def driver(self):
+        with self._lock:
+            if self._driver is None:
+                from neo4j import GraphDatabase
+
+                self._driver = GraphDatabase.driver(self.uri, auth=self.auth,
+                                                    max_connection_pool_size=self.max_pool_size)
+            return self._driver
+
+    def query(self, query, params=None):
+        if time.time() < self._down_until:
+            raise ConnectionError(f"Neo4j at {self.uri} is unavailable")
+        try:
+            with self.driver.session(database=self.database) as session:
+                return [record.data() for record in session.run(query, params or {})]
+        except Exception as e:
+            if isinstance(e, (ImportError, OSError)) or type(e).__name__ in ("ServiceUnavailable", "AuthError"):
+                self._down_until = time.time() + self.retry_after
+            raise
+
+    def close(self):
+        with self._lock:
+            if self._driver is not None:
+                self._driver.close()
+                self._driver = None
+
+
+class InMemoryGraph:
+    """In-process stand-in for the code graph that answers DEPENDENCY_QUERY from a DependencyIndex"""
+
+    def __init__(self, index):
+        self.index = index
+        self.queries = 0
+
+    def query(self, query, params=None):
+        self.queries += 1
+        if query != DEPENDENCY_QUERY:
+            return []
+        rows = []
+        for i, module in enumerate((params or {}).get("modules", [])):
+            paths = self.index.find(module)
+            path = paths[0] if paths else None
+            rows.append({
+                "i": i, "module": module, "path": path,
+                "exports": self.index.exports.get(path, []) if path else [],
+                "imports": [resolved for _, resolved in self.index.imports.get(path, []) if resolved] if path else [],
+                "importers": sorted(self.index.importers.get(path, [])) if path else [],
+            })
+        return rows
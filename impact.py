@@ -0,0 +1,96 @@
+import os
+import re
+import subprocess
+from typing import List
+
+from pydantic import BaseModel
+
+from dependency_index import JS_EXTENSIONS, index_for
+
+TEST_FILE = re.compile(r"(\.(test|spec)\.\w+$)|(^|/)(__tests__|__mocks__)/")
+
+
+class Impact(BaseModel):
+    path: str  # relative to the project root
+    distance: int  # 0: the file itself changed, 1: imports a changed file, ...
+    changed: List[str] = []  # changed files it (transitively) imports, or itself
+
+
+def changed_files(diff_range, project_root):
+    """Paths under project_root, relative to it, touched by `git diff <diff_range>`"""
+    out = subprocess.run(["git", "-C", project_root, "diff", "--name-only", "--relative", diff_range],
+                         capture_output=True, text=True, check=True).stdout
+    return [line.strip() for line in out.splitlines() if line.strip()]
+
+
+def _importers_of_missing(index, path):
+    """Files whose unresolved relative imports point at `path`, a file the diff deleted or renamed"""
+    stem = re.sub(r"(/index)?\.\w+$", "", path)
+    importers = set()
+    for importer, imports in index.imports.items():
+        for spec, resolved in imports:
+            if resolved is None and spec.startswith("."):
+                base = os.path.normpath(os.path.join(os.path.dirname(importer), spec))
+                if re.sub(r"(/index)?\.\w+$", "", base) == stem:
+                    importers.add(importer)
+    return importers
+
+
+def impacted_files(changed, index, max_depth=1):
+    """Source files whose tests or mocks a change to `changed` makes stale, most affected first.
+
+    A changed file needs new tests; a file importing it (distance 1) needs new mocks for it.
+    Further importers (up to max_depth, None for no limit) only see the change through mocks
+    and come last. Test files are never targets. Ties go to files reaching more changed files.
+    """
+    reached = {}  # path -> (distance, changed files)
+    for path in changed:
+        if not path.endswith(JS_EXTENSIONS):
+            continue
+        if path in index.known:
+            reached[path] = (0, {path})
+            continue
+        for importer in _importers_of_missing(index, path):
+            distance, sources = reached.get(importer, (1, set()))
+            reached[importer] = (min(distance, 1), sources | {path})
+
+    frontier = list(reached)
+    while frontier:
+        following = []
+        for path in dict.fromkeys(frontier):
+            distance, sources = reached[path]
+            if max_depth is not None and distance >= max_depth:
+                continue
+            for importer in index.importers.get(path, ()):
+                if importer in reached and reached[importer][0] <= distance:
+                    continue
+                known = reached.get(importer, (distance + 1, set()))[1]
+                if not known >= sources:
+                    reached[importer] = (distance + 1, known | sources)
+                    following.append(importer)
+        frontier = following
+
+    impacts = [Impact(path=path, distance=distance, changed=sorted(sources))
+               for path, (distance, sources) in reached.items() if not TEST_FILE.search(path)]
+    return sorted(impacts, key=lambda i: (i.distance, -len(i.changed), -len(index.importers.get(i.path, ())), i.path))
+
+
+def impact_analysis(diff_range, project_root, max_depth=1):
+    """Impacted source files of a git diff range, from the project's local import graph"""
+    return impacted_files(changed_files(diff_range, project_root), index_for(project_root, refresh=True), max_depth)
+
+
+async def generate_impacted(diff_range, project_root, output_root="rmjt_tests", max_files=None, max_depth=1, **kwargs):
+    """Run the RMJT flow only on the files a diff makes stale, in priority order.
+
+    max_files caps the batch after prioritizing; remaining keyword arguments go to generate_many.
+    Returns (impacts, generate_many's results).
+    """
+    from ai_feedback_loop import generate_many
+
+    impacts = impact_analysis(diff_range, project_root, max_depth)
+    if max_files is not None:
+        impacts = impacts[:max_files]
+    paths = [os.path.join(project_root, impact.path) for impact in impacts]
+    results = await generate_many(paths, output_root=output_root, project_root=project_root, **kwargs) if paths else {}
+    return impacts, results
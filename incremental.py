@@ -0,0 +1,63 @@
+import os
+
+from crewai.tasks.task_output import TaskOutput
+
+from fanout import generate_segments
+from segments import Manifest, parse_segments
+
+
+def manifest_path(en_gen):
+    return os.path.join(en_gen.output_dir, "manifest.json")
+
+
+def set_task_output(task, raw):
+    """Overwrite a task's in-memory output; downstream run_task calls take their context from it"""
+    task.output = TaskOutput(description=task.description, raw=raw, agent=task.agent.role)
+
+
+def regenerate_incremental(en_gen, feedback=" ", max_workers=1, reuse=True):
+    """Regenerate mocks and tests only for segments whose normalized source changed.
+
+    Segments are taken from a fresh code_segmentation_task run, compared against the
+    manifest in the output directory (every segment counts as changed, and nothing is
+    taken from the shared artifact library, when reuse is False), generated max_workers at
+    a time, and code.test.js is reassembled from every segment's stored tests with their
+    headers merged. A segment that fails to generate is left out of the file and the
+    manifest, so the next run retries it.
+    Returns (test_code, names of regenerated segments, {failed segment name: error}).
+    """
+    path = manifest_path(en_gen)
+    manifest = Manifest.load(path)
+    segmentation = en_gen.run_task("code_segmentation_task")
+    segments = parse_segments(segmentation.raw)
+    entries = {segment.name: manifest.find(segment) if reuse else None for segment in segments}
+    changed = [segment for segment in segments if entries[segment.name] is None]
+    # only the rmjt.py crew has a directory map to draw dependency entries from; the crew never
+    # runs in this path, so the map is made here, once, unless a restored output is in place
+    dependencies = ""
+    if changed and hasattr(en_gen, "directory_structure_task"):
+        directory = en_gen.directory_structure_task().output or en_gen.run_task("directory_structure_task")
+        dependencies = directory.raw
+    generated = generate_segments(en_gen, changed, dependencies, feedback, max_workers, reuse)
+    if changed and all(isinstance(result, Exception) for result in generated.values()):
+        raise next(iter(generated.values()))
+
+    regenerated, failed = [], {}
+    for name, result in generated.items():
+        if isinstance(result, Exception):
+            failed[name] = f"{type(result).__name__}: {result}"
+            del entries[name]
+        else:
+            entries[name] = result
+            regenerated.append(name)
+
+    manifest.segments = entries
+    manifest.order = [segment.name for segment in segments]
+    manifest.save(path)
+
+    test_code = manifest.assemble_tests()
+    with open(os.path.join(en_gen.output_dir, "code.test.js"), "w") as f:
+        f.write(test_code)
+    set_task_output(en_gen.mock_generator_task(), manifest.assemble_mocks())
+    set_task_output(en_gen.test_case_generator_task(), test_code)
+    return test_code, regenerated, failed
@@ -0,0 +1,458 @@
+import re
+from typing import NamedTuple
+
+IDENT = re.compile(r"[A-Za-z_$][\w$]*")
+NUMBER = re.compile(r"\d[\w.]*|\.\d[\w.]*")
+PUNCTUATORS = ("...", "=>", "?.", "===", "!==", "==", "!=", "<=", ">=", "&&", "||", "??", "++", "--")
+# after these keywords a "/" starts a regex literal rather than a division
+REGEX_AFTER_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else"}
+OPENERS = {"(": ")", "[": "]", "{": "}"}
+TEST_CALLS = {"it", "test", "fit", "xit", "xtest", "beforeEach", "afterEach", "beforeAll", "afterAll"}
+SUITE_CALLS = {"describe", "fdescribe", "xdescribe"}
+DECLARATION_KEYWORDS = {"const", "let", "var"}
+NOT_METHODS = {"if", "for", "while", "switch", "catch", "with", "function", "return"}
+
+
+class Token(NamedTuple):
+    kind: str  # ident, number, string, template, regex, punct
+    value: str
+    pos: int
+    line: int
+
+
+class Issue(NamedTuple):
+    line: int
+    kind: str
+    message: str
+    fix: str
+
+
+class TokenizeError(Exception):
+    pass
+
+
+def _scan_string(code, i):
+    quote = code[i]
+    j = i + 1
+    while j < len(code):
+        if code[j] == "\\":
+            j += 2
+        elif code[j] == quote:
+            return j + 1
+        elif code[j] == "\n":
+            break
+        else:
+            j += 1
+    raise TokenizeError(f"unterminated string literal starting at line {code.count(chr(10), 0, i) + 1}")
+
+
+def _scan_template(code, i):
+    j = i + 1
+    while j < len(code):
+        if code[j] == "\\":
+            j += 2
+        elif code[j] == "`":
+            return j + 1
+        elif code.startswith("${", j):
+            j = _scan_substitution(code, j + 2)
+        else:
+            j += 1
+    raise TokenizeError(f"unterminated template literal starting at line {code.count(chr(10), 0, i) + 1}")
+
+
+def _scan_substitution(code, j):
+    depth = 1
+    while j < len(code):
+        ch = code[j]
+        if ch in "'\"":
+            j = _scan_string(code, j)
+        elif ch == "`":
+            j = _scan_template(code, j)
+        elif ch == "{":
+            depth += 1
+            j += 1
+        elif ch == "}":
+            depth -= 1
+            j += 1
+            if depth == 0:
+                return j
+        else:
+            j += 1
+    return j
+
+
+def _scan_regex(code, i):
+    j = i + 1
+    in_class = False
+    while j < len(code) and code[j] != "\n":
+        ch = code[j]
+        if ch == "\\":
+            j += 2
+            continue
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            j += 1
+            while j < len(code) and (code[j].isalpha()):
+                j += 1
+            return j
+        j += 1
+    raise TokenizeError(f"unterminated regex literal at line {code.count(chr(10), 0, i) + 1}")
+
+
+def _regex_allowed(prev):
+    if prev is None:
+        return True
+    if prev.kind in ("number", "string", "template", "regex"):
+        return False
+    if prev.kind == "ident":
+        return prev.value in REGEX_AFTER_KEYWORDS
+    return prev.value not in (")", "]", "}")
+
+
+def _jsx_closing_tag(prev, code, i):
+    """Whether the "/" at i ends a JSX closing tag's "<" (</div>, </>) rather than starting a regex"""
+    return (prev is not None and prev.value == "<" and prev.pos == i - 1
+            and (code.startswith(">", i + 1) or IDENT.match(code, i + 1) is not None))
+
+
+def tokenize(code):
+    """Tokenize JavaScript into identifiers, literals and punctuation, dropping whitespace and comments"""
+    tokens = []
+    i = 0
+    line = 1
+    while i < len(code):
+        ch = code[i]
+        if ch.isspace():
+            line += ch == "\n"
+            i += 1
+            continue
+        if code.startswith("//", i):
+            end = code.find("\n", i)
+            i = len(code) if end == -1 else end
+            continue
+        if code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            end = len(code) if end == -1 else end + 2
+            line += code.count("\n", i, end)
+            i = end
+            continue
+        prev = tokens[-1] if tokens else None
+        if ch in "'\"":
+            kind, end = "string", _scan_string(code, i)
+        elif ch == "`":
+            kind, end = "template", _scan_template(code, i)
+        elif ch == "/" and _regex_allowed(prev) and not _jsx_closing_tag(prev, code, i):
+            kind, end = "regex", _scan_regex(code, i)
+        elif IDENT.match(code, i):
+            kind, end = "ident", IDENT.match(code, i).end()
+        elif NUMBER.match(code, i):
+            kind, end = "number", NUMBER.match(code, i).end()
+        else:
+            kind = "punct"
+            end = i + next((len(p) for p in PUNCTUATORS if code.startswith(p, i)), 1)
+        tokens.append(Token(kind, code[i:end], i, line))
+        line += code.count("\n", i, end)
+        i = end
+    return tokens
+
+
+def _string_value(token):
+    return token.value[1:-1]
+
+
+def check_balance(tokens):
+    issues = []
+    stack = []
+    for token in tokens:
+        if token.kind != "punct":
+            continue
+        if token.value in OPENERS:
+            stack.append(token)
+        elif token.value in OPENERS.values():
+            if not stack:
+                issues.append(Issue(token.line, "unbalanced", f"unexpected '{token.value}' with nothing open",
+                                    f"remove the stray '{token.value}'"))
+            elif OPENERS[stack[-1].value] != token.value:
+                opener = stack[-1]
+                # everything after the first mismatch is knock-on noise
+                return issues + [Issue(token.line, "unbalanced",
+                                       f"'{token.value}' closes '{opener.value}' opened on line {opener.line}",
+                                       f"close line {opener.line}'s '{opener.value}' with '{OPENERS[opener.value]}'")]
+            else:
+                stack.pop()
+    for opener in stack:
+        issues.append(Issue(opener.line, "unbalanced", f"'{opener.value}' is never closed",
+                            f"add the missing '{OPENERS[opener.value]}'"))
+    return issues
+
+
+def imported_modules(tokens):
+    """Module specifiers pulled in through require(), import ... from, import '...' and import()"""
+    modules = []
+    for i, token in enumerate(tokens):
+        if token.kind != "ident" or token.value not in ("require", "import", "from"):
+            continue
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+        if nxt is None:
+            continue
+        if nxt.kind == "string" and token.value in ("import", "from"):
+            modules.append(_string_value(nxt))
+        elif nxt.value == "(" and i + 2 < len(tokens) and tokens[i + 2].kind == "string" and token.value != "from":
+            modules.append(_string_value(tokens[i + 2]))
+    return modules
+
+
+# jest calls that take a module specifier
+JEST_MODULE_CALLS = {"mock", "doMock", "unmock", "dontMock", "requireActual", "requireMock", "createMockFromModule"}
+
+
+def mocked_modules(tokens):
+    """Module specifiers passed to jest.mock(), jest.requireActual() and the other module registry calls"""
+    modules = []
+    for i in range(len(tokens) - 4):
+        a, dot, name, paren, arg = tokens[i:i + 5]
+        if a.value == "jest" and dot.value == "." and name.value in JEST_MODULE_CALLS and paren.value == "(" \
+                and arg.kind == "string":
+            modules.append(_string_value(arg))
+    return modules
+
+
+def _module_key(spec):
+    """Compare module specifiers by package name or file stem, since test and source paths differ"""
+    if not spec.startswith("."):
+        return spec.lower()
+    parts = [p for p in re.sub(r"\.(js|jsx|ts|tsx|mjs|cjs)$", "", spec).split("/") if p not in (".", "..", "")]
+    if len(parts) > 1 and parts[-1] == "index":
+        parts.pop()
+    return parts[-1].lower() if parts else spec
+
+
+def check_mocked_modules(tokens, source_tokens):
+    imported = {_module_key(spec) for spec in imported_modules(source_tokens)}
+    if not imported:
+        # segments often omit the require header; without it there is nothing to compare against
+        return []
+    issues = []
+    for i in range(len(tokens) - 4):
+        a, dot, name, paren, arg = tokens[i:i + 5]
+        if (a.value, dot.value, name.value, paren.value) == ("jest", ".", "mock", "(") and arg.kind == "string":
+            spec = _string_value(arg)
+            if _module_key(spec) not in imported:
+                issues.append(Issue(a.line, "unused-mock", f"jest.mock('{spec}') targets a module the source never imports",
+                                    f"remove jest.mock('{spec}') or point it at one of the source's imports"))
+    return issues
+
+
+def _callee(tokens, i):
+    """Dotted callee name ending just before the '(' at tokens[i], e.g. 'it.each' or 'describe'"""
+    parts = []
+    j = i - 1
+    while j >= 0 and tokens[j].kind == "ident":
+        parts.insert(0, tokens[j].value)
+        if j >= 1 and tokens[j - 1].value == ".":
+            j -= 2
+        else:
+            break
+    return ".".join(parts)
+
+
+# a line break ends an arrow's expression body unless one of these joins the two lines
+JOINS_NEXT_LINE = {"=>", ".", "?.", ",", "(", "[", "{", "=", "+", "-", "*", "/", "%", "&&", "||", "??", "?", ":", "!"}
+JOINS_PREVIOUS_LINE = {".", "?.", ")", "]", "}", "+", "-", "*", "/", "%", "&&", "||", "??", "?", ":"}
+
+
+def _opening(tokens, i):
+    """Index of the opener matching the closer at tokens[i]"""
+    depth = 0
+    for j in range(i, -1, -1):
+        if tokens[j].kind != "punct":
+            continue
+        if tokens[j].value in OPENERS.values():
+            depth += 1
+        elif tokens[j].value in OPENERS:
+            depth -= 1
+            if depth == 0:
+                return j
+    return 0
+
+
+def _function_body(tokens, i):
+    """True if the '{' at tokens[i] opens a function body: `=> {`, `function f() {` or a method `name() {`"""
+    prev = tokens[i - 1] if i else None
+    if prev is None or prev.kind != "punct":
+        return False
+    if prev.value == "=>":
+        return True
+    if prev.value != ")":
+        return False
+    j = _opening(tokens, i - 1)
+    before = tokens[j - 1] if j else None
+    return before is not None and (before.value == "function" or
+                                   (before.kind == "ident" and before.value not in NOT_METHODS))
+
+
+def check_expect_placement(tokens):
+    """expect() calls sitting directly in module or describe scope.
+
+    Anything inside a function body that is not a describe callback, including an arrow's
+    expression body, is a helper and may assert wherever it is called from.
+    """
+    issues = []
+    stack = []  # (opener, callee, opens a function body) frames
+    arrows = [False]  # per nesting level: inside an arrow's expression body
+    for i, token in enumerate(tokens):
+        prev = tokens[i - 1] if i else None
+        if prev is not None and token.line > prev.line and prev.value not in JOINS_NEXT_LINE \
+                and token.value not in JOINS_PREVIOUS_LINE:
+            arrows[-1] = False
+        if token.kind == "punct" and token.value in OPENERS:
+            callee = _callee(tokens, i) if token.value == "(" else ""
+            stack.append((token.value, callee, token.value == "{" and _function_body(tokens, i)))
+            arrows.append(False)
+        elif token.kind == "punct" and token.value in OPENERS.values():
+            if stack:
+                stack.pop()
+                arrows.pop()
+        elif token.kind == "punct" and token.value == "=>":
+            nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+            if nxt is not None and nxt.value != "{":
+                arrows[-1] = True
+        elif token.kind == "punct" and token.value in (",", ";"):
+            arrows[-1] = False
+        elif token.kind == "ident" and token.value == "expect" and i + 1 < len(tokens) and tokens[i + 1].value == "(" \
+                and not (prev is not None and prev.value in (".", "?.")):
+            if any(arrows):
+                continue
+            inside_test = helper = False
+            for k in range(len(stack) - 1, -1, -1):
+                opener, callee, function = stack[k]
+                root = callee.split(".")[0]
+                if opener == "(" and root in TEST_CALLS:
+                    inside_test = True
+                    break
+                if opener == "(" and root in SUITE_CALLS:
+                    break
+                if function:
+                    parent = stack[k - 1] if k else None
+                    # a describe callback's body is describe scope, not a helper
+                    if parent is not None and parent[0] == "(" and parent[1].split(".")[0] in SUITE_CALLS:
+                        continue
+                    helper = True
+                    break
+            if not inside_test and not helper:
+                issues.append(Issue(token.line, "expect-outside-test", "expect() runs outside any it()/test() block",
+                                    "move this assertion into an it()/test() callback"))
+    return issues
+
+
+def _matching(tokens, i):
+    depth = 0
+    for j in range(i, len(tokens)):
+        if tokens[j].kind != "punct":
+            continue
+        if tokens[j].value in OPENERS:
+            depth += 1
+        elif tokens[j].value in OPENERS.values():
+            depth -= 1
+            if depth == 0:
+                return j
+    return len(tokens) - 1
+
+
+def declared_names(tokens):
+    names = set()
+    for i, token in enumerate(tokens):
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+        if token.kind == "ident" and token.value in DECLARATION_KEYWORDS:
+            depth = 0
+            for t in tokens[i + 1:]:
+                if t.kind == "punct" and t.value in OPENERS:
+                    depth += 1
+                elif t.kind == "punct" and t.value in OPENERS.values():
+                    depth -= 1
+                elif depth == 0 and t.value in ("=", ";", "in", "of"):
+                    break
+                elif t.kind == "ident":
+                    names.add(t.value)
+        elif token.kind == "ident" and token.value in ("function", "class") and nxt is not None and nxt.kind == "ident":
+            names.add(nxt.value)
+        elif token.kind == "ident" and token.value == "import":
+            for t in tokens[i + 1:]:
+                if t.value == "from" or t.kind == "string":
+                    break
+                if t.kind == "ident" and t.value != "as":
+                    names.add(t.value)
+        elif token.kind == "ident" and nxt is not None and nxt.value == "=>":
+            names.add(token.value)
+        elif token.value == "(" and token.kind == "punct":
+            end = _matching(tokens, i)
+            after = tokens[end + 1] if end + 1 < len(tokens) else None
+            before = tokens[i - 1] if i else None
+            is_params = after is not None and (
+                after.value == "=>"
+                or (after.value == "{" and before is not None and before.kind == "ident" and before.value not in NOT_METHODS)
+                or (before is not None and before.value == "catch")
+            )
+            if is_params or (before is not None and before.value == "function") or (
+                    i >= 2 and tokens[i - 2].value == "function"):
+                names.update(t.value for t in tokens[i + 1:end] if t.kind == "ident")
+    return names
+
+
+MOCK_REFERENCE = re.compile(r"mock[A-Z0-9_][\w$]*$")
+
+
+def check_mock_definitions(tokens):
+    declared = declared_names(tokens)
+    issues = []
+    reported = set()
+    stack = []
+    for i, token in enumerate(tokens):
+        if token.kind == "punct" and token.value in OPENERS:
+            stack.append(token.value)
+        elif token.kind == "punct" and token.value in OPENERS.values() and stack:
+            stack.pop()
+        if token.kind != "ident" or not MOCK_REFERENCE.match(token.value) or token.value in declared:
+            continue
+        prev = tokens[i - 1] if i else None
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+        if prev is not None and prev.value in (".", "?."):
+            continue
+        if stack and stack[-1] == "{" and nxt is not None and nxt.value == ":" and prev is not None and prev.value in ("{", ","):
+            continue  # object key
+        if token.value not in reported:
+            reported.add(token.value)
+            issues.append(Issue(token.line, "undefined-mock", f"'{token.value}' is used but never defined",
+                                f"declare {token.value} (e.g. const {token.value} = jest.fn()) before it is used"))
+    return issues
+
+
+def check_test_file(test_code, source_code=""):
+    """Mechanical problems in a Jest test file, sorted by line; an empty list means the file is clean"""
+    try:
+        tokens = tokenize(test_code)
+    except TokenizeError as e:
+        return [Issue(0, "syntax", str(e), "close the literal")]
+    issues = check_balance(tokens)
+    if issues:
+        # the remaining checks walk bracket structure and would only add noise
+        return issues
+    try:
+        source_tokens = tokenize(source_code)
+    except TokenizeError:
+        source_tokens = []
+    issues += check_mocked_modules(tokens, source_tokens)
+    issues += check_expect_placement(tokens)
+    issues += check_mock_definitions(tokens)
+    return sorted(issues, key=lambda issue: issue.line)
+
+
+def format_feedback(issues):
+    """Feedback text in the analyzer's 'Issue N' layout"""
+    return "\n\n".join(
+        f"Issue {n}: line {issue.line}: {issue.message} [{issue.kind}]\n\nRecommended fix: {issue.fix}"
+        for n, issue in enumerate(issues, 1)
+    )
@@ -0,0 +1,152 @@
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from crewai import LLM
+
+from context_pruning import estimate_tokens
+from streaming import stream_sink
+from tracing import span
+
+
+class LLMCache:
+    """Content-addressed, disk-backed store of LLM responses with LRU/TTL eviction.
+
+    The database is opened on first use, so creating a cache (e.g. at import) touches no files.
+    """
+
+    def __init__(self, path=".rmjt_cache/llm_cache.sqlite", max_entries=10000, ttl=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def _db(self):
+        """The sqlite connection, created with its table on first use; callers hold self._lock"""
+        if self._connection is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT, created_at REAL, last_access REAL)"
+            )
+            db.commit()
+            self._connection = db
+        return self._connection
+
+    @staticmethod
+    def key(model, temperature, messages, tools=None):
+        """Hash of everything that determines the response.
+
+        crewai appends tool observations to the message list, so the rendered
+        messages already carry the tool outputs.
+        """
+        payload = json.dumps(
+            {"model": model, "temperature": temperature, "messages": messages, "tools": tools},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, response, now, now)
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+
+class CachedLLM(LLM):
+    """crewai LLM that answers repeated prompts from an LLMCache"""
+
+    def __init__(self, *args, cache=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = cache if cache is not None else LLMCache()
+
+    def call(self, messages, tools=None, *args, **kwargs):
+        prompt = messages if isinstance(messages, str) else "".join(str(m.get("content", "")) for m in messages)
+        with span(self.model, "llm", prompt_tokens=estimate_tokens(prompt)) as traced:
+            response, cached = self._call(messages, tools, *args, **kwargs)
+            if traced is not None:
+                traced.attrs["completion_tokens"] = estimate_tokens(response) if isinstance(response, str) else 0
+                traced.attrs["cached"] = cached
+        return response
+
+    def _call(self, messages, tools=None, *args, **kwargs):
+        """(response, whether it came from the cache)"""
+        writer = stream_sink.get()
+        if writer is not None:
+            writer.begin()
+        key = self.cache.key(self.model, self.temperature, messages, tools)
+        cached = self.cache.get(key)
+        if cached is not None:
+            if writer is not None:
+                writer.feed(cached)
+            return cached, True
+        if writer is not None and not tools:
+            # a streaming twin, so the shared instance never changes mode under other threads
+            twin = copy.copy(self)
+            twin.stream = True
+            response = LLM.call(twin, messages, tools, *args, **kwargs)
+        else:
+            response = super().call(messages, tools, *args, **kwargs)
+        # tool-call results come back as non-strings; only plain completions are replayable
+        if isinstance(response, str):
+            self.cache.set(key, response)
+        return response, False
@@ -0,0 +1,198 @@
+import json
+import os
+import posixpath
+import re
+import threading
+from typing import List
+
+from pydantic import BaseModel
+
+from dedup import test_directory
+from js_checks import TokenizeError, imported_modules, tokenize
+from segments import JEST_MOCK, JS_COMMENT, top_level_statements
+
+NAME = r"[A-Za-z_$][\w$]*"
+SPEC = r"""['"]([^'"]+)['"]"""
+REQUIRE_BINDING = re.compile(rf"\b(?:const|let|var)\s+({NAME})\s*=\s*require\(\s*{SPEC}\s*\)")
+REQUIRE_DESTRUCTURED = re.compile(rf"\b(?:const|let|var)\s*\{{([^}}]*)\}}\s*=\s*require\(\s*{SPEC}\s*\)")
+IMPORT_DEFAULT = re.compile(rf"\bimport\s+({NAME})\s*(?:,\s*\{{([^}}]*)\}})?\s+from\s+{SPEC}")
+IMPORT_NAMED = re.compile(rf"\bimport\s*\{{([^}}]*)\}}\s*from\s+{SPEC}")
+IMPORT_NAMESPACE = re.compile(rf"\bimport\s+\*\s+as\s+({NAME})\s+from\s+{SPEC}")
+MOCK_NAME = re.compile(r"(?<![\w$])(mock[\w$]*)")
+MOCK_DECLARATION = re.compile(r"(?:const|let|var)\s+(mock[\w$]*)\b")
+RELATIVE_SPEC = re.compile(r"""(['"])(\.\.?/[^'"]*)\1""")
+
+
+class MockFixture(BaseModel):
+    module: str  # package name, or project module path from the project root without extension
+    exports: List[str]  # export surface the fixture was verified against, sorted
+    spec: str  # specifier the code was written with
+    test_dir: str = "."  # directory, from the project root, the code's relative specifiers resolve from
+    code: str  # the jest.mock call, preceded by the mock* variables its factory uses
+    passes: int = 1  # passing runs it has been part of
+
+
+def _posix(path):
+    return os.path.abspath(path).replace(os.sep, "/")
+
+
+def module_key(spec, base_dir, project_root):
+    """'../models/User.js' from src/controller -> 'src/models/User'; package specifiers are kept as they are"""
+    if not spec.startswith("."):
+        return spec
+    path = posixpath.normpath(posixpath.join(_posix(base_dir), spec))
+    path = re.sub(r"(/index)?\.(js|jsx|ts|tsx|mjs|cjs)$", "", path)
+    return posixpath.relpath(path, _posix(project_root))
+
+
+def _listed(listing):
+    """Exported names from `{ a, b: c }` or `{ a as b }`"""
+    return [re.split(r"\s+as\s+|:", part.strip())[0].strip() for part in listing.split(",") if part.strip()]
+
+
+def _members(code, binding):
+    """Properties read off a module binding, plus "default" if the binding itself is called or constructed"""
+    members = set(re.findall(rf"(?<![\w$.]){re.escape(binding)}\s*\??\.\s*({NAME})", code))
+    if re.search(rf"(?<![\w$.]){re.escape(binding)}\s*\(", code):
+        members.add("default")
+    return members
+
+
+def dependency_surface(source_code):
+    """{specifier: sorted names the source uses from that module}"""
+    code = JS_COMMENT.sub(lambda m: m.group(1) or " ", source_code)
+    # member accesses are read with string contents blanked, so 'User.js' is not User.js
+    bare = JS_COMMENT.sub(lambda m: m.group(1)[0] * 2 if m.group(1) else " ", source_code)
+    surface = {}
+    for binding, spec in REQUIRE_BINDING.findall(code) + IMPORT_NAMESPACE.findall(code):
+        surface.setdefault(spec, set()).update(_members(bare, binding))
+    for listing, spec in REQUIRE_DESTRUCTURED.findall(code) + IMPORT_NAMED.findall(code):
+        surface.setdefault(spec, set()).update(_listed(listing))
+    for binding, listing, spec in IMPORT_DEFAULT.findall(code):
+        names = surface.setdefault(spec, set())
+        names.update(_members(bare, binding) | {"default"})
+        names.update(_listed(listing))
+    return {spec: sorted(names) for spec, names in surface.items()}
+
+
+def extract_fixtures(test_code, source_path, output_dir, project_root):
+    """A fixture for every jest.mock in a test file that mocks one of the source's dependencies.
+
+    The test's relative specifiers resolve from the directory the one naming the source
+    implies, or from output_dir, where the test is written.
+    """
+    if not os.path.exists(source_path):
+        return []
+    with open(source_path, errors="replace") as f:
+        source_code = f.read()
+    source_dir = os.path.dirname(os.path.abspath(source_path))
+    surface = {module_key(spec, source_dir, project_root): names
+               for spec, names in dependency_surface(source_code).items()}
+    try:
+        specs = [spec for spec in imported_modules(tokenize(test_code)) if spec.startswith(".")]
+    except TokenizeError:
+        specs = []
+    test_dir = test_directory(specs, source_path, _posix(output_dir))
+    statements = top_level_statements(test_code)
+    fixtures = []
+    for statement in statements:
+        match = JEST_MOCK.match(statement)
+        module = module_key(match.group(2), test_dir, project_root) if match else None
+        if module not in surface:
+            continue
+        # jest only lets a hoisted factory use variables whose names start with "mock"
+        used = set(MOCK_NAME.findall(statement))
+        helpers = []
+        for other in statements:
+            declared = MOCK_DECLARATION.match(other)
+            if declared and declared.group(1) in used:
+                helpers.append(other)
+        fixtures.append(MockFixture(module=module, exports=surface[module], spec=match.group(2),
+                                    test_dir=posixpath.relpath(test_dir, _posix(project_root)),
+                                    code="\n".join(helpers + [statement])))
+    return fixtures
+
+
+def _rebase(fixture, output_dir, project_root):
+    """The fixture's code with its relative specifiers rewritten for a test written in output_dir"""
+    test_dir = posixpath.join(_posix(project_root), fixture.test_dir)
+
+    def rewrite(match):
+        path = posixpath.normpath(posixpath.join(test_dir, match.group(2)))
+        new = posixpath.relpath(path, _posix(output_dir))
+        return f"{match.group(1)}{new if new.startswith('.') else './' + new}{match.group(1)}"
+    return RELATIVE_SPEC.sub(rewrite, fixture.code)
+
+
+class MockLibrary:
+    """Persistent library of jest.mock fixtures from passing runs, keyed by module and export surface"""
+
+    def __init__(self, path=".rmjt_cache/mock_library.json"):
+        self.path = path
+        self._fixtures = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forget the fixtures loaded in memory; the next use reads `path` again"""
+        with self._lock:
+            self._fixtures = None
+
+    @staticmethod
+    def key(module, exports):
+        return f"{module}|{','.join(exports)}"
+
+    def _load(self):
+        if self._fixtures is None:
+            self._fixtures = {}
+            if os.path.exists(self.path):
+                with open(self.path) as f:
+                    self._fixtures = {k: MockFixture.model_validate(v) for k, v in json.load(f).items()}
+        return self._fixtures
+
+    def record(self, test_code, source_path, output_dir, project_root):
+        """Store the mocks of a test file that passed; a fixture seen again only has its pass count raised"""
+        fixtures = extract_fixtures(test_code, source_path, output_dir, project_root)
+        if not fixtures:
+            return []
+        with self._lock:
+            stored = self._load()
+            for fixture in fixtures:
+                key = self.key(fixture.module, fixture.exports)
+                if key in stored:
+                    stored[key].passes += 1
+                else:
+                    stored[key] = fixture
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({k: v.model_dump() for k, v in stored.items()}, f, indent=1)
+            os.replace(tmp, self.path)
+        return fixtures
+
+    def lookup(self, source_code, source_dir, project_root):
+        """{specifier: fixture} for the source's dependencies with a fixture covering every name it uses"""
+        with self._lock:
+            stored = list(self._load().values())
+        found = {}
+        for spec, names in dependency_surface(source_code).items():
+            module = module_key(spec, source_dir, project_root)
+            candidates = [f for f in stored if f.module == module and set(f.exports) >= set(names)]
+            if candidates:
+                found[spec] = max(candidates, key=lambda f: (f.passes, -len(f.exports)))
+        return found
+
+    def fixtures_text(self, source_path, output_dir, project_root):
+        """The ready-made fixtures for a source file, with specifiers for a test in output_dir, or "none" """
+        if not os.path.exists(source_path):
+            return "none"
+        with open(source_path, errors="replace") as f:
+            found = self.lookup(f.read(), os.path.dirname(os.path.abspath(source_path)), project_root)
+        sections = []
+        for spec, fixture in found.items():
+            uses = ", ".join(fixture.exports) or "the module itself"
+            sections.append(f"Module '{spec}' (uses {uses}):\n```javascript\n{_rebase(fixture, output_dir, project_root)}\n```")
+        return "\n\n".join(sections) or "none"
+
+
+fixture_library = MockLibrary()
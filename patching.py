@@ -0,0 +1,162 @@
+import difflib
+import re
+
+from pydantic import BaseModel
+
+from js_checks import TokenizeError, check_balance, tokenize
+
+ISSUE_START = re.compile(r"(?m)^[ \t>*#-]*\**Issue\s+\d+")
+FENCE = r"```[\w+-]*[ \t]*\n(.*?)```"
+CURRENT_CODE = re.compile(r"Current code\W*" + FENCE, re.DOTALL | re.IGNORECASE)
+RECOMMENDED_FIX = re.compile(r"(?:Recommended|Suggested|Corrected)\s+(?:fix|code|version)\W*" + FENCE,
+                             re.DOTALL | re.IGNORECASE)
+
+
+class Hunk(BaseModel):
+    issue: str  # the feedback text the pair came from
+    before: str
+    after: str
+
+
+def split_issues(feedback):
+    """Feedback split at its "Issue N" headings; text without headings is one issue"""
+    starts = [m.start() for m in ISSUE_START.finditer(feedback)]
+    if not starts:
+        return [feedback.strip()] if feedback.strip() else []
+    chunks = [feedback[start:end].strip() for start, end in zip(starts, starts[1:] + [len(feedback)])]
+    head = feedback[:starts[0]].strip()
+    return ([head] if head else []) + chunks
+
+
+def extract_hunks(issue):
+    """"Current code" / "Recommended fix" snippet pairs of one issue, paired in order of appearance"""
+    befores = CURRENT_CODE.findall(issue)
+    afters = RECOMMENDED_FIX.findall(issue)
+    return [Hunk(issue=issue, before=before, after=after) for before, after in zip(befores, afters)]
+
+
+def _lines(code):
+    return [line.strip() for line in code.strip("\n").splitlines() if line.strip()]
+
+
+def _indent(line):
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _line_span(code, start, end):
+    """The whole lines holding code[start:end]"""
+    line_end = code.find("\n", end)
+    return code.rfind("\n", 0, start) + 1, len(code) if line_end < 0 else line_end
+
+
+def _locate(code, before, threshold):
+    """(start, end) of the whole lines matching `before`, or None if absent or ambiguous.
+
+    An exact match wins when nothing but whitespace or a ; or , shares its lines; otherwise
+    runs of non-blank lines are compared ignoring indentation and the best must reach
+    `threshold` similarity and clearly beat any other region.
+    """
+    block = before.strip("\n").strip()
+    count = code.count(block)
+    if count > 1:
+        return None
+    if count == 1:
+        start = code.index(block)
+        line_start, line_end = _line_span(code, start, start + len(block))
+        if not code[line_start:start].strip() and code[start + len(block):line_end].strip() in ("", ";", ","):
+            return line_start, line_end
+    target = _lines(block)
+    if not target or all(line.startswith("//") for line in target):
+        return None  # empty or a placeholder such as "// Problematic code"
+    lines = code.splitlines(keepends=True)
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+    nonblank = [i for i, line in enumerate(lines) if line.strip()]
+    wanted = "\n".join(target)
+    scored = []
+    for k in range(len(nonblank) - len(target) + 1):
+        window = "\n".join(lines[nonblank[k + j]].strip() for j in range(len(target)))
+        matcher = difflib.SequenceMatcher(None, window, wanted, autojunk=False)
+        if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+            continue
+        ratio = matcher.ratio()
+        if ratio >= threshold:
+            scored.append((ratio, k))
+    if not scored:
+        return None
+    scored.sort(reverse=True)
+    best, k = scored[0]
+    # a near-equal match elsewhere (not just the same lines shifted by one) makes the hunk ambiguous
+    if any(best - ratio < 0.02 and abs(other - k) >= len(target) for ratio, other in scored[1:]):
+        return None
+    first, last = nonblank[k], nonblank[k + len(target) - 1]
+    return offsets[first], offsets[last] + len(lines[last].rstrip("\r\n"))
+
+
+def _inline(code, hunk):
+    """code with a one-line snippet replaced where it is part of a longer line, or None"""
+    before, after = hunk.before.strip(), hunk.after.strip()
+    if not before or "\n" in before or "\n" in after or code.count(before) != 1:
+        return None
+    return code.replace(before, after)
+
+
+def _reindent(after, before, matched):
+    """Shift the fix from the snippet's indentation to the indentation of the matched code"""
+    before_lines = [line for line in before.strip("\n").splitlines() if line.strip()]
+    old = _indent(before_lines[0]) if before_lines else ""
+    new = _indent(matched.splitlines()[0]) if matched else ""
+    lines = []
+    for line in after.strip("\n").splitlines():
+        if not line.strip():
+            lines.append("")
+        elif line.startswith(old):
+            lines.append(new + line[len(old):])
+        else:
+            lines.append(new + line.lstrip())
+    return "\n".join(lines)
+
+
+def _well_formed(code):
+    try:
+        return not check_balance(tokenize(code))
+    except TokenizeError:
+        return False
+
+
+def apply_hunk(code, hunk, threshold=0.85):
+    """code with the hunk applied, or None if it can't be placed or would break the file's structure"""
+    span = _locate(code, hunk.before, threshold)
+    if span is not None:
+        start, end = span
+        patched = code[:start] + _reindent(hunk.after, hunk.before, code[start:end]) + code[end:]
+    else:
+        patched = _inline(code, hunk)
+        if patched is None:
+            return None
+    if _well_formed(code) and not _well_formed(patched):
+        return None
+    return patched
+
+
+def apply_feedback(code, feedback, threshold=0.85):
+    """Apply every before/after pair in the analyzer's feedback that can be placed in code.
+
+    An issue counts as handled only if it has pairs and all of them applied; the text of the
+    remaining issues is returned for the generator. Returns (code, applied hunks, remaining feedback).
+    """
+    applied, remaining = [], []
+    for issue in split_issues(feedback):
+        hunks = extract_hunks(issue)
+        patched = code
+        for hunk in hunks:
+            patched = apply_hunk(patched, hunk, threshold)
+            if patched is None:
+                break
+        if hunks and patched is not None:
+            code = patched
+            applied.extend(hunks)
+        else:
+            remaining.append(issue)
+    return code, applied, "\n\n".join(remaining)
@@ -0,0 +1,253 @@
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+
+from crewai.tools import BaseTool
+
+from dependency_index import JS_EXTENSIONS, SKIP_DIRS
+
+BINARY_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".ico", ".bmp", ".webp", ".svg", ".woff", ".woff2", ".ttf", ".eot", ".otf",
+    ".mp3", ".mp4", ".webm", ".wav", ".pdf", ".zip", ".gz", ".tgz", ".tar", ".7z", ".jar", ".exe", ".dll", ".so",
+    ".dylib", ".map", ".lock", ".sqlite", ".db",
+}
+VENDORED_SUFFIXES = (".min.js", ".min.css", ".bundle.js", ".chunk.js")
+TEST_DIRS = {"__tests__", "__mocks__", "test", "tests", "spec", "e2e"}
+TEST_FILE = re.compile(r"\.(test|spec)\.[jt]sx?$")
+ENTRY_NAMES = ("server.js", "app.js", "index.js", "main.js", "index.ts", "server.ts", "app.ts", "main.ts", "index.jsx")
+# dependency names worth surfacing, in the order they are reported
+STACK = [
+    "express", "koa", "fastify", "@nestjs/core", "next", "react", "react-dom", "vue", "@angular/core", "svelte",
+    "mongoose", "sequelize", "@prisma/client", "typeorm", "pg", "mysql2", "mongodb", "redis", "ioredis",
+    "jsonwebtoken", "bcrypt", "bcryptjs", "passport", "axios", "socket.io", "typescript",
+    "jest", "mocha", "vitest", "supertest", "@testing-library/react", "webpack", "vite",
+]
+
+
+def _glob_regex(pattern):
+    out = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            out += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            out += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            out += "[^/]"
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i)
+            out += pattern[i:end + 1] if end != -1 else re.escape(pattern[i])
+            i = end + 1 if end != -1 else i + 1
+        else:
+            out += re.escape(pattern[i])
+            i += 1
+    return out
+
+
+class GitIgnore:
+    """The subset of .gitignore semantics that matters for skipping build and vendored output"""
+
+    def __init__(self):
+        self.rules = []  # (base dir, regex, negated, dir only)
+
+    def add(self, base, text):
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            line = line.lstrip("!")
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            regex = _glob_regex(line.lstrip("/"))
+            regex = f"^{regex}$" if anchored else f"(?:^|/){regex}$"
+            self.rules.append((base, re.compile(regex), negated, dir_only))
+
+    def ignored(self, path, is_dir):
+        ignored = False
+        for base, regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base and not (path + "/").startswith(base + "/"):
+                continue
+            if regex.search(path[len(base) + 1:] if base else path):
+                ignored = not negated
+        return ignored
+
+
+def _skipped_file(name):
+    lower = name.lower()
+    return os.path.splitext(lower)[1] in BINARY_EXTENSIONS or lower.endswith(VENDORED_SUFFIXES)
+
+
+def _package_info(path):
+    try:
+        with open(path) as f:
+            package = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    deps = {**package.get("dependencies", {}), **package.get("devDependencies", {})}
+    return {
+        "name": package.get("name", ""),
+        "main": package.get("main", ""),
+        "scripts": {k: v for k, v in package.get("scripts", {}).items() if k in ("start", "dev", "test", "build")},
+        "stack": [dep for dep in STACK if dep in deps],
+        "jest": "jest" in package,
+    }
+
+
+class ProjectMap:
+    """Compact, persisted summary of a JS project, refreshed incrementally from directory mtimes"""
+
+    def __init__(self, root, cache_path=None):
+        self.root = os.path.abspath(root)
+        digest = hashlib.sha1(self.root.encode()).hexdigest()[:12]
+        self.cache_path = cache_path or os.path.join(".rmjt_cache", f"project_map_{digest}.json")
+        self.dirs = {}  # rel dir -> {"mtime", "files", "subdirs"}
+        self.packages = {}  # rel package.json -> {"mtime", "info"}
+        self.gitignores = {}  # rel dir -> {"mtime", "text"}
+        self.skipped = Counter()
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+            if cached.get("root") == self.root:
+                self.dirs = cached["dirs"]
+                self.packages = cached["packages"]
+                self.gitignores = cached["gitignores"]
+
+    def update(self):
+        """Re-list only directories whose mtime changed and re-read only changed package.json/.gitignore files"""
+        seen_dirs, seen_packages = set(), set()
+        self.skipped = Counter()
+        stack = [("", GitIgnore())]
+        while stack:
+            rel, ignore = stack.pop()
+            seen_dirs.add(rel)
+            full = os.path.join(self.root, rel)
+            ignore = self._with_gitignore(rel, ignore)
+            mtime = os.stat(full).st_mtime
+            entry = self.dirs.get(rel)
+            if entry is None or entry["mtime"] != mtime:
+                files, subdirs = [], []
+                for name in sorted(os.listdir(full)):
+                    (subdirs if os.path.isdir(os.path.join(full, name)) else files).append(name)
+                entry = self.dirs[rel] = {"mtime": mtime, "files": files, "subdirs": subdirs}
+            for name in entry["subdirs"]:
+                child = f"{rel}/{name}" if rel else name
+                if name in SKIP_DIRS or name.startswith(".") or ignore.ignored(child, True):
+                    self.skipped[name] += 1
+                    continue
+                stack.append((child, ignore))
+            if "package.json" in entry["files"]:
+                path = f"{rel}/package.json" if rel else "package.json"
+                seen_packages.add(path)
+                package_mtime = os.stat(os.path.join(self.root, path)).st_mtime
+                if self.packages.get(path, {}).get("mtime") != package_mtime:
+                    self.packages[path] = {"mtime": package_mtime, "info": _package_info(os.path.join(self.root, path))}
+            entry["kept"] = [
+                name for name in entry["files"]
+                if not _skipped_file(name) and not ignore.ignored(f"{rel}/{name}" if rel else name, False)
+            ]
+        self.dirs = {k: v for k, v in self.dirs.items() if k in seen_dirs}
+        self.packages = {k: v for k, v in self.packages.items() if k in seen_packages}
+        self.save()
+        return self
+
+    def _with_gitignore(self, rel, ignore):
+        path = os.path.join(self.root, rel, ".gitignore")
+        if not os.path.exists(path):
+            return ignore
+        mtime = os.stat(path).st_mtime
+        cached = self.gitignores.get(rel)
+        if cached is None or cached["mtime"] != mtime:
+            with open(path, errors="replace") as f:
+                cached = self.gitignores[rel] = {"mtime": mtime, "text": f.read()}
+        scoped = GitIgnore()
+        scoped.rules = list(ignore.rules)
+        scoped.add(rel, cached["text"])
+        return scoped
+
+    def save(self):
+        if os.path.dirname(self.cache_path):
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"root": self.root, "dirs": self.dirs, "packages": self.packages, "gitignores": self.gitignores}, f)
+        os.replace(tmp, self.cache_path)
+
+    def summary(self, max_chars=6000, max_dirs=60):
+        lines = [f"Project map of {self.root}"]
+        total = sum(len(d.get("kept", [])) for d in self.dirs.values())
+        lines.append(f"{total} source/config files in {len(self.dirs)} directories"
+                     + (f"; skipped: {', '.join(sorted(self.skipped))}" if self.skipped else ""))
+
+        lines.append("Packages:")
+        entries = []
+        for path, package in sorted(self.packages.items()):
+            info = package["info"]
+            base = os.path.dirname(path)
+            parts = [f"- {path}"]
+            if info.get("name"):
+                parts.append(f"name {info['name']}")
+            if info.get("stack"):
+                parts.append("stack: " + ", ".join(info["stack"]))
+            if info.get("scripts"):
+                parts.append("scripts: " + "; ".join(f"{k}={v}" for k, v in info["scripts"].items()))
+            lines.append(" | ".join(parts))
+            if info.get("main"):
+                entries.append(os.path.normpath(os.path.join(base, info["main"])))
+        if not self.packages:
+            lines.append("- (no package.json found)")
+
+        tests = []
+        for rel, entry in sorted(self.dirs.items()):
+            kept = entry.get("kept", [])
+            if rel.split("/")[-1] in TEST_DIRS or any(TEST_FILE.search(name) for name in kept) \
+                    or any(name.startswith("jest.config") for name in kept):
+                tests.append(f"{rel or '.'} ({len(kept)} files)")
+            depth = rel.count("/") if rel else -1
+            if depth <= 1:
+                entries += [f"{rel}/{name}" if rel else name for name in ENTRY_NAMES if name in kept]
+        lines.append("Entry points: " + (", ".join(dict.fromkeys(entries)) or "(none found)"))
+        lines.append("Test locations: " + (", ".join(tests) or "(none found)"))
+
+        lines.append("Directories (file counts by extension):")
+        shown = sorted((rel for rel in self.dirs if self.dirs[rel].get("kept")), key=lambda r: (r.count("/"), r))
+        for rel in shown[:max_dirs]:
+            counts = Counter(os.path.splitext(name)[1] or name for name in self.dirs[rel]["kept"])
+            code = [n for n in self.dirs[rel]["kept"] if n.endswith(JS_EXTENSIONS)]
+            listing = ", ".join(f"{n} {ext}" for ext, n in counts.most_common(4))
+            named = f" [{', '.join(code[:8])}{', ...' if len(code) > 8 else ''}]" if code else ""
+            lines.append(f"- {rel or '.'}/: {listing}{named}")
+        if len(shown) > max_dirs:
+            lines.append(f"- ... {len(shown) - max_dirs} more directories")
+
+        text = "\n".join(lines)
+        return text if len(text) <= max_chars else text[:max_chars] + "\n[truncated]"
+
+
+def project_map(root, cache_path=None, max_chars=6000):
+    """Refresh the persisted map of `root` and return its compact summary"""
+    return ProjectMap(root, cache_path).update().summary(max_chars=max_chars)
+
+
+class ProjectMapTool(BaseTool):
+    name: str = "Project_Map_Tool"
+    description: str = (
+        "Returns a compact, precomputed map of the project: package.json stacks and scripts, entry points, "
+        "test folders and source directories with their files. Vendored, ignored and binary files are excluded. "
+        "Takes no arguments; use the FileReadTool afterwards to read specific files."
+    )
+    project_root: str
+
+    def _run(self, query: str = "") -> str:
+        return project_map(self.project_root)
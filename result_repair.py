@@ -0,0 +1,212 @@
+import json
+import re
+from collections import Counter
+from typing import Annotated, List
+
+from pydantic import BaseModel, BeforeValidator, ValidationError
+
+from crewai.utilities.converter import Converter
+
+# how analyzer outputs were turned into a Result: parsed as is, repaired locally, or re-prompted
+stats = Counter()
+
+PASS_WORDS = {"PASS", "PASSED", "PASSING", "PASSES", "OK", "SUCCESS", "TRUE"}
+FAIL_WORDS = {"FAIL", "FAILED", "FAILING", "FAILS", "FAILURE", "ERROR", "FALSE"}
+CONFIDENCE_WORDS = {"HIGH": 0.9, "MEDIUM": 0.6, "MODERATE": 0.6, "LOW": 0.3}
+NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+JSON_ESCAPES = set('"\\/bfnrtu')
+LITERALS = {"True": "true", "False": "false", "None": "null", "undefined": "null"}
+
+
+def _verdict(value):
+    if isinstance(value, bool):
+        return "PASS" if value else "FAIL"
+    word = re.sub(r"[^A-Za-z]", "", str(value)).upper()
+    if word in PASS_WORDS:
+        return "PASS"
+    if word in FAIL_WORDS:
+        return "FAIL"
+    raise ValueError(f"expected PASS or FAIL, got {value!r}")
+
+
+def _percent(value):
+    """0-100 integer from 75, 75.4, "75%", "~75 percent" or a 0-1 fraction such as 0.75"""
+    if isinstance(value, bool):
+        raise ValueError("expected a percentage, got a boolean")
+    if isinstance(value, str):
+        match = NUMBER.search(value)
+        if not match:
+            raise ValueError(f"expected a percentage, got {value!r}")
+        value = float(match.group())
+    if isinstance(value, float) and 0 < value < 1:
+        value *= 100
+    return max(0, min(100, round(value)))
+
+
+def _confidence(value):
+    """0-1 float from 0.8, "80%", 80 or high/medium/low"""
+    if isinstance(value, str):
+        word = value.strip().upper()
+        if word in CONFIDENCE_WORDS:
+            return CONFIDENCE_WORDS[word]
+        match = NUMBER.search(value)
+        if not match:
+            raise ValueError(f"expected a confidence, got {value!r}")
+        value = float(match.group()) / (100 if "%" in value else 1)
+    value = float(value)
+    if value > 1:
+        value /= 100
+    return max(0.0, min(1.0, value))
+
+
+def _text(value):
+    """Feedback given as a list of issues or an object is flattened into one string"""
+    if isinstance(value, list):
+        return "\n\n".join(_text(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, indent=2)
+    return "" if value is None else str(value)
+
+
+# field types for the Result models; they normalize the common ways a model deviates from the schema
+Verdict = Annotated[str, BeforeValidator(_verdict)]
+Percent = Annotated[int, BeforeValidator(_percent)]
+Confidence = Annotated[float, BeforeValidator(_confidence)]
+Text = Annotated[str, BeforeValidator(_text)]
+
+
+class SegmentVerdict(BaseModel):
+    segment_id: str
+    pass_fail: Verdict
+    issues: Text = ""
+
+
+class Result(BaseModel):
+    """The static analyzer's verdict, shared by both generators and the feedback loop"""
+    expected_coverage: Percent
+    feedback: Text
+    pass_fail: Verdict
+    segments: List[SegmentVerdict] = []
+    confidence: Confidence = 1.0
+
+
+def extract_json(text):
+    """The first JSON object in a model answer, rewritten into strict JSON.
+
+    Skips prose and code fences around it, drops # // /* */ comments and trailing commas,
+    turns single-quoted strings, bare words and Python literals into JSON, escapes raw newlines and
+    stray backslashes inside strings, and closes an object cut off mid-way.
+    """
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("no JSON object in the answer")
+    out, closers, quote = [], [], None
+    i, n = start, len(text)
+    while i < n:
+        c = text[i]
+        if quote:
+            if c == "\\" and i + 1 < n:
+                following = text[i + 1]
+                if following == "'":
+                    out.append("'")
+                elif following in JSON_ESCAPES:
+                    out.append(c + following)
+                else:
+                    out.append("\\\\" + following)
+                i += 2
+                continue
+            if c == quote:
+                quote = None
+                out.append('"')
+            else:
+                out.append({'"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"}.get(c, c))
+            i += 1
+            continue
+        if c in "\"'":
+            quote = c
+            out.append('"')
+        elif c == "#" or text.startswith("//", i):
+            while i < n and text[i] != "\n":
+                i += 1
+            continue
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            continue
+        elif c in "{[":
+            closers.append("}" if c == "{" else "]")
+            out.append(c)
+        elif c in "}]":
+            _drop_trailing_comma(out)
+            if closers:
+                out.append(closers.pop())
+            if not closers:
+                break
+        elif c.isalpha() or c == "_":
+            word = re.match(r"[A-Za-z_]\w*", text[i:]).group()
+            # Python literals become JSON ones; other bare words (unquoted keys, PASS) get quoted
+            out.append(LITERALS.get(word) or (word if word in ("true", "false", "null") else f'"{word}"'))
+            i += len(word)
+            continue
+        elif c != "%":
+            out.append(c)
+        i += 1
+    if quote:
+        out.append('"')
+    _drop_trailing_comma(out)
+    out.extend(reversed(closers))
+    return "".join(out)
+
+
+def _drop_trailing_comma(out):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def _keys(data):
+    """snake_case keys, so "Pass Fail" or "expected-coverage" still land on the right field"""
+    if isinstance(data, dict):
+        return {re.sub(r"[^a-z0-9]+", "_", str(k).lower()).strip("_"): _keys(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_keys(item) for item in data]
+    return data
+
+
+def parse_result(text, model):
+    """Validate a model answer into `model`, repairing its JSON locally when needed.
+
+    Raises ValueError when the answer cannot be repaired into a valid instance.
+    """
+    try:
+        result = model.model_validate_json(text.strip())
+        stats["parsed"] += 1
+        return result
+    except ValidationError:
+        pass
+    data = json.loads(extract_json(text))
+    result = model.model_validate(_keys(data))
+    stats["repaired"] += 1
+    return result
+
+
+def result_of(output, model):
+    """A task output's Result: crewai's conversion if it produced one, else the local repair"""
+    if isinstance(output.pydantic, model):
+        return output.pydantic
+    try:
+        return parse_result(output.raw, model)
+    except ValueError as e:
+        raise ValueError(f"Static analysis did not return a valid {model.__name__}: {e}") from e
+
+
+class RepairingConverter(Converter):
+    """Output converter that repairs the answer locally and only re-prompts the model when that fails"""
+
+    def to_pydantic(self, current_attempt=1):
+        try:
+            return parse_result(self.text, self.model)
+        except ValueError:
+            stats["reprompted"] += 1
+            return super().to_pydantic(current_attempt)
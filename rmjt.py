@@ -1,19 +1,32 @@
 from crewai import Agent, Task, Crew, Process
 from crewai.project import agent, task, crew, CrewBase
-from crewai_tools import FileReadTool, DirectoryReadTool
-from pydantic import BaseModel
+from crewai_tools import FileReadTool
 import json
+import os
 
-class Result(BaseModel):
-    expected_coverage: int
-    feedback: str
-    pass_fail: str  
+DEFAULT_PROJECT_ROOT = '/content/gcc-national-registry-dashboard-Dev_Branch'
+DEFAULT_SOURCE_PATH = '/content/gcc-national-registry-dashboard-Dev_Branch/server/src/controller/auth.js'
 
-from crewai import LLM
+from result_repair import RepairingConverter, Result
 
-llm_openai_1 = LLM(model='gpt-4o-mini', temperature=0)
-# For the static logic tester, use a more powerful model with reasoning capabilities
-llm_reasoning = LLM(model='gpt-4o-mini', temperature=0)
+# inputs every kickoff needs; "scope" narrows static analysis to failing describe blocks,
+# "fixtures" carries verified mocks from the fixture library (see EnhancedGenerator.kickoff_inputs)
+DEFAULT_INPUTS = {"feedback": " ", "scope": "the whole test file", "fixtures": "none"}
+
+from llm_cache import CachedLLM, LLMCache
+from context_pruning import ContextAssembler
+from tracing import span as trace_span
+from task_compat import SaveOutput, interpolate_inputs, upstream_context
+from mock_library import fixture_library
+from project_map import ProjectMapTool
+
+# temperature=0 responses are replayed from disk when the rendered prompt is unchanged;
+# the cache only creates .rmjt_cache/ and its sqlite file on the first call
+llm_cache = LLMCache()
+llm_openai_1 = CachedLLM(model='gpt-4o-mini', temperature=0, cache=llm_cache)
+# For the static logic tester, use a more powerful model with reasoning capabilities;
+# it is also the tier the static analysis cascade escalates to, so it must differ from llm_openai_1
+llm_reasoning = CachedLLM(model=os.environ.get("RMJT_REASONING_MODEL", 'gpt-4o'), temperature=0, cache=llm_cache)
 
 "The Team"
 
@@ -21,6 +34,16 @@ llm_reasoning = LLM(model='gpt-4o-mini', temperature=0)
 class EnhancedGenerator:
     """This crew is responsible for the jest case generation, mocking strategy, and static logic analysis"""
 
+    def __init__(self, source_path=DEFAULT_SOURCE_PATH, output_dir="rmjt_tests", project_root=DEFAULT_PROJECT_ROOT,
+                 context_budget=6000):
+        self.source_path = source_path
+        self.output_dir = output_dir
+        self.project_root = project_root
+        # per-segment task calls get only the context slices relevant to their segment
+        self.context_assembler = ContextAssembler(context_budget)
+        self._crews = {}
+        self._fixtures = None
+
     @agent
     def directory_structure_agent(self) -> Agent:
         return Agent(
@@ -28,7 +51,7 @@ class EnhancedGenerator:
             goal="Create a comprehensive map of the project's structure and component relationships to facilitate effective Jest test implementation",
             backstory="I specialize in interpreting complex software architectures by analyzing directory structures, file relationships, and dependency patterns. With extensive experience mapping full-stack applications, I can identify the architectural patterns being used, distinguish between frontend and backend components, recognize Jest test frameworks, and understand how different parts of the application interconnect. My insights provide the foundation for effective code segmentation and Jest testing strategies.",
             llm=llm_openai_1,
-            tools=[DirectoryReadTool('/content/gcc-national-registry-dashboard-Dev_Branch'), FileReadTool()]
+            tools=[ProjectMapTool(project_root=self.project_root), FileReadTool()]
         )
     
     @task
@@ -37,6 +60,10 @@ class EnhancedGenerator:
             description="""
             Analyze the project's directory structure to create a comprehensive architectural map with a focus on Jest testability:
             
+            Start from the Project_Map_Tool output, which already summarizes packages, entry points, test folders and
+            source directories (vendored, ignored and binary files are excluded). Only read individual files with the
+            FileReadTool when the map is not enough.
+            
             1. Generate a hierarchical representation of the directory structure
             2. Classify directories and files by their purpose (frontend, backend, config, tests, etc.)
             3. Identify the technology stack based on file extensions and configuration files
@@ -77,7 +104,7 @@ class EnhancedGenerator:
             goal="Break down source code into logical, isolated segments that can be independently tested with Jest",
             backstory="As a code architect specializing in software decomposition for Jest testing, I analyze complex codebases and identify logical boundaries. With years of experience in various programming paradigms, I can recognize patterns, understand dependencies, and isolate functional units for effective Jest unit and integration tests. My expertise in full-stack applications helps me identify the natural divisions between components in both frontend and backend systems that align with Jest testing methodologies.",
             llm=llm_openai_1,
-            tools=[FileReadTool('/content/gcc-national-registry-dashboard-Dev_Branch/server/src/controller/auth.js')]
+            tools=[FileReadTool(self.source_path)]
         )
     
     @task
@@ -127,8 +154,7 @@ class EnhancedGenerator:
             
             ENSURE THAT EACH SEGMENT INCLUDES THE ACTUAL CODE. The code must be presented exactly as it appears in the source file.
             """,
-            create_directory=True,
-            output_file="rmjt_tests/code.js",
+            callback=SaveOutput(os.path.join(self.output_dir, "code.js")),
             agent=self.code_segmentation_agent()
         )
 
@@ -162,6 +188,11 @@ class EnhancedGenerator:
             5. Create Jest mock scenarios for happy paths and error conditions
             6. For authentication components, create Jest test fixtures representing different user roles and permissions
             
+            READY-MADE FIXTURES: the mocks below passed verification in earlier runs for the same modules
+            and the same exports. Use them exactly as given, without querying or rewriting them, and
+            generate mocks only for the dependencies they do not cover:
+            {fixtures}
+            
             Focus on creating Jest mocks that are:
             - Compatible with Jest's mocking system (properly using jest.mock syntax)
             - Realistic enough to test real behaviors
@@ -281,8 +312,7 @@ class EnhancedGenerator:
             If feedback was provided, the final code should reflect all requested changes.
             """,
             agent=self.test_case_generator_agent(),
-            create_directory=True,
-            output_file="rmjt_tests/code.test.js",
+            callback=SaveOutput(os.path.join(self.output_dir, "code.test.js")),
             context=[self.code_segmentation_task(),
                 self.mock_generator_task()]
         )
@@ -294,7 +324,7 @@ class EnhancedGenerator:
             goal="Analyze a single Jest test file and its source code to identify logical issues without execution",
             backstory="""I am a deep reasoning expert specialized in static analysis of Jest test suites. With extensive knowledge of JavaScript, Jest's mocking system, and software testing principles, I can identify logical flaws in test cases by carefully analyzing the code flow, mock implementations, and test assertions without needing to run the tests.""",
             llm=llm_reasoning,
-            tools=[FileReadTool('/content/rmjt_tests/code.js'),FileReadTool('/content/rmjt_tests/code.test.js')]
+            tools=[FileReadTool(os.path.join(self.output_dir, 'code.js')),FileReadTool(os.path.join(self.output_dir, 'code.test.js'))]
         )
 
     @task
@@ -307,6 +337,8 @@ class EnhancedGenerator:
             
             IMPORTANT: Assume that all mocks in the test are correctly implemented. Focus on analyzing the test logic itself.
             
+            SCOPE: Analyze {scope}. Describe blocks outside this scope already passed; do not report on them.
+            
             Without executing the test, analyze:
             
             1. Each test case's logical flow from setup through execution to assertions
@@ -322,6 +354,11 @@ class EnhancedGenerator:
             - expected_coverage: An integer percentage (0-100) indicating how much of the source code functionality is covered by the tests
             - feedback: A detailed string containing all identified issues and SPECIFIC CODE CHANGES to fix each issue
             - pass_fail: Either "PASS" if the tests would execute successfully or "FAIL" if issues were found
+            - confidence: A number from 0 to 1 for how certain you are of the pass_fail verdict
+            - segments: One verdict per top-level describe block in scope, each with:
+                - segment_id: The exact title string of that top-level describe block
+                - pass_fail: "PASS" or "FAIL" for that describe block alone
+                - issues: The issues and code changes that apply to that describe block only
             
             The feedback field should include actual code snippets showing both the problematic code and the corrected version.
             """,
@@ -331,15 +368,74 @@ class EnhancedGenerator:
             {
                 "expected_coverage": 75,  # Example percentage between 0-100
                 "feedback": "Issue 1: [Description of issue]\\n\\nCurrent code:\\n```javascript\\n// Problematic code\\n```\\n\\nRecommended fix:\\n```javascript\\n// Fixed code\\n```\\n\\nIssue 2: [Description]...",
-                "pass_fail": "FAIL"  # Either "PASS" or "FAIL"
+                "pass_fail": "FAIL",  # Either "PASS" or "FAIL"
+                "confidence": 0.8,  # 0-1 certainty of the verdict
+                "segments": [
+                    {"segment_id": "login", "pass_fail": "FAIL", "issues": "Issue 1: ..."},
+                    {"segment_id": "logout", "pass_fail": "PASS", "issues": ""}
+                ]
             }
             
             The feedback must include SPECIFIC CODE CHANGES for each issue, showing both the original problematic code and your recommended fixed code.
             """,
             agent=self.static_logic_tester_agent(),
-            output_pydantic=Result
+            output_pydantic=Result,
+            # malformed JSON is repaired locally; the model is only asked to convert it when that fails
+            converter_cls=RepairingConverter
         )
 
+    def generation_crew(self) -> Crew:
+        """The crew without static analysis, for callers that run the analyzer themselves"""
+        tasks = [t for t in self.shared_crew().tasks if t.name != "static_logic_analysis_task"]
+        return Crew(
+            agents=[t.agent for t in tasks],
+            tasks=tasks,
+            process=Process.sequential,
+            verbose=True
+        )
+
+    def shared_crew(self, name="crew"):
+        """crew() or generation_crew(), built on first use and reused for this generator's lifetime"""
+        if name not in self._crews:
+            self._crews[name] = getattr(self, name)()
+        return self._crews[name]
+
+    def clone(self):
+        """A fresh generator over the same files for use on another thread; the context tally is shared"""
+        twin = type(self)(self.source_path, self.output_dir, self.project_root, self.context_assembler.budget_tokens)
+        twin.context_assembler = self.context_assembler
+        return twin
+
+    @property
+    def cascade_models(self):
+        """(cheap, reasoning) models for the static analysis cascade"""
+        return llm_openai_1, llm_reasoning
+
+    def kickoff_inputs(self):
+        """DEFAULT_INPUTS with the fixture library's verified mocks for this source file's dependencies"""
+        if self._fixtures is None:
+            self._fixtures = fixture_library.fixtures_text(self.source_path, self.output_dir, self.project_root)
+        return {**DEFAULT_INPUTS, "fixtures": self._fixtures}
+
+    def run_task(self, name, context=None, inputs=None, llm=None):
+        """Execute a single task on its own.
+
+        context defaults to the current outputs of the task's upstream tasks, as the crew would pass them.
+        llm, if given, replaces the agent's model for this run only.
+        """
+        task = getattr(self, name)()
+        if context is None:
+            context = upstream_context(task)
+        interpolate_inputs(task, {**self.kickoff_inputs(), **(inputs or {})})
+        agent_llm = task.agent.llm
+        if llm is not None:
+            task.agent.llm = llm
+        try:
+            with trace_span(name, "task", model=getattr(task.agent.llm, "model", "")):
+                return task.execute_sync(context=context)
+        finally:
+            task.agent.llm = agent_llm
+
     @crew
     def crew(self) -> Crew:
         return Crew(
@@ -0,0 +1,66 @@
+import os
+
+from incremental import set_task_output
+from segments import describe_blocks, extract_code, parse_segments, splice_block
+
+
+def failing_segments(verdicts, test_code):
+    """Titles of failing describe blocks, or None if there are none or any can't be found in the file"""
+    failing = [verdict.segment_id for verdict in verdicts.values() if verdict.pass_fail.upper() == "FAIL"]
+    blocks = describe_blocks(test_code)
+    if not failing or any(segment_id not in blocks for segment_id in failing):
+        return None
+    return failing
+
+
+def scope_for(segment_ids):
+    return "only the top-level describe blocks titled: " + ", ".join(repr(s) for s in segment_ids)
+
+
+def _segment_for(en_gen, segment_id):
+    """The parsed segment a describe block tests, if its name matches the describe title"""
+    output = en_gen.code_segmentation_task().output
+    if output is None:
+        return None
+    for segment in parse_segments(output.raw):
+        if segment.name.lower() in segment_id.lower() or segment_id.lower() in segment.name.lower():
+            return segment
+    return None
+
+
+def regenerate_segments(en_gen, test_code, verdicts, segment_ids):
+    """Regenerate only the given describe blocks and splice them back into the test file.
+
+    Returns the new test code and the titles of the spliced blocks, which the model may have renamed.
+    """
+    mocks = en_gen.mock_generator_task().output
+    spliced = []
+    for segment_id in segment_ids:
+        start, end = describe_blocks(test_code)[segment_id]
+        current = f"Current test suite to revise (return only this describe block):\n{test_code[start:end]}"
+        segment = _segment_for(en_gen, segment_id)
+        if segment is not None:
+            context = en_gen.context_assembler.for_segment(segment, mocks=mocks.raw if mocks else "", extra=current)
+        else:
+            segmentation = en_gen.code_segmentation_task().output
+            context = "\n\n".join(
+                [segmentation.raw if segmentation else "", mocks.raw if mocks else "", current])
+        output = en_gen.run_task(
+            "test_case_generator_task",
+            context=context,
+            inputs={"feedback": verdicts[segment_id].issues},
+        )
+        generated = extract_code(output.raw)
+        blocks = describe_blocks(generated)
+        title = segment_id if segment_id in blocks or not blocks else next(iter(blocks))
+        if blocks:
+            start, end = blocks[title]
+            generated = generated[start:end]
+        test_code = splice_block(test_code, segment_id, generated)
+        spliced.append(title)
+
+    # the task's callback wrote only the last regenerated block to code.test.js
+    with open(os.path.join(en_gen.output_dir, "code.test.js"), "w") as f:
+        f.write(test_code)
+    set_task_output(en_gen.test_case_generator_task(), test_code)
+    return test_code, spliced
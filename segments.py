@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List
+
+from pydantic import BaseModel, Field
+
+from js_checks import TokenizeError, declared_names, tokenize
+
+SEGMENT_HEADING = re.compile(r"^#+\s*Segment Name:\s*(.+?)\s*$", re.MULTILINE)
+CODE_FENCE = re.compile(r"```(?:javascript|js|jsx|typescript|ts)?[ \t]*\n(.*?)```", re.DOTALL)
+# strings first so that "//" or "/*" inside a literal is not taken for a comment
+JS_COMMENT = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|`(?:\\.|[^`\\])*`)|//[^\n]*|/\*.*?\*/""", re.DOTALL)
+
+
+class Segment(BaseModel):
+    name: str
+    text: str
+    code: str
+    hash: str
+
+
+def extract_code(text):
+    """Join the fenced JavaScript blocks of an LLM answer, or return the answer unchanged if it has none"""
+    blocks = CODE_FENCE.findall(text)
+    if not blocks:
+        return text.strip()
+    return "\n\n".join(block.strip() for block in blocks)
+
+
+def normalize_source(code):
+    """Drop comments and collapse whitespace so cosmetic edits don't count as changes"""
+    code = JS_COMMENT.sub(lambda m: m.group(1) or " ", code)
+    return re.sub(r"\s+", " ", code).strip()
+
+
+def source_hash(code):
+    return hashlib.sha256(normalize_source(code).encode("utf-8")).hexdigest()
+
+
+def parse_segments(text):
+    """Split code_segmentation_task output into its '## Segment Name' blocks"""
+    headings = list(SEGMENT_HEADING.finditer(text))
+    segments = []
+    for i, heading in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(text)
+        block = text[heading.start():end].strip()
+        code = extract_code(block)
+        name = heading.group(1).strip("[]`*_ ")
+        segments.append(Segment(name=name, text=block, code=code, hash=source_hash(code)))
+    return segments
+
+
+class SegmentEntry(BaseModel):
+    hash: str
+    mocks: str = ""
+    tests: str = ""
+
+
+class Manifest(BaseModel):
+    """Per-segment record of source hashes and the mocks/tests generated for them"""
+    segments: Dict[str, SegmentEntry] = Field(default_factory=dict)
+    order: List[str] = Field(default_factory=list)
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls.model_validate(json.load(f))
+
+    def save(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(self.model_dump_json(indent=2))
+        os.replace(tmp, path)
+
+    def find(self, segment):
+        """Entry for a segment, by name or, if it was renamed, by identical source hash"""
+        entry = self.segments.get(segment.name)
+        if entry is not None and entry.hash == segment.hash:
+            return entry
+        for other in self.segments.values():
+            if other.hash == segment.hash:
+                return other
+        return None
+
+    def assemble_tests(self):
+        return merge_test_files([extract_code(self.segments[name].tests) for name in self.order if name in self.segments])
+
+    def assemble_mocks(self):
+        return "\n\n".join(self.segments[name].mocks for name in self.order if name in self.segments)
+
+
+DESCRIBE_CALL = re.compile(r"(?<![\w.$])describe(?:\.(?:only|skip|each\([^)]*\)))?\s*\(")
+STRING_ARG = re.compile(r"""\s*(['"`])((?:\\.|(?!\1).)*)\1""", re.DOTALL)
+
+
+def _skip_literal(code, i):
+    """Index just past the string, template or comment starting at code[i], or i if there is none"""
+    ch = code[i]
+    if ch in "'\"`":
+        j = i + 1
+        while j < len(code) and code[j] != ch:
+            j += 2 if code[j] == "\\" else 1
+        return j + 1
+    if code.startswith("//", i):
+        end = code.find("\n", i)
+        return len(code) if end == -1 else end
+    if code.startswith("/*", i):
+        end = code.find("*/", i + 2)
+        return len(code) if end == -1 else end + 2
+    return i
+
+
+def describe_blocks(code):
+    """Top-level describe(...) calls in a test file as {title: (start, end)}"""
+    blocks = {}
+    depth = 0
+    i = 0
+    while i < len(code):
+        skipped = _skip_literal(code, i)
+        if skipped != i:
+            i = skipped
+            continue
+        ch = code[i]
+        if depth == 0:
+            match = DESCRIBE_CALL.match(code, i)
+            if match:
+                end = _call_end(code, match.end())
+                title = STRING_ARG.match(code, match.end())
+                blocks.setdefault(title.group(2) if title else f"describe@{i}", (i, end))
+                i = end
+                continue
+        if ch in "([{":
+            depth += 1
+        elif ch in ")]}":
+            depth = max(depth - 1, 0)
+        i += 1
+    return blocks
+
+
+def _call_end(code, i):
+    """End of a call whose opening paren ends just before i, including a trailing semicolon"""
+    depth = 1
+    while i < len(code) and depth:
+        skipped = _skip_literal(code, i)
+        if skipped != i:
+            i = skipped
+            continue
+        if code[i] in "([{":
+            depth += 1
+        elif code[i] in ")]}":
+            depth -= 1
+        i += 1
+    rest = code[i:]
+    stripped = rest.lstrip(" \t")
+    if stripped.startswith(";"):
+        i += len(rest) - len(stripped) + 1
+    return i
+
+
+def splice_block(code, title, replacement):
+    """Replace the top-level describe block titled `title` with `replacement`"""
+    start, end = describe_blocks(code)[title]
+    return code[:start] + replacement.strip() + code[end:]
+
+
+CONTINUES = {".", "?.", ",", "=", "+", "-", "*", "/", "&&", "||", "??", "?", ":", "=>"}
+DESTRUCTURED_REQUIRE = re.compile(r"""^(const|let|var)\s*\{([^}]*)\}\s*=\s*require\(\s*(['"])(.+?)\3\s*\)\s*;?$""", re.DOTALL)
+JEST_MOCK = re.compile(r"""^jest\.mock\(\s*(['"])(.+?)\1""")
+
+
+def top_level_statements(code):
+    """Split a JS prelude into its top-level statements (comments are dropped)"""
+    tokens = tokenize(code)
+    statements = []
+    start = None
+    depth = 0
+    for i, token in enumerate(tokens):
+        if start is None:
+            start = token.pos
+        if token.kind == "punct" and token.value in "([{":
+            depth += 1
+        elif token.kind == "punct" and token.value in ")]}":
+            depth -= 1
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+        if depth == 0 and (
+            token.value == ";"
+            or nxt is None
+            or (nxt.line > token.line and token.value not in CONTINUES and nxt.value not in CONTINUES
+                and nxt.value not in (")", "]", "}"))
+        ):
+            statements.append(code[start:token.pos + len(token.value)].strip())
+            start = None
+    return statements
+
+
+def merge_test_files(codes):
+    """Merge per-segment test files into one, keeping each require/import, declaration and jest.mock once.
+
+    Each file's prelude (everything before its first top-level describe) is merged statement by
+    statement in first-seen order; destructured requires of the same module are unioned. The
+    describe blocks follow in input order.
+    """
+    header = []
+    seen_text = set()
+    declared = set()
+    mocked = set()
+    destructured = {}  # module -> (index in header, keyword, names)
+    bodies = []
+    for code in codes:
+        blocks = describe_blocks(code)
+        first = min((start for start, _ in blocks.values()), default=len(code))
+        try:
+            statements = top_level_statements(code[:first])
+        except TokenizeError:
+            statements = [code[:first].strip()] if code[:first].strip() else []
+        for statement in statements:
+            text = re.sub(r"\s+", " ", statement)
+            if text in seen_text:
+                continue
+            seen_text.add(text)
+            mock = JEST_MOCK.match(statement)
+            if mock:
+                if mock.group(2) in mocked:
+                    continue
+                mocked.add(mock.group(2))
+                header.append(statement)
+                continue
+            require = DESTRUCTURED_REQUIRE.match(statement)
+            if require:
+                names = [n.strip() for n in require.group(2).split(",") if n.strip()]
+                module = require.group(4)
+                if module in destructured:
+                    index, keyword, existing = destructured[module]
+                    existing += [n for n in names if n not in existing]
+                    header[index] = f"{keyword} {{ {', '.join(existing)} }} = require('{module}');"
+                else:
+                    destructured[module] = (len(header), require.group(1), names)
+                    header.append(statement)
+                declared.update(n.split(":")[-1].strip() for n in names)
+                continue
+            try:
+                names = declared_names(tokenize(statement)) if re.match(r"(const|let|var|function|class|import)\b", statement) else set()
+            except TokenizeError:
+                names = set()
+            if names and names <= declared:
+                continue
+            declared.update(names)
+            header.append(statement)
+        body = code[first:].strip()
+        if body:
+            bodies.append(body)
+    return "\n".join(header) + ("\n\n" if header else "") + "\n\n".join(bodies) + "\n"
@@ -0,0 +1,204 @@
+import contextlib
+import contextvars
+import os
+import time
+
+from pydantic import BaseModel
+
+from segments import SEGMENT_HEADING, describe_blocks
+
+FINAL_ANSWER = "Final Answer:"
+# a unit can only have completed on a line starting like this: a top-level "});", a heading or a fence
+BOUNDARY_LINE = ("}", ")", "#", "```")
+
+# the writer receiving the current thread's LLM tokens; set around one task's execution
+stream_sink = contextvars.ContextVar("stream_sink", default=None)
+
+
+class StreamEvent(BaseModel):
+    kind: str  # segment, describe, done
+    path: str
+    title: str = ""
+    index: int = 0
+    chars: int = 0
+    elapsed: float = 0.0
+    text: str = ""
+
+
+def _answer(text):
+    """The part of a ReAct transcript after 'Final Answer:', or None until the marker has arrived"""
+    if FINAL_ANSWER not in text:
+        return None
+    return text.split(FINAL_ANSWER, 1)[1].lstrip(" \t")
+
+
+def _code(answer):
+    """JavaScript of a partial answer: the inside of its fences, including one still open"""
+    if "```" not in answer:
+        # wait for the first line so a fence split across chunks is not taken for code
+        return answer if "\n" in answer.lstrip() else ""
+    parts = answer.split("```")
+    code = []
+    for inside in parts[1::2]:
+        newline = inside.find("\n")
+        code.append(inside[newline + 1:] if newline != -1 else "")
+    return "\n\n".join(code)
+
+
+def describe_units(text, final=False):
+    """(prelude, [(title, block)]) for the describe blocks of a test answer that are complete"""
+    code = _code(text)
+    blocks = sorted(describe_blocks(code).items(), key=lambda item: item[1][0])
+    done = []
+    for title, (start, end) in blocks:
+        rest = code[end:]
+        if not (final or "\n" in rest or rest.strip(" \t;")):
+            break
+        done.append((title, code[start:end].strip()))
+    prelude = code[:blocks[0][1][0]].strip() if blocks else ""
+    return prelude, done
+
+
+def segment_units(text, final=False):
+    """('', [(name, block)]) for the '## Segment Name' blocks of a segmentation answer that are complete"""
+    headings = list(SEGMENT_HEADING.finditer(text))
+    done = []
+    for i, heading in enumerate(headings):
+        if i + 1 < len(headings):
+            end = headings[i + 1].start()
+        elif final:
+            end = len(text)
+        else:
+            break
+        done.append((heading.group(1).strip("[]`*_ "), text[heading.start():end].strip()))
+    return "", done
+
+
+class StreamWriter:
+    """Collects one task's streamed LLM output and rewrites its output file as units complete.
+
+    Each flush replaces the file atomically with the prelude and every unit finished so far, so
+    a reader never sees half a block. Only text after 'Final Answer:' counts; a new LLM call
+    (the agent's next ReAct step or a retry) starts the answer over.
+    """
+
+    def __init__(self, path, units, kind, on_event=None):
+        self.path = path
+        self.units = units
+        self.kind = kind
+        self.on_event = on_event
+        self.events = []
+        self.buffer = ""
+        self.written = []
+        self.started = time.time()
+
+    def begin(self):
+        self.buffer = ""
+
+    def feed(self, chunk):
+        start = self.buffer.rfind("\n") + 1
+        self.buffer += chunk
+        if "\n" not in chunk:
+            return
+        # re-parse only when a line that can close a unit has just been completed
+        lines = self.buffer[start:].split("\n")[:-1]
+        if not any(line.startswith(BOUNDARY_LINE) for line in lines):
+            return
+        answer = _answer(self.buffer)
+        if answer is not None:
+            self._flush(*self.units(answer))
+
+    def finish(self, raw):
+        """Emit events for the units only the final output completes, then a done event"""
+        prelude, units = self.units(raw.strip(), final=True)
+        for index, (title, text) in enumerate(units[len(self.written):], len(self.written)):
+            self._emit(self.kind, title, index, text)
+        self.written = [text for _, text in units]
+        self._emit("done", "", len(units), "")
+
+    def _flush(self, prelude, units):
+        texts = [text for _, text in units]
+        if len(texts) <= len(self.written) and texts == self.written[:len(texts)]:
+            return
+        if texts[:len(self.written)] != self.written:
+            self.written = []
+        content = "\n\n".join(([prelude] if prelude else []) + texts) + "\n"
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(content)
+        os.replace(tmp, self.path)
+        for index, (title, text) in enumerate(units[len(self.written):], len(self.written)):
+            self._emit(self.kind, title, index, text)
+        self.written = texts
+
+    def _emit(self, kind, title, index, text):
+        event = StreamEvent(kind=kind, path=self.path, title=title, index=index, chars=len(text),
+                            elapsed=round(time.time() - self.started, 3), text=text)
+        self.events.append(event)
+        if self.on_event is not None:
+            self.on_event(event)
+
+
+@contextlib.contextmanager
+def streaming_to(writer):
+    token = stream_sink.set(writer)
+    try:
+        yield writer
+    finally:
+        stream_sink.reset(token)
+
+
+def _install_forwarder():
+    """Forward crewai's stream-chunk events to the writer of the thread that made the call.
+
+    crewai emits these from the thread running LLM.call, so the context variable resolves to
+    that call's writer even with several flows streaming at once.
+    """
+    try:
+        from crewai.utilities.events import LLMStreamChunkEvent, crewai_event_bus
+    except ImportError:
+        try:
+            from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+        except ImportError:
+            return
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def forward(source, event):
+        writer = stream_sink.get()
+        if writer is not None:
+            writer.feed(event.chunk)
+
+
+_install_forwarder()
+
+
+def writer_for(task, on_event=None):
+    """A writer for tasks that produce code.js or code.test.js, otherwise None"""
+    path = getattr(task.callback, "path", "")
+    name = os.path.basename(path)
+    if name == "code.test.js":
+        return StreamWriter(path, describe_units, "describe", on_event)
+    if name == "code.js":
+        return StreamWriter(path, segment_units, "segment", on_event)
+    return None
+
+
+def stream_generation(en_gen, on_event=None):
+    """Run the generation tasks one at a time, streaming code.js and code.test.js as units complete.
+
+    Returns every StreamEvent emitted. The task's callback still writes each output file in full
+    when it finishes.
+    """
+    events = []
+    for task in en_gen.shared_crew("generation_crew").tasks:
+        writer = writer_for(task, on_event)
+        if writer is None:
+            en_gen.run_task(task.name)
+            continue
+        with streaming_to(writer):
+            output = en_gen.run_task(task.name)
+        writer.finish(output.raw)
+        events += writer.events
+    return events
@@ -0,0 +1,36 @@
+import os
+
+# task calls whose crewai API changed across the versions requirements.txt allows
+
+
+def interpolate_inputs(task, inputs):
+    """Fill a task's {placeholders}; crewai 0.98 renamed interpolate_inputs"""
+    method = getattr(task, "interpolate_inputs_and_add_conversation_history", None) or task.interpolate_inputs
+    method(inputs)
+
+
+def upstream_context(task):
+    """The raw outputs of a task's context tasks joined as the crew would pass them, or None.
+
+    From crewai 0.121 a task without context holds a truthy NOT_SPECIFIED sentinel, not None.
+    """
+    if not isinstance(task.context, list) or not task.context:
+        return None
+    return "\n\n".join(t.output.raw for t in task.context if t.output is not None)
+
+
+class SaveOutput:
+    """Task callback writing the raw output to `path`, in place of crewai's output_file.
+
+    crewai's output_file validator drops the leading / of absolute paths, so files landed under
+    the working directory, and it rejects any path containing "..".
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, output):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            f.write(output.raw)
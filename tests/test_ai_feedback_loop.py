@@ -0,0 +1,95 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from coverage_estimator import CoverageItem, CoverageReport
+from tracing import Tracer
+
+REPORT = CoverageReport(percent=50, items=[
+    CoverageItem(kind="function", function="login", line=3, label="login", covered=True),
+    CoverageItem(kind="branch", function="login", line=7, label="!user", covered=False),
+])
+
+
+def loop():
+    pytest.importorskip("crewai")
+    import ai_feedback_loop
+
+    return ai_feedback_loop
+
+
+def flow(tmp_path, **state):
+    """Just enough of an RMJT for record_attempt and stop_reason"""
+    ai = loop()
+    tracer = Tracer("run")
+    return SimpleNamespace(state=ai.State(output_dir=str(tmp_path), started_at=time.time(), **state),
+                           _get_tracer=lambda: tracer)
+
+
+def attempt(ai, run, feedback, coverage):
+    run.state.feedback = f"{feedback}\n\n{REPORT.summary()}"
+    run.state.expected_coverage = coverage
+    run.state.pass_fail = "FAIL"
+    ai.RMJT.record_attempt(run)
+
+
+def test_feedback_similarity():
+    ai = loop()
+    assert ai.feedback_similarity("mock User.findOne", "mock User.findOne") == 1.0
+    assert ai.feedback_similarity("", "") == 1.0
+    assert ai.feedback_similarity("mock User.findOne before login", "assert the 400 status") < 0.2
+
+
+def test_model_feedback_drops_the_coverage_summary():
+    ai = loop()
+    assert ai.model_feedback(f"Mock jwt.sign\n\n{REPORT.summary()}", REPORT) == "Mock jwt.sign"
+    assert ai.model_feedback("Mock jwt.sign", REPORT) == "Mock jwt.sign"
+    assert ai.model_feedback(f"Mock jwt.sign\n\n{REPORT.summary()}", None).endswith(REPORT.summary())
+
+
+def test_different_feedback_with_the_same_summary_continues(tmp_path):
+    ai = loop()
+    run = flow(tmp_path, coverage_report=REPORT)
+    attempt(ai, run, "Mock User.findOne so login can find a user", 50)
+    attempt(ai, run, "Assert that logout clears the token cookie", 60)
+    assert run.state.feedback_history == ["Mock User.findOne so login can find a user",
+                                          "Assert that logout clears the token cookie"]
+    assert ai.RMJT.stop_reason(run) == ""
+
+
+def test_repeated_feedback_stops(tmp_path):
+    ai = loop()
+    run = flow(tmp_path, coverage_report=REPORT)
+    attempt(ai, run, "Mock User.findOne so login can find a user", 50)
+    attempt(ai, run, "Mock User.findOne so login can find a user", 60)
+    assert ai.RMJT.stop_reason(run).startswith("feedback unchanged between iterations")
+
+
+def test_stop_reason_budgets(tmp_path):
+    ai = loop()
+    assert ai.RMJT.stop_reason(flow(tmp_path, iteration=5, max_iterations=5)) == "iteration budget of 5 reached"
+    stale = flow(tmp_path, max_seconds=10)
+    stale.state.started_at = time.time() - 60
+    assert ai.RMJT.stop_reason(stale).startswith("wall-clock budget of 10s reached")
+    assert ai.RMJT.stop_reason(flow(tmp_path, max_tokens=100, prior_tokens=150)).startswith("token budget of 100")
+
+
+def test_stop_reason_plateau(tmp_path):
+    ai = loop()
+    run = flow(tmp_path, coverage_history=[40, 55, 55, 56], plateau_iterations=2, min_coverage_gain=2)
+    assert ai.RMJT.stop_reason(run) == "coverage plateaued at 56% over 2 iterations"
+    run.state.coverage_history.append(60)
+    assert ai.RMJT.stop_reason(run) == ""
+
+
+def test_capture_tasks_records_ids_and_outputs_in_process(tmp_path):
+    ai = loop()
+    segmentation = SimpleNamespace(raw="## Segment Name: login")
+    tasks = [SimpleNamespace(name="code_segmentation_task", id="1f0c", output=segmentation),
+             SimpleNamespace(name="test_case_generator_task", id="9a2e", output=None)]
+    run = flow(tmp_path)
+    run.en_gen = SimpleNamespace(shared_crew=lambda: SimpleNamespace(tasks=tasks))
+    ai.RMJT.capture_tasks(run)
+    assert run.state.task_ids == {"code_segmentation_task": "1f0c", "test_case_generator_task": "9a2e"}
+    assert run.state.task_outputs == {"code_segmentation_task": "## Segment Name: login"}
@@ -0,0 +1,83 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from cascade import CascadePolicy, complexity
+from coverage_estimator import CoverageItem, CoverageReport
+
+
+def item(kind, function, covered=True):
+    return CoverageItem(kind=kind, function=function, line=1, label=kind, covered=covered)
+
+
+REPORT = CoverageReport(percent=60, items=[
+    item("function", "login"), item("branch", "login"), item("early-return", "login"), item("catch", "login"),
+    item("else", "login"),
+    item("function", "logout"), item("branch", "logout", covered=False),
+])
+
+
+def test_complexity():
+    assert complexity(None) == 0
+    assert complexity(REPORT) == 4
+    assert complexity(REPORT, ["logout suite"]) == 2
+    # a scope that matches no function falls back to every function
+    assert complexity(REPORT, ["signup"]) == 4
+
+
+def test_before_escalates_complex_code_or_a_stalled_loop():
+    policy = CascadePolicy(complexity_threshold=4)
+    assert not policy.before(3, stalled=False).escalate
+    assert policy.before(4, stalled=False).reasons == ["complexity 4 >= 4"]
+    assert policy.before(1, stalled=True).reasons == ["coverage stalled over 2 iterations"]
+
+
+def test_after_escalates_an_unsure_fail():
+    policy = CascadePolicy(min_confidence=0.7)
+    unsure = SimpleNamespace(pass_fail="fail", confidence=0.4)
+    decision = policy.after(unsure, 3)
+    assert decision.escalate and decision.reasons == ["FAIL with confidence 0.40 < 0.7"]
+    assert (decision.stage, decision.complexity, decision.confidence) == ("after", 3, 0.4)
+    assert not policy.after(SimpleNamespace(pass_fail="FAIL", confidence=0.9), 3).escalate
+    assert not policy.after(SimpleNamespace(pass_fail="PASS", confidence=0.1), 3).escalate
+
+
+def flow(tmp_path, cheap, reasoning, answers):
+    """An RMJT with just what static_analysis needs; answers maps a model name to its Result"""
+    pytest.importorskip("crewai")
+    import ai_feedback_loop as ai
+    from tracing import Tracer
+
+    run = SimpleNamespace(state=ai.State(output_dir=str(tmp_path), started_at=time.time(), coverage_report=REPORT),
+                          en_gen=SimpleNamespace(cascade_models=(cheap, reasoning)), models=[])
+    run._get_tracer = lambda: Tracer("run")
+    run.log_decision = lambda decision: ai.RMJT.log_decision(run, decision)
+
+    def run_analysis(inputs=None, llm=None):
+        model = llm.model if llm is not None else "agent"
+        run.models.append(model)
+        return answers[model]
+
+    run.run_analysis = run_analysis
+    return ai, run
+
+
+def test_static_analysis_escalates_an_unsure_cheap_fail(tmp_path):
+    unsure = SimpleNamespace(pass_fail="FAIL", confidence=0.3)
+    sure = SimpleNamespace(pass_fail="FAIL", confidence=0.9)
+    ai, run = flow(tmp_path, SimpleNamespace(model="gpt-4o-mini"), SimpleNamespace(model="gpt-4o"),
+                   {"gpt-4o-mini": unsure, "gpt-4o": sure})
+    assert ai.RMJT.static_analysis(run) is sure
+    assert run.models == ["gpt-4o-mini", "gpt-4o"]
+    assert [(d.stage, d.escalate) for d in run.state.cascade_log] == [("before", False), ("after", True)]
+
+
+def test_static_analysis_says_when_both_tiers_are_one_model(tmp_path, capsys):
+    same = SimpleNamespace(model="gpt-4o-mini")
+    result = SimpleNamespace(pass_fail="PASS", confidence=1.0)
+    ai, run = flow(tmp_path, same, same, {"agent": result})
+    assert ai.RMJT.static_analysis(run) is result
+    ai.RMJT.static_analysis(run)
+    assert run.models == ["agent", "agent"] and run.state.cascade_log == []
+    assert capsys.readouterr().out.count("Cascade disabled: both tiers use gpt-4o-mini") == 1
@@ -0,0 +1,86 @@
+import asyncio
+import os
+
+import pytest
+from pydantic import BaseModel
+
+from checkpoint import CheckpointStore, checkpointed
+
+
+class State(BaseModel):
+    iteration: int = 0
+    feedback: str = ""
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_save_load_and_restore_files(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    out = tmp_path / "out"
+    out.mkdir()
+    write(out / "code.test.js", "describe('login', () => {});")
+    write(out / "notes.txt", "not an output file")
+    saved = store.save("run-1", "code_gen_m2", State(iteration=2, feedback="mock User"), str(out))
+    assert store.load("run-1") == saved
+    assert saved["files"] == {"code.test.js": "describe('login', () => {});"}
+    assert (saved["state"], saved["completed"]) == ({"iteration": 2, "feedback": "mock User"}, False)
+    assert store.load("run-2") is None
+    assert not any(name.endswith(".tmp") for name in os.listdir(store.root))
+
+    os.remove(out / "code.test.js")
+    CheckpointStore.restore_files(saved)
+    with open(out / "code.test.js") as f:
+        assert f.read() == "describe('login', () => {});"
+
+
+def test_final_steps_complete_the_run(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    assert store.save("run", "show", State(), str(tmp_path / "out"))["completed"]
+    assert store.save("run", "keep_best", State(), str(tmp_path / "out"))["completed"]
+
+
+def test_latest_for_follows_the_last_run_in_a_directory(tmp_path, monkeypatch):
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    out = str(tmp_path / "out")
+    assert store.latest_for(out) is None
+    store.save("first", "code_gen", State(), out)
+    store.save("second", "code_gen", State(iteration=1), out)
+    store.save("other", "code_gen", State(), str(tmp_path / "elsewhere"))
+    assert store.latest_for(out)["run_id"] == "second"
+    # relative and absolute spellings of a directory share the pointer
+    monkeypatch.chdir(tmp_path)
+    assert store.latest_for("out")["run_id"] == "second"
+
+
+class Flow:
+    def __init__(self):
+        self.saved = []
+
+    def checkpoint(self, step):
+        self.saved.append(step)
+
+    @checkpointed
+    def code_gen(self, value):
+        return value * 2
+
+    @checkpointed
+    async def static_testing_m2(self):
+        return "done"
+
+    @checkpointed
+    def failing(self):
+        raise RuntimeError("analysis failed")
+
+
+def test_checkpointed_saves_after_sync_and_async_steps():
+    flow = Flow()
+    assert flow.code_gen(2) == 4
+    assert asyncio.run(flow.static_testing_m2()) == "done"
+    assert Flow.static_testing_m2.__name__ == "static_testing_m2"
+    with pytest.raises(RuntimeError):
+        flow.failing()
+    # a step that raised is not recorded as completed
+    assert flow.saved == ["code_gen", "static_testing_m2"]
@@ -0,0 +1,79 @@
+from context_pruning import ContextAssembler, _chunks, estimate_tokens, prune, segment_keywords, segment_modules
+from segments import parse_segments
+
+SEGMENTATION = """## Segment Name: login
+```javascript
+const User = require('../models/User');
+const login = async (req, res) => {
+  const user = await User.findOne({ email: req.body.email });
+  return res.json({ token: jwt.sign({ id: user.id }) });
+};
+```
+### Dependencies for Mocking
+- bcrypt.compare
+"""
+
+MOCKS = """## User mocks
+```javascript
+jest.mock('../models/User', () => ({
+  findOne: jest.fn(),
+
+  create: jest.fn(),
+}));
+```
+
+## Mailer mocks
+```javascript
+jest.mock('../services/mailer', () => ({ sendWelcome: jest.fn() }));
+```
+
+## Password mocks
+bcrypt.compare resolves to true for the stored hash.
+"""
+
+
+def login():
+    return parse_segments(SEGMENTATION)[0]
+
+
+def test_segment_keywords():
+    keywords = segment_keywords(login())
+    assert {"login", "User", "findOne", "../models/User", "jwt", "sign", "bcrypt", "compare"} <= keywords
+    assert not keywords & {"const", "req", "res", "return"}
+
+
+def test_segment_modules_adds_source_imports_the_segment_uses():
+    source = ("const User = require('../models/User');\nconst jwt = require('jsonwebtoken');\n"
+              "const mailer = require('../services/mailer');\n")
+    assert segment_modules(login(), source) == ["../models/User"]
+    uses_jwt = parse_segments(SEGMENTATION.replace("jwt.sign", "jsonwebtoken.sign"))[0]
+    assert segment_modules(uses_jwt, source) == ["../models/User", "jsonwebtoken"]
+
+
+def test_chunks_never_split_a_fence():
+    for chunk in _chunks(MOCKS):
+        assert chunk.count("```") % 2 == 0
+
+
+def test_prune_keeps_relevant_chunks_in_order():
+    pruned = prune(MOCKS, segment_keywords(login()), budget=1000)
+    assert pruned.startswith("## User mocks")
+    assert pruned.endswith("bcrypt.compare resolves to true for the stored hash.")
+    assert "mailer" not in pruned
+    # within a tight budget the chunk with the most keyword hits wins
+    assert prune(MOCKS, segment_keywords(login()), budget=estimate_tokens(MOCKS.split("\n\n## ")[0])).startswith(
+        "## User mocks")
+    assert prune(MOCKS, {"nothing"}, budget=1000) == ""
+
+
+def test_for_segment_and_report():
+    assembler = ContextAssembler(budget_tokens=2000)
+    context = assembler.for_segment(login(), mocks=MOCKS, dependencies="- server/src/models/User.js exports findOne",
+                                    extra="Feedback: none")
+    assert context.startswith(login().text)
+    assert "Relevant project dependencies:\n- server/src/models/User.js exports findOne" in context
+    assert "Relevant mocks:\n## User mocks" in context and "sendWelcome" not in context
+    assert context.endswith("Feedback: none")
+    report = assembler.report()
+    assert report.sent_tokens == estimate_tokens(context)
+    assert report.saved_tokens == report.original_tokens - report.sent_tokens > 0
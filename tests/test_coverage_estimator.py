@@ -0,0 +1,131 @@
+import os
+
+from coverage_estimator import estimate_coverage
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+
+# the benchmark's canned test file for auth.js: a missing password, valid credentials and logout
+TESTS = """
+const { login, logout } = require('../controller/auth');
+const User = require('../models/User');
+const jwt = require('jsonwebtoken');
+
+jest.mock('../models/User', () => ({ findOne: jest.fn() }));
+jest.mock('jsonwebtoken', () => ({ sign: jest.fn(() => 'signed-token') }));
+
+const mockRes = () => {
+  const res = {};
+  res.status = jest.fn(() => res);
+  res.json = jest.fn(() => res);
+  res.clearCookie = jest.fn();
+  return res;
+};
+
+describe('login', () => {
+  it('rejects a missing password', async () => {
+    const res = mockRes();
+    await login({ body: { email: 'a@b.c' } }, res);
+    expect(res.status).toHaveBeenCalledWith(400);
+  });
+
+  it('returns a token for valid credentials', async () => {
+    User.findOne.mockResolvedValue({ id: 1, comparePassword: jest.fn().mockResolvedValue(true) });
+    const res = mockRes();
+    await login({ body: { email: 'a@b.c', password: 'pw' } }, res);
+    expect(jwt.sign).toHaveBeenCalled();
+    expect(res.json).toHaveBeenCalledWith({ token: 'signed-token' });
+  });
+});
+
+describe('logout', () => {
+  it('clears the token cookie', () => {
+    const res = mockRes();
+    logout({}, res);
+    expect(res.clearCookie).toHaveBeenCalledWith('token');
+  });
+});
+"""
+
+INVALID_CREDENTIALS = """
+  it('rejects a wrong password', async () => {
+    User.findOne.mockResolvedValue(null);
+    const res = mockRes();
+    await login({ body: { email: 'a@b.c', password: 'nope' } }, res);
+    expect(res.status).toHaveBeenCalledWith(401);
+  });
+"""
+
+SERVER_ERROR = """
+  it('reports a database failure', async () => {
+    User.findOne.mockRejectedValue(new Error('db down'));
+    const res = mockRes();
+    await login({ body: { email: 'a@b.c', password: 'pw' } }, res);
+    expect(res.status).toHaveBeenCalledWith(500);
+  });
+"""
+
+
+def auth_source():
+    with open(os.path.join(FIXTURES, "auth.js")) as f:
+        return f.read()
+
+
+def covered(report):
+    return {(item.kind, item.line): item.covered for item in report.items}
+
+
+def with_cases(*cases):
+    head, tail = TESTS.split("describe('logout'")
+    return head + "describe('login errors', () => {" + "".join(cases) + "});\n\ndescribe('logout'" + tail
+
+
+def test_benchmark_tests_on_auth():
+    report = estimate_coverage(auth_source(), TESTS)
+    assert covered(report) == {
+        ("function", 4): True,
+        ("early-return", 6): True,  # the missing-password test expects 400
+        ("else", 6): True,  # the valid-credentials test gets past it
+        ("early-return", 11): False,  # nothing expects 401, though every test names user and password
+        ("else", 11): True,  # the valid-credentials test reaches jwt.sign
+        ("catch", 16): False,  # nothing makes findOne reject
+        ("function", 21): True,
+    }
+    assert report.percent == 71
+    assert "uncovered early-return in login (line 11)" in report.summary()
+
+
+def test_catch_needs_its_own_evidence():
+    # mockImplementation and Error alone are not evidence that the catch block runs
+    tests = TESTS.replace("jest.fn(() => 'signed-token')", "jest.fn().mockImplementation(() => { throw new Error('x'); })")
+    assert covered(estimate_coverage(auth_source(), tests))[("catch", 16)] is False
+    assert covered(estimate_coverage(auth_source(), with_cases(SERVER_ERROR)))[("catch", 16)] is True
+
+
+def test_full_suite_covers_every_arm():
+    report = estimate_coverage(auth_source(), with_cases(INVALID_CREDENTIALS, SERVER_ERROR))
+    assert report.uncovered() == []
+    assert report.percent == 100
+
+
+def test_implicit_else_needs_code_after_the_if():
+    # the only test takes the early return, so the rest of the function never runs
+    tests = TESTS.split("  it('returns a token")[0] + "});\n"
+    assert covered(estimate_coverage(auth_source(), tests))[("else", 6)] is False
+
+
+def test_switch_cases_and_no_functions():
+    source = """
+function role(user) {
+  switch (user.kind) {
+    case 'admin':
+      return 'Full access';
+    default:
+      return 'Read only';
+  }
+}
+"""
+    tests = "it('admins', () => { expect(role({ kind: 'admin' })).toBe('Full access'); });"
+    assert [(item.kind, item.covered) for item in estimate_coverage(source, tests).items] == [
+        ("function", True), ("case", True), ("case", False)]
+    assert estimate_coverage("module.exports = 1;", tests) is None
+    assert estimate_coverage("'open", tests) is None
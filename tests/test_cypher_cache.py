@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import pytest
+
+import cypher_cache
+from cypher_cache import CypherCache, normalize_question
+
+
+class Graph:
+    def __init__(self):
+        self.rows = [{"file": "auth.js"}]
+        self.queries = []
+
+    def query(self, query, params=None):
+        self.queries.append(query)
+        return list(self.rows)
+
+
+class Generation:
+    def __init__(self):
+        self.questions = []
+
+    def invoke(self, inputs, *args, **kwargs):
+        self.questions.append(inputs["question"])
+        return "MATCH (f:File) RETURN f.path"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cypher_cache, "time", clock)
+    return clock
+
+
+def cached_chain(version="v1", **kwargs):
+    chain = SimpleNamespace(graph=Graph(), cypher_generation_chain=Generation())
+    graph, generation = chain.graph, chain.cypher_generation_chain
+    stamp = {"version": version}
+    cache = CypherCache(chain, version_fn=lambda: stamp["version"], **kwargs)
+    return chain, cache, graph, generation, stamp
+
+
+def test_normalize_question():
+    assert normalize_question("Please, where is findOne called?") == "where is findone called"
+    assert normalize_question("Can you tell me  the exports of ./models/User.js.") == "the exports of ./models/user.js"
+
+
+def test_repeated_questions_and_queries_are_served_from_the_cache(clock):
+    chain, cache, graph, generation, _ = cached_chain()
+    for question in ("Where is findOne called?", "where is findOne called"):
+        cypher = chain.cypher_generation_chain.invoke({"question": question})
+        assert chain.graph.query(cypher) == [{"file": "auth.js"}]
+    assert generation.questions == ["Where is findOne called?"]
+    assert graph.queries == ["MATCH (f:File) RETURN f.path"]
+    assert cache.stats()["results"]["hits"] == 1 and cache.stats()["cypher"]["hits"] == 1
+
+
+def test_a_new_version_stamp_misses(clock):
+    chain, cache, graph, _, stamp = cached_chain(version_ttl=60)
+    chain.graph.query("MATCH (n) RETURN n")
+    stamp["version"] = "v2"
+    chain.graph.query("MATCH (n) RETURN n")
+    # the stamp is only re-read every version_ttl seconds, or after invalidate()
+    assert len(graph.queries) == 1
+    cache.invalidate()
+    chain.graph.query("MATCH (n) RETURN n")
+    assert len(graph.queries) == 2
+
+
+def test_entries_expire_when_the_stamp_misses_an_edit(clock):
+    chain, cache, graph, generation, _ = cached_chain(max_age=300)
+    assert chain.graph.query("MATCH (n) RETURN n") == [{"file": "auth.js"}]
+    chain.cypher_generation_chain.invoke({"question": "who imports User"})
+    # an edit that keeps the node and relationship counts leaves the stamp as it was
+    graph.rows = [{"file": "login.js"}]
+    clock.now += 300
+    assert chain.graph.query("MATCH (n) RETURN n") == [{"file": "auth.js"}]
+    clock.now += 1
+    assert chain.graph.query("MATCH (n) RETURN n") == [{"file": "login.js"}]
+    chain.cypher_generation_chain.invoke({"question": "who imports User"})
+    assert len(generation.questions) == 2
+
+
+@pytest.mark.parametrize("max_age", [0, None, -1])
+def test_max_age_is_required(max_age):
+    with pytest.raises(ValueError):
+        cached_chain(max_age=max_age)
@@ -0,0 +1,29 @@
+from dedup import SharedArtifact, _rename, adapt
+from js_checks import mocked_modules, tokenize
+
+
+def test_rename_only_at_identifier_positions():
+    code = ("const { login } = require('../controller/auth');\n"
+            "const { login: handler } = require('../controller/auth');\n"
+            "res.login(); login('login'); f({ login: 1 }); flag ? login : other;")
+    assert _rename(code, "login", "signIn") == (
+        "const { signIn } = require('../controller/auth');\n"
+        "const { signIn: handler } = require('../controller/auth');\n"
+        "res.login(); signIn('login'); f({ login: 1 }); flag ? signIn : other;")
+
+
+def test_mocked_modules():
+    code = "jest.mock('../models/User');\nconst actual = jest.requireActual('./utils');\nother.mock('x');"
+    assert mocked_modules(tokenize(code)) == ["../models/User", "./utils"]
+
+
+def test_adapt_retargets_mock_only_code():
+    artifact = SharedArtifact(
+        source_path="/p/src/controller/auth.js", name="login", bindings=["login"],
+        mocks="```javascript\njest.mock('../models/User', () => ({ findOne: jest.fn() }));\n```",
+        tests="```javascript\nconst { login } = require('../controller/auth');\n"
+              "describe('login', () => { it('logs in', () => login(req, res)); });\n```")
+    mocks, tests = adapt(artifact, "/p/src/admin/controller/session.js", "signIn", ["signIn"])
+    assert mocks == "jest.mock('../../models/User', () => ({ findOne: jest.fn() }));"
+    assert tests == ("const { signIn } = require('../controller/session');\n"
+                     "describe('signIn', () => { it('logs in', () => signIn(req, res)); });")
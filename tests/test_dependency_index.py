@@ -0,0 +1,64 @@
+import os
+import threading
+
+import dependency_index
+from dependency_index import DependencyIndex, index_for
+
+
+def exports_of(tmp_path, code):
+    (tmp_path / "m.js").write_text(code)
+    index = DependencyIndex(str(tmp_path))
+    index.add_file("m.js")
+    return index.exports["m.js"]
+
+
+def test_single_exports(tmp_path):
+    assert exports_of(tmp_path, "const login = () => 1;\nmodule.exports = login;\n") == ["login"]
+    assert exports_of(tmp_path, "module.exports = login\n") == ["login"]
+    assert exports_of(tmp_path, "module.exports = mongoose.model('User', schema);\n") == ["default"]
+    assert exports_of(tmp_path, "module.exports = function handler(req, res) {};\n") == ["default"]
+    assert exports_of(tmp_path, "module.exports = require('./impl');\n") == ["default"]
+    assert exports_of(tmp_path, "module.exports = { login, logout: out };\n") == ["login", "logout"]
+
+
+def test_index_for_builds_once_across_threads(tmp_path, monkeypatch):
+    (tmp_path / "a.js").write_text("module.exports = 1;\n")
+    builds = []
+    build = DependencyIndex.build.__func__
+
+    def counting(cls, root):
+        builds.append(root)
+        return build(cls, root)
+
+    monkeypatch.setattr(DependencyIndex, "build", classmethod(counting))
+    monkeypatch.setattr(dependency_index, "_indexes", {})
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(index_for(str(tmp_path)))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1 and all(result is results[0] for result in results)
+
+
+def test_index_for_refresh_picks_up_an_edited_import(tmp_path, monkeypatch):
+    monkeypatch.setattr(dependency_index, "_indexes", {})
+    (tmp_path / "a.js").write_text("const b = require('./b');\n")
+    (tmp_path / "b.js").write_text("module.exports = 1;\n")
+    (tmp_path / "c.js").write_text("module.exports = 2;\n")
+    root = str(tmp_path)
+    first = index_for(root)
+    assert first.imports["a.js"] == [("./b", "b.js")]
+    assert index_for(root, refresh=True) is first
+
+    (tmp_path / "a.js").write_text("const c = require('./c');\n")
+    stat = os.stat(tmp_path / "a.js")
+    os.utime(tmp_path / "a.js", ns=(stat.st_atime_ns, first.stamp["a.js"] + 1_000_000_000))
+    # lookups without refresh keep the index they started with
+    assert index_for(root) is first
+    refreshed = index_for(root, refresh=True)
+    assert refreshed.imports["a.js"] == [("./c", "c.js")]
+    assert refreshed.importers["c.js"] == {"a.js"} and "b.js" not in refreshed.importers
+
+    (tmp_path / "d.js").write_text("require('./a');\n")
+    assert index_for(root, refresh=True).importers["a.js"] == {"d.js"}
@@ -0,0 +1,88 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from context_pruning import ContextAssembler
+from dedup import shared_artifacts
+from fanout import generate_segments
+from segments import parse_segments
+
+SEGMENTATION = "\n\n".join(
+    f"## Segment Name: {name}\n```javascript\nconst {name} = (req, res) => res.json({{ step: '{name}' }});\n```"
+    for name in ("login", "logout", "refresh", "verify"))
+
+
+class Generator:
+    """Answers mock and test tasks for the segment in the context, recording the threads it ran on"""
+
+    def __init__(self, source_path, output_dir, failing=()):
+        self.source_path = source_path
+        self.output_dir = output_dir
+        self.context_assembler = ContextAssembler()
+        self.failing = failing
+        self.clones = []
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def clone(self):
+        twin = Generator(self.source_path, self.output_dir, self.failing)
+        twin.parent = self
+        self.clones.append(twin)
+        return twin
+
+    def run_task(self, name, context=None, inputs=None):
+        root = getattr(self, "parent", self)
+        segment = context.split("\n", 1)[0].split(": ", 1)[1]
+        with root.lock:
+            root.running += 1
+            root.peak = max(root.peak, root.running)
+        time.sleep(0.02)
+        with root.lock:
+            root.running -= 1
+        if segment in self.failing:
+            raise RuntimeError(f"{segment} failed")
+        kind = "mocks" if name == "mock_generator_task" else "tests"
+        return SimpleNamespace(raw=f"{kind} for {segment} by {id(self)}")
+
+
+@pytest.fixture(autouse=True)
+def empty_library(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shared_artifacts.reset()
+    yield
+    shared_artifacts.reset()
+
+
+def test_workers_use_their_own_clones_and_keep_segment_order(tmp_path):
+    generator = Generator(str(tmp_path / "auth.js"), str(tmp_path / "out"), failing=("refresh",))
+    results = generate_segments(generator, parse_segments(SEGMENTATION), max_workers=2, reuse=False)
+    assert list(results) == ["login", "logout", "refresh", "verify"]
+    assert isinstance(results["refresh"], RuntimeError)
+    assert len(generator.clones) == 2 and generator.peak == 2
+    workers = {f"by {id(clone)}" for clone in generator.clones}
+    for name in ("login", "logout", "verify"):
+        entry = results[name]
+        assert entry.mocks.startswith(f"mocks for {name} by ") and entry.tests.startswith(f"tests for {name} by ")
+        # a segment's mocks and tests come from the same clone, never the shared generator
+        assert entry.mocks.split(" for ")[1].split(" ", 1)[1] in workers
+
+
+def test_one_worker_runs_in_order_on_the_generator(tmp_path):
+    generator = Generator(str(tmp_path / "auth.js"), str(tmp_path / "out"))
+    results = generate_segments(generator, parse_segments(SEGMENTATION)[:2], max_workers=1)
+    assert generator.clones == [] and generator.peak == 1
+    assert results["login"].tests == f"tests for login by {id(generator)}"
+
+
+def test_staged_artifacts_are_only_reused_by_their_own_run(tmp_path):
+    first = Generator(str(tmp_path / "a" / "auth.js"), str(tmp_path / "out_a"))
+    segments = parse_segments(SEGMENTATION)[:1]
+    generated = generate_segments(first, segments)["login"]
+    # another file's run only sees the artifact once the first run's tests pass and publish it
+    other = Generator(str(tmp_path / "b" / "auth.js"), str(tmp_path / "out_b"))
+    assert generate_segments(other, segments)["login"].tests == f"tests for login by {id(other)}"
+    assert generate_segments(first, segments)["login"].tests == generated.tests
+    assert shared_artifacts.stats == {"misses": 2, "hits": 1}
@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+
+import pytest
+
+from dependency_index import DependencyIndex
+from graph_access import DEPENDENCY_QUERY, MODULE_SUFFIXES, InMemoryGraph, Neo4jPool, _module_name, dependency_bundle
+
+
+def project(tmp_path):
+    for path, code in {
+        "src/models/User.js": "const mongoose = require('mongoose');\nmodule.exports = { findOne, create };\n",
+        "src/utils/token.js": "exports.sign = () => 1;\n",
+        "src/controller/auth.js": ("const User = require('../models/User');\n"
+                                   "const { sign } = require('../utils/token');\n"),
+    }.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(code)
+    return DependencyIndex.build(str(tmp_path))
+
+
+class RecordingGraph:
+    def __init__(self, rows=None, error=None):
+        self.rows = rows or []
+        self.error = error
+        self.calls = []
+
+    def query(self, query, params=None):
+        self.calls.append(params)
+        if self.error:
+            raise self.error
+        return self.rows
+
+
+def test_module_name():
+    assert _module_name("'../models/User.js'") == "models/User"
+    assert _module_name("./utils/token") == "utils/token"
+    assert _module_name("jsonwebtoken") == "jsonwebtoken"
+
+
+def test_one_query_for_every_module_with_index_fallback(tmp_path):
+    index = project(tmp_path)
+    graph = RecordingGraph([{"i": 0, "module": "models/User", "path": "server/src/models/User.js",
+                             "exports": ["findOne", None], "imports": [], "importers": ["server/src/app.js"]},
+                            {"i": 1, "module": "utils/token", "path": None, "exports": [], "imports": [],
+                             "importers": []}])
+    bundle = dependency_bundle(["../models/User", "../utils/token.js", "jsonwebtoken", "../models/User.js"],
+                               graph=graph, index=index)
+    assert graph.calls == [{"modules": ["models/User", "utils/token", "jsonwebtoken"], "suffixes": MODULE_SUFFIXES}]
+    assert bundle.graph_queries == 1
+    user, token, jwt = bundle.modules.values()
+    assert (user.source, user.exports) == ("graph", ["findOne"])
+    assert (token.source, token.path, token.exports) == ("index", "src/utils/token.js", ["sign"])
+    assert token.importers == ["src/controller/auth.js"]
+    assert jwt.source == ""
+    assert bundle.text().split("\n\n") == [
+        "### models/User\nPath: server/src/models/User.js\nExports: findOne\nImported by: server/src/app.js",
+        "### utils/token\nPath: src/utils/token.js\nExports: sign\nImported by: src/controller/auth.js",
+        "### jsonwebtoken\nNot found in the project; mock it as an external package.",
+    ]
+
+
+def test_a_failing_graph_falls_back_to_the_index(tmp_path):
+    bundle = dependency_bundle(["../models/User"], graph=RecordingGraph(error=RuntimeError("down")),
+                               index=project(tmp_path))
+    assert bundle.graph_queries == 0
+    assert bundle.modules["models/User"].source == "index"
+    assert bundle.modules["models/User"].imports == ["mongoose"]
+    assert dependency_bundle([" "], graph=RecordingGraph()).modules == {}
+
+
+def test_in_memory_graph_answers_the_dependency_query(tmp_path):
+    graph = InMemoryGraph(project(tmp_path))
+    bundle = dependency_bundle(["../models/User", "express"], graph=graph)
+    assert graph.queries == 1
+    assert bundle.modules["models/User"].importers == ["src/controller/auth.js"]
+    assert bundle.modules["express"].source == ""
+    assert graph.query("MATCH (n) RETURN n") == []
+    assert graph.query(DEPENDENCY_QUERY, {"modules": []}) == []
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+class Driver:
+    def __init__(self, error=None):
+        self.error = error
+        self.sessions = 0
+
+    def session(self, database=None):
+        self.sessions += 1
+        if self.error:
+            raise self.error
+        return Session()
+
+
+class Session:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, params):
+        return [SimpleNamespace(data=lambda: {"params": params})]
+
+
+def test_pool_fails_fast_after_the_server_is_unavailable():
+    pool = Neo4jPool(uri="bolt://graph:7687", retry_after=60)
+    pool._driver = Driver()
+    assert pool.query("RETURN 1", {"x": 1}) == [{"params": {"x": 1}}]
+    pool._driver = Driver(ServiceUnavailable("no route"))
+    with pytest.raises(ServiceUnavailable):
+        pool.query("RETURN 1")
+    with pytest.raises(ConnectionError, match="bolt://graph:7687 is unavailable"):
+        pool.query("RETURN 1")
+    assert pool._driver.sessions == 1
+
+
+def test_pool_keeps_trying_after_query_errors():
+    pool = Neo4jPool()
+    pool._driver = Driver(ValueError("bad cypher"))
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            pool.query("RETURN")
+    assert pool._driver.sessions == 2
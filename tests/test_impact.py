@@ -0,0 +1,74 @@
+import subprocess
+
+import dependency_index
+from dependency_index import DependencyIndex, index_for
+from impact import impact_analysis, impacted_files
+
+FILES = {
+    "src/models/User.js": "module.exports = { findOne };\n",
+    "src/utils/token.js": "exports.sign = () => 1;\n",
+    "src/controller/auth.js": "const User = require('../models/User');\nconst { sign } = require('../utils/token');\n",
+    "src/controller/admin.js": "const User = require('../models/User');\n",
+    "src/routes.js": "const auth = require('./controller/auth');\n",
+    "src/app.js": "const routes = require('./routes');\n",
+    "src/controller/__tests__/auth.test.js": "const auth = require('../auth');\n",
+}
+
+
+def project(tmp_path, files=FILES):
+    for path, code in files.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(code)
+    return DependencyIndex.build(str(tmp_path))
+
+
+def summary(impacts):
+    return [(i.path, i.distance, i.changed) for i in impacts]
+
+
+def test_changed_files_and_their_importers_come_first(tmp_path):
+    index = project(tmp_path)
+    assert summary(impacted_files(["src/models/User.js", "src/utils/token.js", "README.md"], index)) == [
+        ("src/models/User.js", 0, ["src/models/User.js"]),
+        ("src/utils/token.js", 0, ["src/utils/token.js"]),
+        # auth.js reaches both changed files, so it leads the distance 1 files
+        ("src/controller/auth.js", 1, ["src/models/User.js", "src/utils/token.js"]),
+        ("src/controller/admin.js", 1, ["src/models/User.js"]),
+    ]
+
+
+def test_max_depth_follows_importers_further(tmp_path):
+    index = project(tmp_path)
+    assert [(p, d) for p, d, _ in summary(impacted_files(["src/utils/token.js"], index, max_depth=None))] == [
+        ("src/utils/token.js", 0), ("src/controller/auth.js", 1), ("src/routes.js", 2), ("src/app.js", 3)]
+    assert len(impacted_files(["src/utils/token.js"], index, max_depth=2)) == 3
+
+
+def test_deleted_files_impact_their_former_importers(tmp_path):
+    files = {path: code for path, code in FILES.items() if path != "src/utils/token.js"}
+    assert summary(impacted_files(["src/utils/token.js"], project(tmp_path, files))) == [
+        ("src/controller/auth.js", 1, ["src/utils/token.js"])]
+
+
+def commit(root, message):
+    subprocess.run(["git", "-C", str(root), "add", "."], check=True, capture_output=True)
+    subprocess.run(["git", "-C", str(root), "-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-q",
+                    "-m", message], check=True, capture_output=True)
+
+
+def test_impact_analysis_sees_imports_edited_since_the_index_was_built(tmp_path, monkeypatch):
+    monkeypatch.setattr(dependency_index, "_indexes", {})
+    project(tmp_path)
+    subprocess.run(["git", "-C", str(tmp_path), "init", "-q"], check=True)
+    commit(tmp_path, "project")
+    index_for(str(tmp_path))
+
+    (tmp_path / "src" / "controller" / "admin.js").write_text("const { sign } = require('../utils/token');\n")
+    commit(tmp_path, "admin signs tokens")
+    (tmp_path / "src" / "utils" / "token.js").write_text("exports.sign = () => 2;\n")
+    commit(tmp_path, "change token")
+    assert summary(impact_analysis("HEAD~1", str(tmp_path))) == [
+        ("src/utils/token.js", 0, ["src/utils/token.js"]),
+        ("src/controller/auth.js", 1, ["src/utils/token.js"]),
+        ("src/controller/admin.js", 1, ["src/utils/token.js"]),
+    ]
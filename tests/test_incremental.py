@@ -0,0 +1,96 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from context_pruning import ContextAssembler
+
+SEGMENTATION = """## Segment Name: login
+```javascript
+const login = (req, res) => res.json({ user: req.body.email });
+```
+
+## Segment Name: logout
+```javascript
+const logout = (req, res) => res.clearCookie('{cookie}');
+```
+"""
+
+
+class Generator:
+    """The surface regenerate_incremental uses, answering each task from the segment in its context"""
+
+    def __init__(self, output_dir, cookie="token"):
+        self.source_path = os.path.join(output_dir, "auth.js")
+        self.output_dir = output_dir
+        self.context_assembler = ContextAssembler()
+        self.cookie = cookie
+        self.calls = []
+        self.tasks = {name: SimpleNamespace(description=name, agent=SimpleNamespace(role="Tester"), output=None)
+                      for name in ("mock_generator_task", "test_case_generator_task")}
+
+    def mock_generator_task(self):
+        return self.tasks["mock_generator_task"]
+
+    def test_case_generator_task(self):
+        return self.tasks["test_case_generator_task"]
+
+    def run_task(self, name, context=None, inputs=None):
+        if name == "code_segmentation_task":
+            return SimpleNamespace(raw=SEGMENTATION.replace("{cookie}", self.cookie))
+        segment = "login" if "const login" in context else "logout"
+        self.calls.append((name, segment))
+        if name == "mock_generator_task":
+            return SimpleNamespace(raw=f"// mocks for {segment}")
+        return SimpleNamespace(raw=f"```javascript\nconst {{ {segment} }} = require('./auth');\n\n"
+                                   f"describe('{segment}', () => {{ it('works', () => {segment}()); }});\n```")
+
+
+@pytest.fixture
+def incremental(tmp_path, monkeypatch):
+    pytest.importorskip("crewai")
+    import incremental
+    from dedup import shared_artifacts
+
+    # the shared artifact library lives under the working directory
+    monkeypatch.chdir(tmp_path)
+    shared_artifacts.reset()
+    yield incremental
+    shared_artifacts.reset()
+
+
+def test_only_changed_segments_are_regenerated(incremental, tmp_path):
+    out = str(tmp_path / "out")
+    os.makedirs(out)
+    generator = Generator(out)
+    test_code, regenerated, failed = incremental.regenerate_incremental(generator)
+    assert regenerated == ["login", "logout"] and failed == {}
+    assert test_code.startswith("const { login, logout } = require('./auth');\n\n")
+    with open(os.path.join(out, "code.test.js")) as f:
+        assert f.read() == test_code
+    assert generator.test_case_generator_task().output.raw == test_code
+
+    generator = Generator(out, cookie="session")
+    _, regenerated, _ = incremental.regenerate_incremental(generator)
+    assert regenerated == ["logout"]
+    assert generator.calls == [("mock_generator_task", "logout"), ("test_case_generator_task", "logout")]
+    assert "// mocks for login" in generator.mock_generator_task().output.raw
+
+
+def test_failed_segment_is_retried_on_the_next_run(incremental, tmp_path):
+    out = str(tmp_path / "out")
+    os.makedirs(out)
+    generator = Generator(out)
+    run_task = generator.run_task
+
+    def failing(name, context=None, inputs=None):
+        if name == "mock_generator_task" and "const logout" in context:
+            raise RuntimeError("rate limited")
+        return run_task(name, context, inputs)
+
+    generator.run_task = failing
+    test_code, regenerated, failed = incremental.regenerate_incremental(generator)
+    assert regenerated == ["login"] and failed == {"logout": "RuntimeError: rate limited"}
+    assert "describe('logout'" not in test_code
+    _, regenerated, _ = incremental.regenerate_incremental(Generator(out))
+    assert regenerated == ["logout"]
@@ -0,0 +1,132 @@
+import pytest
+
+from js_checks import (TokenizeError, check_balance, check_expect_placement, check_mock_definitions,
+                       check_mocked_modules, check_test_file, declared_names, format_feedback, imported_modules,
+                       tokenize)
+
+
+def kinds(code):
+    return [(t.kind, t.value) for t in tokenize(code)]
+
+
+def test_tokenize_literals_and_comments():
+    assert kinds("a = 'x' // note\n/* block */ b") == [("ident", "a"), ("punct", "="), ("string", "'x'"), ("ident", "b")]
+    assert kinds("`a ${b + `c`} d`") == [("template", "`a ${b + `c`} d`")]
+    assert kinds("x = /a\\/[/]b/g") == [("ident", "x"), ("punct", "="), ("regex", "/a\\/[/]b/g")]
+    assert kinds("a / b") == [("ident", "a"), ("punct", "/"), ("ident", "b")]
+    assert [t.line for t in tokenize("a\n\nb")] == [1, 3]
+
+
+def test_tokenize_jsx_closing_tags():
+    assert kinds("render(<div>hi</div>)")[-5:] == [("punct", "<"), ("punct", "/"), ("ident", "div"), ("punct", ">"),
+                                                  ("punct", ")")]
+    assert [t.value for t in tokenize("<><p/></>")] == ["<", ">", "<", "p", "/", ">", "<", "/", ">"]
+    # a "<" followed by a spaced regex is still a comparison with a regex
+    assert kinds("a < /b/.source")[2] == ("regex", "/b/")
+
+
+@pytest.mark.parametrize("code", ["'open", "`open", "x = /open\n"])
+def test_tokenize_unterminated(code):
+    with pytest.raises(TokenizeError):
+        tokenize(code)
+
+
+def test_check_balance():
+    assert check_balance(tokenize("f({ a: [1] })")) == []
+    assert [i.message for i in check_balance(tokenize("f(\n{ a: 1 )"))] == ["')' closes '{' opened on line 2"]
+    assert [i.kind for i in check_balance(tokenize("f(1"))] == ["unbalanced"]
+    assert check_balance(tokenize("}"))[0].message == "unexpected '}' with nothing open"
+
+
+def test_imported_modules():
+    code = "const a = require('a');\nimport b from './b';\nimport './c';\nconst d = import('d');"
+    assert imported_modules(tokenize(code)) == ["a", "./b", "./c", "d"]
+
+
+def test_check_mocked_modules():
+    source = tokenize("const User = require('../models/User');")
+    assert check_mocked_modules(tokenize("jest.mock('../../src/models/User');"), source) == []
+    issues = check_mocked_modules(tokenize("jest.mock('axios');"), source)
+    assert [i.kind for i in issues] == ["unused-mock"]
+    # without the source's requires there is nothing to compare against
+    assert check_mocked_modules(tokenize("jest.mock('axios');"), tokenize("f()")) == []
+
+
+def test_expect_inside_tests_and_hooks():
+    code = """
+describe('login', () => {
+  beforeEach(() => { expect(setup).toBeDefined(); });
+  it('works', () => { expect(1).toBe(1); });
+  test.each([1])('each %i', (n) => expect(n).toBe(n));
+});
+"""
+    assert check_expect_placement(tokenize(code)) == []
+
+
+def test_expect_in_helpers_is_allowed():
+    code = """
+const expectStatus = (res, code) => expect(res.status).toHaveBeenCalledWith(code);
+function expectJson(res) {
+  expect(res.json).toHaveBeenCalled();
+}
+describe('login', () => {
+  const expectToken = (res) =>
+    expect(res.json).toHaveBeenCalledWith({ token: expect.any(String) });
+  const helpers = { check(res) { expect(res).toBeDefined(); } };
+  it('works', () => { expectStatus(res, 200); });
+});
+"""
+    assert check_expect_placement(tokenize(code)) == []
+
+
+def test_expect_directly_in_module_or_describe_scope():
+    code = """
+const check = () => true
+expect(check()).toBe(true);
+describe('login', () => {
+  expect(1).toBe(1);
+  if (flag) { expect(2).toBe(2); }
+});
+"""
+    assert [i.line for i in check_expect_placement(tokenize(code))] == [3, 5, 6]
+
+
+def test_declared_names():
+    code = "const { a, b } = x; let [c] = y; function f(p, q) {} class K {}\nconst g = (r) => r; import h, { i } from 'm';"
+    assert {"a", "b", "c", "f", "p", "q", "K", "g", "r", "h", "i"} <= declared_names(tokenize(code))
+
+
+def test_check_mock_definitions():
+    code = "const mockFind = jest.fn();\njest.mock('m', () => ({ find: mockFind, mockKey: 1, save: mockSave }));\nobj.mockOther();"
+    issues = check_mock_definitions(tokenize(code))
+    assert [(i.kind, i.line) for i in issues] == [("undefined-mock", 2)]
+    assert "mockSave" in issues[0].message
+
+
+def test_check_test_file():
+    assert check_test_file("describe('a', () => { it('b', () => { expect(1).toBe(1); }); });") == []
+    assert [i.kind for i in check_test_file("it('a', () => { 'open")] == ["syntax"]
+    # structure checks stop at the first imbalance
+    assert {i.kind for i in check_test_file("expect(1);\nit('a', () => {")} == {"unbalanced"}
+    issues = check_test_file("jest.mock('axios');\nexpect(1);", "const x = require('y');")
+    assert [i.kind for i in issues] == ["unused-mock", "expect-outside-test"]
+
+
+def test_check_test_file_with_jsx():
+    test_code = """
+const { render, screen } = require('@testing-library/react');
+const Login = require('../Login');
+
+it('renders the form', () => {
+  render(<div><Login title="Sign in" /></div>);
+  expect(screen.getByText('Sign in')).toBeTruthy();
+});
+"""
+    assert check_test_file(test_code, "module.exports = function Login() {}") == []
+
+
+def test_format_feedback():
+    issues = check_test_file("expect(1);")
+    text = format_feedback(issues)
+    assert text.startswith("Issue 1: line 1: expect() runs outside any it()/test() block [expect-outside-test]")
+    assert "Recommended fix: move this assertion" in text
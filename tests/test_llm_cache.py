@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def module():
+    pytest.importorskip("crewai")
+    import llm_cache
+
+    return llm_cache
+
+
+def test_nothing_is_created_before_first_use(tmp_path):
+    path = tmp_path / "cache" / "llm.sqlite"
+    cache = module().LLMCache(str(path))
+    assert not path.parent.exists()
+    cache.set("k", "answer")
+    assert path.exists()
+
+
+def test_key_covers_everything_that_shapes_the_answer():
+    key = module().LLMCache.key
+    messages = [{"role": "user", "content": "Write tests"}]
+    assert key("gpt-4o-mini", 0, messages) == key("gpt-4o-mini", 0, [dict(messages[0])])
+    assert len({key("gpt-4o-mini", 0, messages), key("gpt-4o", 0, messages), key("gpt-4o-mini", 0.7, messages),
+                key("gpt-4o-mini", 0, [{"role": "user", "content": "Write mocks"}]),
+                key("gpt-4o-mini", 0, messages, tools=[{"name": "mocking_tool"}])}) == 5
+
+
+def test_hits_misses_and_persistence(tmp_path):
+    llm_cache = module()
+    path = str(tmp_path / "llm.sqlite")
+    cache = llm_cache.LLMCache(path)
+    assert cache.get("k") is None
+    cache.set("k", "answer")
+    assert cache.get("k") == "answer"
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+    assert llm_cache.LLMCache(path).get("k") == "answer"
+
+
+def test_ttl_and_lru_eviction(tmp_path, monkeypatch):
+    llm_cache = module()
+    clock = Clock()
+    monkeypatch.setattr(llm_cache, "time", clock)
+    cache = llm_cache.LLMCache(str(tmp_path / "llm.sqlite"), max_entries=2, ttl=60)
+    cache.set("a", "1")
+    clock.now += 1
+    cache.set("b", "2")
+    clock.now += 1
+    assert cache.get("a") == "1"  # now b is the least recently used
+    cache.set("c", "3")
+    assert cache.get("b") is None and cache.get("a") == "1" and cache.get("c") == "3"
+    clock.now += 61
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_cached_llm_replays_repeated_prompts(tmp_path, monkeypatch):
+    llm_cache = module()
+    from crewai import LLM
+
+    calls = []
+
+    def answer(self, messages, tools=None, *args, **kwargs):
+        calls.append(messages)
+        return f"answer {len(calls)}"
+
+    monkeypatch.setattr(LLM, "call", answer)
+    cache = llm_cache.LLMCache(str(tmp_path / "llm.sqlite"))
+    llm = llm_cache.CachedLLM(model="gpt-4o-mini", temperature=0, cache=cache)
+    messages = [{"role": "user", "content": "Write tests for auth.js"}]
+    assert llm.call(messages) == "answer 1"
+    assert llm.call([dict(messages[0])]) == "answer 1"
+    assert llm.call([{"role": "user", "content": "Write tests for user.js"}]) == "answer 2"
+    assert len(calls) == 2 and cache.hits == 1
+    assert os.path.exists(cache.path)
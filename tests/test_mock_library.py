@@ -0,0 +1,39 @@
+from mock_library import MockLibrary, module_key
+
+TEST = """
+const { login } = require('../controller/auth');
+const User = require('../models/User');
+jest.mock('../models/User', () => ({ findOne: jest.fn() }));
+it('logs in', async () => { await login({}, {}); expect(User.findOne).toHaveBeenCalled(); });
+"""
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+
+def test_module_key_resolves_from_the_project_root(tmp_path):
+    root = tmp_path / "proj"
+    assert module_key("./utils", root / "src", root) == "src/utils"
+    assert module_key("../utils/index.js", root / "src" / "a", root) == "src/utils"
+    assert module_key("../utils", root / "src", root) == "utils"
+    assert module_key("jsonwebtoken", root / "src", root) == "jsonwebtoken"
+
+
+def test_fixture_specifiers_follow_the_output_test(tmp_path):
+    root = tmp_path / "proj"
+    auth = write(root / "src" / "controller" / "auth.js",
+                 "const User = require('../models/User');\nexports.login = () => User.findOne({});\n")
+    top = write(root / "src" / "top.js", "const User = require('./models/User');\nmodule.exports = () => User.findOne();\n")
+    other = write(root / "src" / "other.js", "const User = require('../models/User');\nmodule.exports = () => User.findOne();\n")
+    library = MockLibrary(str(tmp_path / "library.json"))
+
+    [fixture] = library.record(TEST, auth, str(root / "rmjt_tests"), str(root))
+    assert (fixture.module, fixture.spec) == ("src/models/User", "../models/User")
+
+    text = library.fixtures_text(top, str(root / "rmjt_tests" / "top"), str(root))
+    assert "jest.mock('../../src/models/User'" in text
+    # ../models/User from src/ is a different module
+    assert library.fixtures_text(other, str(root / "rmjt_tests"), str(root)) == "none"
@@ -0,0 +1,65 @@
+from patching import Hunk, apply_feedback, apply_hunk, extract_hunks, split_issues
+
+TESTS = """describe('login', () => {
+  it('rejects a missing password', async () => {
+    const res = mockRes();
+    await login({ body: {} }, res);
+    expect(res.status).toHaveBeenCalledWith(401);
+  });
+
+  it('signs a token', async () => {
+    User.findOne.mockResolvedValue(user);
+    await login(req, res);
+    expect(jwt.sign).toHaveBeenCalled();
+  });
+});
+"""
+
+
+def fix(before, after, title="Issue 1: wrong status"):
+    return f"{title}\n\nCurrent code:\n```javascript\n{before}\n```\n\nRecommended fix:\n```javascript\n{after}\n```"
+
+
+def test_split_issues():
+    feedback = "Summary first.\n\nIssue 1: a\ndetails\n**Issue 2**: b\n- Issue 3 c"
+    assert split_issues(feedback) == ["Summary first.", "Issue 1: a\ndetails", "**Issue 2**: b", "- Issue 3 c"]
+    assert split_issues("just one remark") == ["just one remark"]
+    assert split_issues("  ") == []
+
+
+def test_extract_hunks_pairs_in_order():
+    issue = fix("a();", "b();") + "\n\nCurrent code:\n```js\nc();\n```\nSuggested code:\n```\nd();\n```"
+    assert [(h.before, h.after) for h in extract_hunks(issue)] == [("a();\n", "b();\n"), ("c();\n", "d();\n")]
+
+
+def test_apply_hunk_matches_exactly_or_fuzzily_and_reindents():
+    hunk = Hunk(issue="", before="expect(res.status).toHaveBeenCalledWith(401);",
+                after="expect(res.status).toHaveBeenCalledWith(400);")
+    assert apply_hunk(TESTS, hunk) == TESTS.replace("(401)", "(400)")
+    # a snippet quoted without indentation and with a small typo still lands on the right lines
+    fuzzy = Hunk(issue="",
+                 before="await login({ body: {} }, res)\nexpect(res.status).toHaveBeenCalledWith(401);",
+                 after="await login({ body: { email: 'a@b.c' } }, res);\n"
+                       "expect(res.status).toHaveBeenCalledWith(400);")
+    expected = TESTS.replace("body: {} }", "body: { email: 'a@b.c' } }").replace("(401)", "(400)")
+    assert apply_hunk(TESTS, fuzzy) == expected
+
+
+def test_apply_hunk_refuses_ambiguous_missing_or_breaking_fixes():
+    # "});" closes three blocks, so it can't be placed
+    assert apply_hunk(TESTS, Hunk(issue="", before="});", after="}));")) is None
+    assert apply_hunk(TESTS, Hunk(issue="", before="// Problematic code", after="fixed();")) is None
+    assert apply_hunk(TESTS, Hunk(issue="", before="expect(jwt.sign).toHaveBeenCalled();",
+                                  after="expect(jwt.sign).toHaveBeenCalled(;")) is None
+
+
+def test_apply_feedback_returns_what_it_could_not_apply():
+    feedback = "\n\n".join([
+        fix("expect(res.status).toHaveBeenCalledWith(401);", "expect(res.status).toHaveBeenCalledWith(400);"),
+        fix("res.cookie('token');", "res.cookie('token', token);", title="Issue 2: cookie"),
+        "Issue 3: add a test for a wrong password",
+    ])
+    code, applied, remaining = apply_feedback(TESTS, feedback)
+    assert code == TESTS.replace("(401)", "(400)")
+    assert len(applied) == 1
+    assert remaining.startswith("Issue 2: cookie") and remaining.endswith("Issue 3: add a test for a wrong password")
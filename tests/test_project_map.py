@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+
+
+def module():
+    pytest.importorskip("crewai")
+    import project_map
+
+    return project_map
+
+
+def project(tmp_path):
+    root = tmp_path / "app"
+    for path, text in {
+        "package.json": json.dumps({"name": "app", "main": "server/src/index.js",
+                                    "scripts": {"start": "node server/src/index.js", "lint": "eslint ."},
+                                    "dependencies": {"express": "4", "mongoose": "7"},
+                                    "devDependencies": {"jest": "29"}}),
+        ".gitignore": "generated/\n*.log\n!keep.log\n",
+        "server/src/index.js": "",
+        "server/src/controller/auth.js": "",
+        "server/src/controller/__tests__/auth.test.js": "",
+        "server/src/public/logo.png": "",
+        "server/src/public/vendor.min.js": "",
+        "server/generated/schema.js": "",
+        "server/debug.log": "",
+        "server/keep.log": "",
+        "node_modules/express/index.js": "",
+    }.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(text)
+    return root
+
+
+def test_gitignore_rules():
+    ignore = module().GitIgnore()
+    ignore.add("", "build/\n*.log\n!keep.log\n/top.js\ndocs/**/*.md")
+    assert ignore.ignored("server/build", True) and not ignore.ignored("server/build", False)
+    assert ignore.ignored("server/debug.log", False) and not ignore.ignored("server/keep.log", False)
+    assert ignore.ignored("top.js", False) and not ignore.ignored("src/top.js", False)
+    assert ignore.ignored("docs/a/b/readme.md", False) and not ignore.ignored("docs/readme.txt", False)
+    scoped = module().GitIgnore()
+    scoped.add("server", "*.tmp")
+    assert scoped.ignored("server/x.tmp", False) and not scoped.ignored("client/x.tmp", False)
+
+
+def test_summary_leaves_out_ignored_vendored_and_binary_files(tmp_path):
+    root = project(tmp_path)
+    summary = module().ProjectMap(str(root), cache_path=str(tmp_path / "map.json")).update().summary()
+    assert summary.splitlines()[1:] == [
+        "6 source/config files in 6 directories; skipped: generated, node_modules",
+        "Packages:",
+        "- package.json | name app | stack: express, mongoose, jest | scripts: start=node server/src/index.js",
+        "Entry points: server/src/index.js",
+        "Test locations: server/src/controller/__tests__ (1 files)",
+        "Directories (file counts by extension):",
+        "- ./: 1 .gitignore, 1 .json",
+        # debug.log is ignored, keep.log re-included; public/ only holds a binary and a minified bundle
+        "- server/: 1 .log",
+        "- server/src/: 1 .js [index.js]",
+        "- server/src/controller/: 1 .js [auth.js]",
+        "- server/src/controller/__tests__/: 1 .js [auth.test.js]",
+    ]
+
+
+def test_update_only_relists_changed_directories(tmp_path, monkeypatch):
+    project_map = module()
+    root = project(tmp_path)
+    cache = str(tmp_path / "map.json")
+    project_map.ProjectMap(str(root), cache_path=cache).update()
+
+    listed = []
+    listdir = os.listdir
+    monkeypatch.setattr(project_map.os, "listdir", lambda path: listed.append(path) or listdir(path))
+    controller = root / "server" / "src" / "controller"
+    (controller / "user.js").write_text("")
+    stat = os.stat(controller)
+    os.utime(controller, (stat.st_atime, stat.st_mtime + 5))
+    summary = project_map.ProjectMap(str(root), cache_path=cache).update().summary()
+    assert listed == [str(controller)]
+    assert "- server/src/controller/: 2 .js [auth.js, user.js]" in summary
+
+
+def test_project_map_tool(tmp_path, monkeypatch):
+    project_map = module()
+    monkeypatch.chdir(tmp_path)
+    root = project(tmp_path)
+    assert project_map.ProjectMapTool(project_root=str(root))._run().startswith(f"Project map of {root}")
@@ -0,0 +1,58 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+
+def module():
+    pytest.importorskip("crewai")
+    import result_repair
+
+    return result_repair
+
+
+@pytest.mark.parametrize("answer", [
+    '{"expected_coverage": 75, "feedback": "ok", "pass_fail": "PASS"}',
+    'Here is the result:\n```json\n{"expected_coverage": 75, "feedback": "ok", "pass_fail": "PASS",}\n```',
+    "{'expected_coverage': '75%', 'feedback': 'ok', 'pass_fail': 'pass'}",
+    '{expected_coverage: 0.75, feedback: "ok", // looks fine\n pass_fail: PASS}',
+    '{"Expected Coverage": "~75 percent", "feedback": "ok", "pass-fail": True',
+])
+def test_malformed_answers_are_repaired(answer):
+    result = module().parse_result(answer, module().Result)
+    assert (result.expected_coverage, result.feedback, result.pass_fail) == (75, "ok", "PASS")
+
+
+def test_field_types_normalize_values():
+    result_repair = module()
+    result = result_repair.Result.model_validate({
+        "expected_coverage": 140, "feedback": ["Mock User.findOne", {"line": 3, "fix": "await login"}],
+        "pass_fail": "Failed", "confidence": "medium",
+        "segments": [{"segment_id": "login", "pass_fail": False, "issues": None}],
+    })
+    assert result.expected_coverage == 100
+    assert result.feedback == 'Mock User.findOne\n\n{\n  "line": 3,\n  "fix": "await login"\n}'
+    assert (result.pass_fail, result.confidence) == ("FAIL", 0.6)
+    assert (result.segments[0].pass_fail, result.segments[0].issues) == ("FAIL", "")
+    with pytest.raises(ValueError):
+        result_repair.Result.model_validate({"expected_coverage": 1, "feedback": "", "pass_fail": "maybe"})
+
+
+def test_extract_json_escapes_raw_newlines_and_closes_a_cut_off_object():
+    text = 'Final: {"feedback": "line one\nline two \\d", "segments": [{"segment_id": "login"'
+    assert json.loads(module().extract_json(text)) == {"feedback": "line one\nline two \\d",
+                                                       "segments": [{"segment_id": "login"}]}
+    with pytest.raises(ValueError):
+        module().extract_json("no object here")
+
+
+def test_result_of_prefers_crewai_conversion_and_counts_repairs():
+    result_repair = module()
+    converted = result_repair.Result(expected_coverage=80, feedback="", pass_fail="PASS")
+    assert result_repair.result_of(SimpleNamespace(pydantic=converted, raw=""), result_repair.Result) is converted
+    before = result_repair.stats["repaired"]
+    output = SimpleNamespace(pydantic=None, raw="{expected_coverage: 10, feedback: '', pass_fail: fail}")
+    assert result_repair.result_of(output, result_repair.Result).pass_fail == "FAIL"
+    assert result_repair.stats["repaired"] == before + 1
+    with pytest.raises(ValueError, match="did not return a valid Result"):
+        result_repair.result_of(SimpleNamespace(pydantic=None, raw="I could not analyze it"), result_repair.Result)
@@ -0,0 +1,87 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from context_pruning import ContextAssembler
+
+TESTS = ("const { login, logout } = require('./auth');\n\n"
+         "describe('login', () => { it('logs in', () => expect(login()).toBe(1)); });\n\n"
+         "describe('logout', () => { it('logs out', () => logout()); });\n")
+SEGMENTATION = ("## Segment Name: login\n```javascript\nconst login = () => 1;\n```\n\n"
+                "## Segment Name: logout\n```javascript\nconst logout = () => {};\n```\n")
+
+
+def module():
+    pytest.importorskip("crewai")
+    import segment_feedback
+
+    return segment_feedback
+
+
+def verdict(segment_id, pass_fail, issues=""):
+    return SimpleNamespace(segment_id=segment_id, pass_fail=pass_fail, issues=issues)
+
+
+class Generator:
+    def __init__(self, output_dir, answer):
+        self.output_dir = output_dir
+        self.context_assembler = ContextAssembler()
+        self.answer = answer
+        self.requests = []
+        self.tasks = {name: SimpleNamespace(description=name, agent=SimpleNamespace(role="Tester"), output=None)
+                      for name in ("code_segmentation_task", "mock_generator_task", "test_case_generator_task")}
+        self.tasks["code_segmentation_task"].output = SimpleNamespace(raw=SEGMENTATION)
+
+    def code_segmentation_task(self):
+        return self.tasks["code_segmentation_task"]
+
+    def mock_generator_task(self):
+        return self.tasks["mock_generator_task"]
+
+    def test_case_generator_task(self):
+        return self.tasks["test_case_generator_task"]
+
+    def run_task(self, name, context=None, inputs=None):
+        self.requests.append((name, context, inputs))
+        return SimpleNamespace(raw=self.answer)
+
+
+def test_failing_segments():
+    segment_feedback = module()
+    verdicts = {"login": verdict("login", "FAIL"), "logout": verdict("logout", "pass")}
+    assert segment_feedback.failing_segments(verdicts, TESTS) == ["login"]
+    assert segment_feedback.failing_segments({"login": verdict("login", "PASS")}, TESTS) is None
+    # a verdict for a block the file doesn't have means the whole file must be regenerated
+    assert segment_feedback.failing_segments({"signup": verdict("signup", "FAIL")}, TESTS) is None
+
+
+def test_scope_for():
+    assert module().scope_for(["login", "logout"]) == "only the top-level describe blocks titled: 'login', 'logout'"
+
+
+def test_regenerate_splices_only_the_failing_block(tmp_path):
+    segment_feedback = module()
+    answer = ("```javascript\nconst { login } = require('./auth');\n\n"
+              "describe('login', () => { it('fixed', () => {}); });\n```")
+    generator = Generator(str(tmp_path), answer)
+    verdicts = {"login": verdict("login", "FAIL", "assert the return value")}
+    test_code, spliced = segment_feedback.regenerate_segments(generator, TESTS, verdicts, ["login"])
+    assert spliced == ["login"]
+    assert test_code == TESTS.replace("it('logs in', () => expect(login()).toBe(1));", "it('fixed', () => {});")
+    (name, context, inputs), = generator.requests
+    assert inputs == {"feedback": "assert the return value"}
+    # only the login segment and its current block go to the model
+    assert "const login" in context and "const logout" not in context and "it('logs in'" in context
+    with open(os.path.join(str(tmp_path), "code.test.js")) as f:
+        assert f.read() == test_code
+    assert generator.test_case_generator_task().output.raw == test_code
+
+
+def test_regenerate_follows_a_renamed_block(tmp_path):
+    segment_feedback = module()
+    generator = Generator(str(tmp_path), "describe('logout flow', () => {});")
+    test_code, spliced = segment_feedback.regenerate_segments(generator, TESTS, {"logout": verdict("logout", "FAIL")},
+                                                              ["logout"])
+    assert spliced == ["logout flow"]
+    assert test_code.endswith("describe('logout flow', () => {});\n") and "logs out" not in test_code
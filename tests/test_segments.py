@@ -0,0 +1,80 @@
+from segments import (Manifest, SegmentEntry, describe_blocks, extract_code, merge_test_files, parse_segments,
+                      source_hash, splice_block, top_level_statements)
+
+SEGMENTATION = """Here is the segmented code.
+
+## Segment Name: login
+```javascript
+const login = async (req, res) => {
+  const user = await User.findOne({ email: req.body.email });
+  if (!user) return res.status(404).json({ message: 'Not found' });
+};
+```
+
+## Segment Name: [logout]
+```js
+const logout = (req, res) => res.clearCookie('token');
+```
+"""
+
+
+def test_extract_code():
+    assert extract_code("Sure:\n```javascript\na();\n```\ntext\n```js\nb();\n```") == "a();\n\nb();"
+    assert extract_code("  plain();  ") == "plain();"
+
+
+def test_source_hash_ignores_comments_and_whitespace():
+    assert source_hash("const a = 1; // one\n") == source_hash("/* note */ const a =\n  1;")
+    assert source_hash("const a = '// kept';") != source_hash("const a = '';")
+    assert source_hash("const a = 1;") != source_hash("const a = 2;")
+
+
+def test_parse_segments():
+    segments = parse_segments(SEGMENTATION)
+    assert [s.name for s in segments] == ["login", "logout"]
+    assert segments[1].code == "const logout = (req, res) => res.clearCookie('token');"
+    assert segments[0].text.startswith("## Segment Name: login") and "logout" not in segments[0].text
+
+
+def test_manifest_find_by_name_or_renamed_hash(tmp_path):
+    login, logout = parse_segments(SEGMENTATION)
+    manifest = Manifest(segments={"login": SegmentEntry(hash=login.hash, tests="t1")}, order=["login"])
+    path = str(tmp_path / "out" / "manifest.json")
+    manifest.save(path)
+    manifest = Manifest.load(path)
+    assert manifest.find(login).tests == "t1"
+    assert manifest.find(login.model_copy(update={"name": "signIn"})).tests == "t1"
+    assert manifest.find(logout) is None
+    assert Manifest.load(str(tmp_path / "missing.json")).segments == {}
+
+
+def test_describe_blocks_and_splice():
+    code = ("const x = require('x');\n"
+            "describe('login', () => { it('says \"})\"', () => {}); });\n"
+            "// describe('commented', () => {});\n"
+            "describe(`logout`, () => { it('clears', () => {}); });\n")
+    blocks = describe_blocks(code)
+    assert list(blocks) == ["login", "logout"]
+    start, end = blocks["login"]
+    assert code[start:end] == "describe('login', () => { it('says \"})\"', () => {}); });"
+    spliced = splice_block(code, "logout", "describe('logout', () => {});")
+    assert spliced.endswith("describe('logout', () => {});\n") and "clears" not in spliced
+
+
+def test_top_level_statements():
+    prelude = "const a = require('a')\nconst b = a\n  .b;\njest.mock('c', () => ({\n  d: 1,\n}));"
+    assert top_level_statements(prelude) == ["const a = require('a')", "const b = a\n  .b;",
+                                             "jest.mock('c', () => ({\n  d: 1,\n}));"]
+
+
+def test_merge_test_files():
+    first = ("const { login } = require('../controller/auth');\nconst User = require('../models/User');\n"
+             "jest.mock('../models/User');\n\ndescribe('login', () => {});\n")
+    second = ("const { logout } = require('../controller/auth');\nconst User = require('../models/User');\n"
+              "jest.mock('../models/User', () => ({}));\n\ndescribe('logout', () => {});\n")
+    assert merge_test_files([first, second]) == (
+        "const { login, logout } = require('../controller/auth');\n"
+        "const User = require('../models/User');\n"
+        "jest.mock('../models/User');\n\n"
+        "describe('login', () => {});\n\n"
+        "describe('logout', () => {});\n")
@@ -0,0 +1,98 @@
+import os
+from types import SimpleNamespace
+
+from streaming import StreamWriter, describe_units, segment_units, stream_generation, stream_sink, writer_for
+
+ANSWER = """Thought: I now can give a great answer
+Final Answer: ```javascript
+const { login, logout } = require('./auth');
+
+describe('login', () => {
+  it('logs in', () => {});
+});
+
+describe('logout', () => {
+  it('logs out', () => {});
+});
+```"""
+CODE = ANSWER.split("Final Answer: ")[1]
+
+
+def feed(writer, text, size=7):
+    writer.begin()
+    for i in range(0, len(text), size):
+        writer.feed(text[i:i + size])
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_describe_units_only_returns_closed_blocks():
+    partial = CODE[:CODE.index("it('logs out'")]
+    prelude, units = describe_units(partial)
+    assert prelude == "const { login, logout } = require('./auth');"
+    assert [title for title, _ in units] == ["login"]
+    assert [title for title, _ in describe_units(CODE, final=True)[1]] == ["login", "logout"]
+
+
+def test_segment_units_wait_for_the_next_heading():
+    text = "## Segment Name: login\ncode a\n\n## Segment Name: [logout]\ncode b"
+    assert segment_units(text) == ("", [("login", "## Segment Name: login\ncode a")])
+    assert [name for name, _ in segment_units(text, final=True)[1]] == ["login", "logout"]
+
+
+def test_writer_rewrites_the_file_as_blocks_complete(tmp_path):
+    path = str(tmp_path / "out" / "code.test.js")
+    seen = []
+    writer = StreamWriter(path, describe_units, "describe",
+                          on_event=lambda event: seen.append((event.title, read(path))))
+    feed(writer, ANSWER)
+    # each event fires once its block is on disk, after the prelude and every earlier block
+    assert [title for title, _ in seen] == ["login", "logout"]
+    assert seen[0][1] == "const { login, logout } = require('./auth');\n\ndescribe('login', () => {\n" \
+                         "  it('logs in', () => {});\n});\n"
+    assert "describe('logout'" in seen[1][1]
+    writer.finish(CODE)
+    assert [(e.kind, e.index) for e in writer.events] == [("describe", 0), ("describe", 1), ("done", 2)]
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_writer_ignores_reasoning_and_restarts_with_each_call(tmp_path):
+    path = str(tmp_path / "code.test.js")
+    writer = StreamWriter(path, describe_units, "describe")
+    feed(writer, "Thought: maybe\ndescribe('draft', () => {\n});\nAction: mocking_tool\n")
+    assert not os.path.exists(path)
+    feed(writer, ANSWER.replace("'login'", "'signIn'"))
+    feed(writer, ANSWER)
+    assert [e.title for e in writer.events] == ["signIn", "logout", "login", "logout"]
+    assert "signIn" not in read(path)
+
+
+def test_writer_for_uses_the_callback_path(tmp_path):
+    tests = writer_for(SimpleNamespace(callback=SimpleNamespace(path=str(tmp_path / "code.test.js"))))
+    assert tests.kind == "describe" and tests.path == str(tmp_path / "code.test.js")
+    assert writer_for(SimpleNamespace(callback=SimpleNamespace(path=str(tmp_path / "code.js")))).kind == "segment"
+    assert writer_for(SimpleNamespace(callback=None)) is None
+
+
+def test_stream_generation_streams_only_file_tasks(tmp_path):
+    path = str(tmp_path / "code.test.js")
+    tasks = [SimpleNamespace(name="mock_generator_task", callback=None),
+             SimpleNamespace(name="test_case_generator_task", callback=SimpleNamespace(path=path))]
+    sinks = []
+
+    def run_task(name):
+        writer = stream_sink.get()
+        sinks.append((name, writer))
+        if writer is not None:
+            feed(writer, ANSWER)
+        return SimpleNamespace(raw=CODE)
+
+    en_gen = SimpleNamespace(shared_crew=lambda name: SimpleNamespace(tasks=tasks), run_task=run_task)
+    events = stream_generation(en_gen)
+    assert [(name, writer is None) for name, writer in sinks] == [("mock_generator_task", True),
+                                                                 ("test_case_generator_task", False)]
+    assert [e.kind for e in events] == ["describe", "describe", "done"]
+    assert stream_sink.get() is None
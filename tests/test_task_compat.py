@@ -0,0 +1,60 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from task_compat import SaveOutput, interpolate_inputs, upstream_context
+
+
+def stub_llm(answer):
+    """A crewai LLM answering every prompt with `answer` and recording the prompts"""
+    from crewai import LLM
+
+    class StubLLM(LLM):
+        def call(self, messages, *args, **kwargs):
+            self.prompts.append(messages if isinstance(messages, str)
+                                else "\n".join(str(m.get("content", "")) for m in messages))
+            return answer
+
+    llm = StubLLM(model="gpt-4o-mini", temperature=0)
+    llm.prompts = []
+    return llm
+
+
+def test_save_output_keeps_absolute_paths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / "out" / "auth" / "code.test.js")
+    SaveOutput(path)(SimpleNamespace(raw="it('works', () => {});"))
+    with open(path) as f:
+        assert f.read() == "it('works', () => {});"
+    # nothing is written under the working directory with the leading / dropped
+    assert not os.path.exists(os.path.join(str(tmp_path), path.lstrip("/")))
+
+
+def test_task_without_context():
+    pytest.importorskip("crewai")
+    from crewai import Agent, Task
+
+    agent = Agent(role="Tester", goal="test", backstory="tests", llm=stub_llm("x"))
+    task = Task(description="Write tests for {feedback}", expected_output="tests", agent=agent)
+    assert upstream_context(task) is None
+    interpolate_inputs(task, {"feedback": "the login branch"})
+    assert "the login branch" in task.description
+
+
+def test_run_task_with_a_stub_llm(tmp_path):
+    pytest.importorskip("crewai")
+    from new_rmjt import EnhancedGenerator
+
+    source = tmp_path / "auth.js"
+    source.write_text("const login = (req, res) => res.status(200).json({});\nmodule.exports = { login };\n")
+    generator = EnhancedGenerator(str(source), str(tmp_path / "out"), str(tmp_path))
+    answer = "## Segment 1: login\n```javascript\nconst login = () => 1;\n```"
+    stub = stub_llm(answer)
+    output = generator.run_task("code_segmentation_task", llm=stub)
+    assert output.raw == answer
+    assert stub.prompts
+    # the callback writes code.js to the absolute output directory
+    assert (tmp_path / "out" / "code.js").read_text() == answer
+    # the agent gets its own model back after the call
+    assert generator.code_segmentation_task().agent.llm is not stub
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from tracing import Tracer, percentile, span, traced
+
+
+class Step:
+    """Stands in for the flow: a tracer is only built when a step first asks for it"""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.built = 0
+
+    def _get_tracer(self):
+        if getattr(self, "_tracer", None) is None:
+            self.built += 1
+            self._tracer = Tracer("run-1", self.output_dir)
+        return self._tracer
+
+    @traced
+    def generate(self):
+        with span("gpt-4o-mini", "llm", prompt_tokens=100) as opened:
+            opened.attrs["completion_tokens"] = 20
+        with span("gpt-4o-mini", "llm", prompt_tokens=50, cached=True):
+            pass
+        return "done"
+
+    @traced
+    async def analyze(self):
+        with span("static_logic_analysis_task", "task"):
+            with span("o1", "llm", prompt_tokens=10, completion_tokens=5):
+                pass
+
+
+def test_percentile():
+    assert percentile([5, 1, 3], 50) == 3
+    assert percentile([1, 2, 3, 4], 95) == 4
+    assert percentile([7], 0) == 7
+
+
+def test_span_without_tracer_is_a_no_op():
+    with span("anything", "llm") as opened:
+        assert opened is None
+
+
+def test_traced_steps_nest_spans_and_export(tmp_path):
+    step = Step(str(tmp_path / "trace"))
+    # reading public attributes, as Flow.__init__ does, builds nothing
+    for name in dir(step):
+        getattr(step, name)
+    assert step.built == 0
+
+    assert step.generate() == "done"
+    asyncio.run(step.analyze())
+    tracer = step._get_tracer()
+    assert step.built == 1
+    # cached calls cost no tokens
+    assert tracer.tokens() == 100 + 20 + 10 + 5
+
+    summary = tracer.summary()
+    assert summary["step_counts"] == {"generate": 1, "analyze": 1}
+    assert summary["tokens_by_stage"]["generate"] == {"prompt": 150, "completion": 20, "calls": 2, "cached": 1}
+    assert summary["tokens_by_stage"]["static_logic_analysis_task"]["prompt"] == 10
+
+    assert sorted(os.listdir(tmp_path / "trace")) == ["spans.jsonl", "summary.json", "trace.json"]
+    spans = [json.loads(line) for line in (tmp_path / "trace" / "spans.jsonl").read_text().splitlines()]
+    by_id = {s["id"]: s for s in spans}
+    llm = next(s for s in spans if s["name"] == "o1")
+    assert by_id[llm["parent"]]["name"] == "static_logic_analysis_task"
+    assert by_id[by_id[llm["parent"]]["parent"]]["name"] == "analyze"
+
+
+def test_failed_step_records_the_error(tmp_path):
+    class Failing(Step):
+        @traced
+        def generate(self):
+            raise RuntimeError("boom")
+
+    step = Failing(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        step.generate()
+    [failed] = step._get_tracer().spans.values()
+    assert failed.attrs["error"] == "RuntimeError: boom"
+    assert (tmp_path / "summary.json").exists()
+
+
+def test_event_spans_attach_to_the_open_span():
+    tracer = Tracer("run")
+    with tracer.span("code_gen", "flow") as step:
+        tracer.begin_event("FileReadTool", "tool")
+        tracer.end_event("FileReadTool", "tool", cached=True)
+    [tool] = [s for s in tracer.spans.values() if s.category == "tool"]
+    assert tool.parent == step.id and tool.end is not None and tool.attrs["cached"] is True
+
+
+def test_flow_builds_its_tracer_after_kickoff_inputs(tmp_path):
+    pytest.importorskip("crewai")
+    from ai_feedback_loop import RMJT
+
+    flow = RMJT()
+    assert getattr(flow, "_tracer", None) is None
+    flow.state.output_dir = str(tmp_path / "out")
+    assert flow._get_tracer().output_dir == str(tmp_path / "out" / "trace")
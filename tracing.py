@@ -0,0 +1,287 @@
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+
+# the tracer and innermost open span of the current flow; asyncio.to_thread carries both into workers
+current_tracer = contextvars.ContextVar("current_tracer", default=None)
+current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(max(math.ceil(p / 100 * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+
+class Span:
+    def __init__(self, span_id, name, category, parent, attrs):
+        self.id = span_id
+        self.name = name
+        self.category = category  # flow, task, llm, tool
+        self.parent = parent
+        self.attrs = attrs
+        self.thread = threading.get_ident()
+        self.start = time.time()
+        self.end = None
+
+    @property
+    def duration_ms(self):
+        return ((self.end or time.time()) - self.start) * 1000
+
+    def stage(self, spans):
+        """Name of the nearest enclosing task, else flow step, else the span itself"""
+        node, step = self, None
+        while node is not None:
+            if node.category == "task":
+                return node.name
+            if node.category == "flow" and step is None:
+                step = node.name
+            node = spans.get(node.parent)
+        return step or self.name
+
+    def to_dict(self):
+        return {
+            "id": self.id, "name": self.name, "category": self.category, "parent": self.parent,
+            "thread": self.thread, "start": self.start, "duration_ms": round(self.duration_ms, 3), "attrs": self.attrs,
+        }
+
+
+class Tracer:
+    """Spans for one flow run: flow steps, tasks, LLM calls and tool calls, with file exporters"""
+
+    def __init__(self, run_id, output_dir=None):
+        self.run_id = run_id
+        self.output_dir = output_dir
+        self.spans = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._open = defaultdict(list)  # (thread, category, name) -> spans begun by events
+
+    def begin(self, name, category, parent=None, **attrs):
+        with self._lock:
+            self._next_id += 1
+            span = Span(self._next_id, name, category, parent, attrs)
+            self.spans[span.id] = span
+        return span
+
+    def _parent(self):
+        """The innermost open span: the context's, or a newer event-opened one on this thread"""
+        parent = current_span.get()
+        with self._lock:
+            opened = [stack[-1] for (thread, _, _), stack in self._open.items()
+                      if thread == threading.get_ident() and stack]
+        latest = max(opened, key=lambda s: s.start, default=None)
+        if latest is not None and (parent is None or latest.start >= parent.start):
+            return latest
+        return parent
+
+    @contextlib.contextmanager
+    def span(self, name, category, **attrs):
+        parent = self._parent()
+        span = self.begin(name, category, parent.id if parent else None, **attrs)
+        tracer_token = current_tracer.set(self)
+        span_token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attrs["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end = time.time()
+            current_span.reset(span_token)
+            current_tracer.reset(tracer_token)
+
+    def begin_event(self, name, category, **attrs):
+        """Open a span for a start event whose matching end event arrives on the same thread"""
+        parent = self._parent()
+        if parent is not None and (parent.category, parent.name) == (category, name):
+            return  # already traced explicitly, e.g. by run_task
+        span = self.begin(name, category, parent.id if parent else None, **attrs)
+        with self._lock:
+            self._open[(span.thread, category, name)].append(span)
+
+    def end_event(self, name, category, **attrs):
+        with self._lock:
+            stack = self._open.get((threading.get_ident(), category, name))
+            span = stack.pop() if stack else None
+        if span is not None:
+            span.attrs.update(attrs)
+            span.end = time.time()
+
+    def tokens(self):
+        """Estimated prompt + completion tokens of the run's uncached LLM calls so far"""
+        with self._lock:
+            spans = list(self.spans.values())
+        return sum(s.attrs.get("prompt_tokens", 0) + s.attrs.get("completion_tokens", 0)
+                   for s in spans if s.category == "llm" and s.end is not None and not s.attrs.get("cached"))
+
+    def summary(self):
+        """p50/p95 latency per span name, estimated tokens per stage and flow-step counts"""
+        finished = [s for s in self.spans.values() if s.end is not None]
+        latency = defaultdict(list)
+        for span in finished:
+            latency[(span.category, span.name)].append(span.duration_ms)
+        tokens = defaultdict(lambda: {"prompt": 0, "completion": 0, "calls": 0, "cached": 0})
+        for span in finished:
+            if span.category == "llm":
+                stage = tokens[span.stage(self.spans)]
+                stage["prompt"] += span.attrs.get("prompt_tokens", 0)
+                stage["completion"] += span.attrs.get("completion_tokens", 0)
+                stage["calls"] += 1
+                stage["cached"] += bool(span.attrs.get("cached"))
+        return {
+            "run_id": self.run_id,
+            "wall_ms": round(max((s.start * 1000 + s.duration_ms for s in finished), default=0)
+                             - min((s.start * 1000 for s in finished), default=0), 3),
+            "latency_ms": {
+                f"{category}:{name}": {
+                    "count": len(values),
+                    "p50": round(percentile(values, 50), 3),
+                    "p95": round(percentile(values, 95), 3),
+                    "total": round(sum(values), 3),
+                }
+                for (category, name), values in sorted(latency.items())
+            },
+            "tokens_by_stage": dict(tokens),
+            "step_counts": {name: len(values) for (category, name), values in latency.items() if category == "flow"},
+        }
+
+    def to_chrome_trace(self):
+        """Trace-event JSON loadable in chrome://tracing or Perfetto"""
+        events = [
+            {
+                "name": span.name, "cat": span.category, "ph": "X", "pid": 1, "tid": span.thread,
+                "ts": int(span.start * 1e6), "dur": int(span.duration_ms * 1000), "args": span.attrs,
+            }
+            for span in self.spans.values() if span.end is not None
+        ]
+        events.insert(0, {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": str(self.run_id)}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, output_dir=None):
+        """Write spans.jsonl, trace.json and summary.json; returns the directory"""
+        directory = output_dir or self.output_dir or "."
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            spans = sorted(self.spans.values(), key=lambda s: s.start)
+        files = {
+            "spans.jsonl": "".join(json.dumps(s.to_dict(), default=str) + "\n" for s in spans if s.end is not None),
+            "trace.json": json.dumps(self.to_chrome_trace(), default=str),
+            "summary.json": json.dumps(self.summary(), indent=2, default=str),
+        }
+        for name, content in files.items():
+            tmp = os.path.join(directory, name + ".tmp")
+            with open(tmp, "w") as f:
+                f.write(content)
+            os.replace(tmp, os.path.join(directory, name))
+        return directory
+
+
+@contextlib.contextmanager
+def span(name, category, **attrs):
+    """A span on the current flow's tracer, or nothing when no tracer is active"""
+    tracer = current_tracer.get()
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, category, **attrs) as opened:
+        yield opened
+
+
+def traced(method):
+    """Trace a flow step (sync or async) on self._get_tracer(), exporting after it ends"""
+    def tracer_of(self):
+        get = getattr(self, "_get_tracer", None)
+        return get() if get is not None else None
+
+    def run(self):
+        tracer = tracer_of(self)
+        return tracer.span(method.__name__, "flow") if tracer else contextlib.nullcontext()
+
+    def done(self):
+        tracer = tracer_of(self)
+        if tracer is not None and tracer.output_dir:
+            tracer.export()
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_step(self, *args, **kwargs):
+            try:
+                with run(self):
+                    return await method(self, *args, **kwargs)
+            finally:
+                done(self)
+        return async_step
+
+    @functools.wraps(method)
+    def step(self, *args, **kwargs):
+        try:
+            with run(self):
+                return method(self, *args, **kwargs)
+        finally:
+            done(self)
+    return step
+
+
+def _install_listeners():
+    """Open and close task and tool spans from crewai's events, which fire on the executing thread"""
+    try:
+        from crewai.utilities.events import (TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent,
+                                             ToolUsageErrorEvent, ToolUsageFinishedEvent, ToolUsageStartedEvent,
+                                             crewai_event_bus)
+    except ImportError:
+        try:
+            from crewai.events import (TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent, ToolUsageErrorEvent,
+                                       ToolUsageFinishedEvent, ToolUsageStartedEvent, crewai_event_bus)
+        except ImportError:
+            return
+
+    def task_name(source, event):
+        task = getattr(event, "task", None) or source
+        return getattr(task, "name", None) or "task"
+
+    @crewai_event_bus.on(TaskStartedEvent)
+    def task_started(source, event):
+        tracer = current_tracer.get()
+        if tracer is not None:
+            tracer.begin_event(task_name(source, event), "task")
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def task_completed(source, event):
+        tracer = current_tracer.get()
+        if tracer is not None:
+            tracer.end_event(task_name(source, event), "task")
+
+    @crewai_event_bus.on(TaskFailedEvent)
+    def task_failed(source, event):
+        tracer = current_tracer.get()
+        if tracer is not None:
+            tracer.end_event(task_name(source, event), "task", error=str(getattr(event, "error", "")))
+
+    @crewai_event_bus.on(ToolUsageStartedEvent)
+    def tool_started(source, event):
+        tracer = current_tracer.get()
+        if tracer is not None:
+            tracer.begin_event(event.tool_name, "tool", agent=getattr(event, "agent_role", ""))
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def tool_finished(source, event):
+        tracer = current_tracer.get()
+        if tracer is not None:
+            tracer.end_event(event.tool_name, "tool", cached=bool(getattr(event, "from_cache", False)))
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def tool_failed(source, event):
+        tracer = current_tracer.get()
+        if tracer is not None:
+            tracer.end_event(event.tool_name, "tool", error=str(getattr(event, "error", "")))
+
+
+_install_listeners()